@@ -0,0 +1,115 @@
+"""
+Inference Micro-Benchmark
+Compares LiveRacePredictor._run_inference with sklearn predict_proba vs the
+flat NumPy forest engine on a single ~20-row race, and checks they agree.
+
+Usage:
+    python benchmark_inference.py            # uses models/ + data from LiveRacePredictor defaults
+    python benchmark_inference.py --synthetic  # fits V5-shaped forests on random data
+"""
+
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from live_predictor import LiveRacePredictor
+
+
+def synthetic_predictor(n_rows=4000, seed=42):
+    """Predictor with forests fitted on random data using the V5 hyperparameters"""
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.ensemble import RandomForestClassifier
+
+    predictor = LiveRacePredictor(use_flat_engine=False)
+    with open(f'{predictor.model_dir}/model_features_v5.txt', 'r') as f:
+        predictor.features = [line.strip() for line in f.readlines()]
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(predictor.features))), columns=predictor.features)
+    position = rng.integers(1, 21, size=n_rows)
+
+    def forest(max_depth, **kwargs):
+        return RandomForestClassifier(n_estimators=150, max_depth=max_depth, min_samples_leaf=4,
+                                      class_weight='balanced', random_state=42, n_jobs=-1, **kwargs)
+
+    predictor.models['winner'] = CalibratedClassifierCV(
+        forest(10, min_samples_split=5), method='sigmoid', cv=3
+    ).fit(X, position == 1)
+    predictor.models['podium'] = forest(12).fit(X, position <= 3)
+    predictor.models['points'] = forest(12).fit(X, position <= 10)
+
+    race = X.head(20).copy()
+    race['driver_id'] = [f'driver_{i}' for i in range(20)]
+    race['constructor_id'] = [f'team_{i // 2}' for i in range(20)]
+    race['circuit_id'] = 'monza'
+    race['position'] = np.arange(1, 21)
+    race['grid'] = np.arange(1, 21)
+    race['season'] = 2025
+    race['round'] = 1
+    predictor.set_historical_data(race)
+    return predictor, race
+
+
+def real_predictor():
+    predictor = LiveRacePredictor(use_flat_engine=False)
+    if not predictor.load_resources():
+        raise SystemExit("❌ Could not load V5 resources (try --synthetic)")
+    with redirect_stdout(io.StringIO()):
+        race = predictor._merge_telemetry(predictor._get_race_context(2025, 16, 'monza'), None)
+    return predictor, race
+
+
+def time_call(fn, repeats):
+    fn()  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return np.median(timings), np.percentile(timings, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', action='store_true', help='benchmark on randomly fitted forests')
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("INFERENCE MICRO-BENCHMARK (_run_inference)")
+    print("=" * 80)
+
+    predictor, race = synthetic_predictor() if args.synthetic else real_predictor()
+    print(f"Rows per call: {len(race)}, repeats: {args.repeats}")
+
+    # sklearn path
+    predictor.engines = {}
+    sk_results = predictor._run_inference(race.copy())
+    sk_median, sk_p95 = time_call(lambda: predictor._run_inference(race.copy()), args.repeats)
+
+    # Flat engine path
+    predictor._build_engines()
+    flat_results = predictor._run_inference(race.copy())
+    flat_median, flat_p95 = time_call(lambda: predictor._run_inference(race.copy()), args.repeats)
+
+    merged = sk_results.merge(flat_results, on='driver_id', suffixes=('_sk', '_flat'))
+    max_diff = max(
+        np.abs(merged[f'{col}_sk'] - merged[f'{col}_flat']).max()
+        for col in ('win_prob', 'podium_prob', 'points_prob')
+    )
+
+    print(f"\n  sklearn predict_proba : median {sk_median:8.3f} ms   p95 {sk_p95:8.3f} ms")
+    print(f"  flat forest engine    : median {flat_median:8.3f} ms   p95 {flat_p95:8.3f} ms")
+    print(f"  speedup               : {sk_median / flat_median:.1f}x")
+    print(f"  max |prob diff|       : {max_diff:.2e}")
+    print(f"  same ranking          : {sk_results['driver_id'].tolist() == flat_results['driver_id'].tolist()}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
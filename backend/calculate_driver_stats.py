@@ -5,6 +5,7 @@ Used to drive the simulation logic with REAL data instead of hardcoding.
 
 import pandas as pd
 import json
+import os
 import numpy as np
 
 print("📊 Calculating Driver Stats...")
@@ -62,10 +63,12 @@ for driver_id in df['driver_id'].dropna().unique():
         'wet_diff': float(wet_pace - dry_pace) # Lower (more negative) is better in rain
     }
 
-# Save to JSON
+# Save to JSON (write + rename so the live API never reads a half-written file)
 output_file = 'E:/Shivam/F1/f1-ai-predictor/backend/models/driver_stats_v5.json'
-with open(output_file, 'w') as f:
+tmp_file = output_file + '.tmp'
+with open(tmp_file, 'w') as f:
     json.dump(stats, f, indent=4)
+os.replace(tmp_file, output_file)
 
 print(f"✅ Saved stats for {len(stats)} drivers to {output_file}")
 
@@ -0,0 +1,122 @@
+"""
+Championship Projection
+Points from the 2025 races already in the historical data, plus every
+remaining round of the calendar simulated with the Monte Carlo sampler.
+
+Each remaining round is scored by the model once (one predict_simulation_batch
+call for the whole calendar); those win probabilities are then reused by every
+sample. Samples are (samples x drivers) arrays per round, so the season loop
+is only over rounds, never over samples. Sprint races are not modelled.
+"""
+
+import numpy as np
+import pandas as pd
+
+from live_predictor import DRIVER_TEAM_MAP
+from montecarlo import MonteCarloSimulator, POINTS_TABLE
+
+CHUNK_SIZE = 20000
+
+
+def points_so_far(season_data):
+    """(driver_points, constructor_points, last_team) from completed races"""
+    if season_data is None or len(season_data) == 0:
+        return {}, {}, {}
+
+    df = season_data[['round', 'driver_id', 'constructor_id', 'position']].copy()
+    position = pd.to_numeric(df['position'], errors='coerce')
+    scored = position.between(1, len(POINTS_TABLE))
+    df['points'] = 0.0
+    df.loc[scored, 'points'] = POINTS_TABLE[position[scored].astype(int).to_numpy() - 1]
+
+    drivers = df.groupby('driver_id')['points'].sum().to_dict()
+    constructors = df.groupby('constructor_id')['points'].sum().to_dict()
+    last_team = df.sort_values('round').groupby('driver_id')['constructor_id'].last().to_dict()
+    return drivers, constructors, last_team
+
+
+def _summarize(names, current, totals, leader_noise):
+    """Title odds and points distribution per entrant from (samples x entrants) totals"""
+    # Random tie-break (countback is not modelled)
+    champion = np.argmax(totals + leader_noise, axis=1)
+    title = np.bincount(champion, minlength=len(names)) / len(totals)
+    percentiles = np.percentile(totals, [5, 25, 50, 75, 95], axis=0)
+    final_rank = np.argsort(np.argsort(-(totals + leader_noise), axis=1), axis=1)
+    entries = []
+    for i, name in enumerate(names):
+        entries.append({
+            'id': name,
+            'current_points': float(current[i]),
+            'title_probability': float(title[i]),
+            'expected_points': float(totals[:, i].mean()),
+            'points_std': float(totals[:, i].std()),
+            'points_percentiles': {
+                'p5': float(percentiles[0, i]), 'p25': float(percentiles[1, i]),
+                'p50': float(percentiles[2, i]), 'p75': float(percentiles[3, i]),
+                'p95': float(percentiles[4, i]),
+            },
+            'expected_final_position': float(final_rank[:, i].mean() + 1),
+        })
+    entries.sort(key=lambda e: (-e['title_probability'], -e['expected_points']))
+    return entries
+
+
+def project_championship(predictor, calendar, round_params, n_samples=20000, season=2025, seed=None):
+    """
+    calendar:     {circuit_key: round_number} for the season
+    round_params: {circuit_key: simulation params} used for rounds not yet run
+    """
+    completed = set(predictor.context_index.season_rounds(season))
+    remaining = sorted((r, key) for key, r in calendar.items() if r not in completed)
+
+    driver_points, constructor_points, last_team = points_so_far(predictor.context_index.season(season))
+
+    # Score every remaining round in one batched inference
+    results = predictor.predict_simulation_batch([round_params[key] for _, key in remaining]) if remaining else []
+    rounds = []
+    for (round_num, key), results_df in zip(remaining, results):
+        rounds.append((
+            round_num, key, round_params[key],
+            MonteCarloSimulator(results_df['driver_id'], results_df['model_win_prob'])
+        ))
+
+    # Entrants: everyone who scored or races again; current team for future rounds
+    grid_teams = {}
+    for _, _, _, simulator in rounds:
+        for driver_id in simulator.driver_ids:
+            grid_teams.setdefault(driver_id, DRIVER_TEAM_MAP.get(driver_id) or last_team.get(driver_id, 'unknown'))
+    drivers = sorted(set(driver_points) | set(grid_teams))
+    teams = sorted(set(constructor_points) | set(grid_teams.values()))
+    driver_index = {d: i for i, d in enumerate(drivers)}
+    team_index = {t: i for i, t in enumerate(teams)}
+
+    # (drivers x teams) 0/1 matrix mapping future driver points to constructors
+    membership = np.zeros((len(drivers), len(teams)))
+    for driver_id, team in grid_teams.items():
+        membership[driver_index[driver_id], team_index[team]] = 1.0
+
+    base_drivers = np.array([driver_points.get(d, 0.0) for d in drivers])
+    base_teams = np.array([constructor_points.get(t, 0.0) for t in teams])
+
+    rng = np.random.default_rng(seed)
+    driver_totals = np.empty((n_samples, len(drivers)))
+    for start in range(0, n_samples, CHUNK_SIZE):
+        n = min(CHUNK_SIZE, n_samples - start)
+        totals = np.broadcast_to(base_drivers, (n, len(drivers))).copy()
+        for _, _, params, simulator in rounds:
+            ranks, dnf, _ = simulator.sample(n, rng, params.get('safety_car', 'none'), params.get('rain_prob', 0))
+            columns = [driver_index[d] for d in simulator.driver_ids]
+            totals[:, columns] += simulator.points(ranks, dnf)
+        driver_totals[start:start + n] = totals
+
+    team_totals = base_teams + (driver_totals - base_drivers) @ membership
+
+    return {
+        'season': season,
+        'completed_rounds': sorted(completed),
+        'remaining_rounds': [{'round': r, 'circuit': key} for r, key, _, _ in rounds],
+        'n_samples': n_samples,
+        'drivers': _summarize(drivers, base_drivers, driver_totals, rng.random(driver_totals.shape) * 1e-6),
+        'constructors': _summarize(teams, base_teams, team_totals, rng.random(team_totals.shape) * 1e-6),
+    }
+
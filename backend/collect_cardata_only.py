@@ -4,13 +4,13 @@ Collects ONLY car_data (telemetry) for sessions that already have other data
 Uses existing session directories to avoid re-checking everything
 """
 
+import asyncio
 import pandas as pd
-import requests
 import os
-import time
+
+from openf1_client import OpenF1Client
 
 BASE_DIR = 'E:/Shivam/F1/f1-ai-predictor/data/openf1_final'
-API = 'https://api.openf1.org/v1'
 
 print("="*80)
 print("OpenF1 CAR DATA COLLECTOR (Focused)")
@@ -34,88 +34,85 @@ for year in ['2023', '2024', '2025']:
 print(f"\n📋 Found {len(existing_sessions)} existing sessions")
 print("   Will collect car_data for each\n")
 
-def find_drivers_fast(session_key):
-    """Quick driver search using common numbers first"""
-    # Common F1 driver numbers
-    common_numbers = [1, 2, 4, 10, 11, 14, 16, 18, 20, 22, 23, 24, 27, 31, 40, 44, 55, 63, 77, 81]
-    
-    drivers = []
-    for num in common_numbers:
-        try:
-            r = requests.get(f'{API}/car_data',
-                           params={'session_key': session_key, 'driver_number': num},
-                           timeout=3)
-            if r.status_code == 200 and len(r.json()) > 0:
-                drivers.append(num)
-            time.sleep(0.02)
-        except:
-            continue
-    
-    return drivers
+# Common F1 driver numbers
+COMMON_NUMBERS = [1, 2, 4, 10, 11, 14, 16, 18, 20, 22, 23, 24, 27, 31, 40, 44, 55, 63, 77, 81]
 
-total_records = 0
-successful = 0
+def session_driver_numbers(session_path):
+    """Car numbers from the session's drivers.csv, else the common numbers"""
+    drivers_file = os.path.join(session_path, 'drivers.csv')
+    if os.path.exists(drivers_file):
+        numbers = pd.read_csv(drivers_file)['driver_number'].dropna().astype(int).tolist()
+        if numbers:
+            return sorted(set(numbers))
+    return COMMON_NUMBERS
 
-for idx, session in enumerate(existing_sessions):
-    session_key = session['session_key']
-    year = session['year']
-    session_path = session['path']
-    
-    # Skip if car_data already exists
-    if os.path.exists(os.path.join(session_path, 'car_data.csv')):
-        print(f"⏭️  Session {session_key} already has car_data")
-        continue
-    
-    print(f"\n🏎️  Session {session_key} ({year})")
-    
-    # Find drivers
-    print("   Finding drivers...", end=' ', flush=True)
-    drivers = find_drivers_fast(session_key)
-    
-    if not drivers:
-        print("❌ No drivers found")
-        continue
-    
-    print(f"✅ {len(drivers)} drivers")
+async def fetch_car_data(client, session_key, session_path):
+    """car_data for every driver in the session, fetched concurrently ({number: rows})"""
+    results = await client.fetch_per_driver('car_data', session_key, session_driver_numbers(session_path), timeout=30)
+    found = {}
+    for driver_num, data in results.items():
+        if isinstance(data, Exception):
+            print(f"   ✗ Driver {driver_num}: {str(data)[:20]}", flush=True)
+        elif len(data) > 0:
+            found[driver_num] = data
+    return found
+
+async def main():
+    total_records = 0
+    successful = 0
     
-    # Collect car_data
-    all_data = []
-    for driver_num in drivers:
-        try:
-            r = requests.get(f'{API}/car_data',
-                           params={'session_key': session_key, 'driver_number': driver_num},
-                           timeout=30)
+    # One client for the run: pooled connections, global rate limit
+    async with OpenF1Client() as client:
+        for idx, session in enumerate(existing_sessions):
+            session_key = session['session_key']
+            year = session['year']
+            session_path = session['path']
             
-            if r.status_code == 200:
-                data = r.json()
-                if len(data) > 0:
-                    all_data.extend(data)
-                    print(f"   ✓ Driver {driver_num}: {len(data):,}", flush=True)
+            # Skip if car_data already exists
+            if os.path.exists(os.path.join(session_path, 'car_data.csv')):
+                print(f"⏭️  Session {session_key} already has car_data")
+                continue
             
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"   ✗ Driver {driver_num}: {str(e)[:20]}", flush=True)
-    
-    # Save
-    if all_data:
-        df = pd.DataFrame(all_data)
-        df.to_csv(os.path.join(session_path, 'car_data.csv'), index=False)
-        total_records += len(df)
-        successful += 1
-        
-        size_mb = len(df) * 100 / (1024 * 1024)
-        print(f"   💾 {len(df):,} records ({size_mb:.1f} MB)")
+            print(f"\n🏎️  Session {session_key} ({year})")
+            
+            # Find drivers and collect their car_data in one pass
+            print("   Finding drivers...", end=' ', flush=True)
+            car_data = await fetch_car_data(client, session_key, session_path)
+            
+            if not car_data:
+                print("❌ No drivers found")
+                continue
+            
+            print(f"✅ {len(car_data)} drivers")
+            
+            all_data = []
+            for driver_num, data in car_data.items():
+                all_data.extend(data)
+                print(f"   ✓ Driver {driver_num}: {len(data):,}", flush=True)
+            
+            # Save
+            if all_data:
+                df = pd.DataFrame(all_data)
+                df.to_csv(os.path.join(session_path, 'car_data.csv'), index=False)
+                total_records += len(df)
+                successful += 1
+                
+                size_mb = len(df) * 100 / (1024 * 1024)
+                print(f"   💾 {len(df):,} records ({size_mb:.1f} MB)")
+            
+            # Progress
+            if (idx + 1) % 5 == 0:
+                print(f"\n📊 Progress: {idx+1}/{len(existing_sessions)}")
+                print(f"   Collected: {successful} sessions")
+                print(f"   Total records: {total_records:,}\n")
     
-    # Progress
-    if (idx + 1) % 5 == 0:
-        print(f"\n📊 Progress: {idx+1}/{len(existing_sessions)}")
-        print(f"   Collected: {successful} sessions")
-        print(f"   Total records: {total_records:,}\n")
+    print("\n" + "="*80)
+    print("✅ CAR DATA COLLECTION COMPLETE!")
+    print("="*80)
+    print(f"Sessions with car_data: {successful}/{len(existing_sessions)}")
+    print(f"Total telemetry records: {total_records:,}")
+    print(f"Estimated size: ~{total_records * 100 / (1024**3):.2f} GB")
+    client.print_stats()
+    print("="*80)
 
-print("\n" + "="*80)
-print("✅ CAR DATA COLLECTION COMPLETE!")
-print("="*80)
-print(f"Sessions with car_data: {successful}/{len(existing_sessions)}")
-print(f"Total telemetry records: {total_records:,}")
-print(f"Estimated size: ~{total_records * 100 / (1024**3):.2f} GB")
-print("="*80)
+asyncio.run(main())
@@ -4,78 +4,53 @@ Tests each session first, then collects only what's available
 Storage: E:/Shivam/F1/f1-ai-predictor/data/openf1_car_data/
 """
 
-import requests
+import asyncio
 import pandas as pd
 import os
-import time
-from tqdm import tqdm
+
+from openf1_client import OpenF1Client
 
 # E DRIVE STORAGE
 OUTPUT_DIR = 'E:/Shivam/F1/f1-ai-predictor/data/openf1_car_data'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-API_BASE = 'https://api.openf1.org/v1'
-
-def get_all_sessions():
+async def get_all_sessions(client):
     """Get all sessions from OpenF1"""
     print("📋 Fetching all sessions...")
-    r = requests.get(f'{API_BASE}/sessions')
-    if r.status_code == 200:
-        sessions = pd.DataFrame(r.json())
-        print(f"✅ Found {len(sessions)} total sessions")
-        print(f"   Years: {sorted(sessions['year'].unique())}")
-        return sessions
-    else:
-        print(f"❌ Failed to get sessions: {r.status_code}")
+    try:
+        sessions = pd.DataFrame(await client.get('sessions'))
+    except Exception as e:
+        print(f"❌ Failed to get sessions: {e}")
         return None
+    print(f"✅ Found {len(sessions)} total sessions")
+    print(f"   Years: {sorted(sessions['year'].unique())}")
+    return sessions
 
-def test_session_has_car_data(session_key):
+async def test_session_has_car_data(client, session_key):
     """Test if a session has car_data available"""
     # Try with driver 1 (common number)
-    url = f'{API_BASE}/car_data'
-    params = {
-        'session_key': session_key,
-        'driver_number': 1
-    }
-    
     try:
-        r = requests.get(url, params=params, timeout=10)
-        if r.status_code == 200:
-            data = r.json()
-            return len(data) > 0
-        return False
-    except:
+        data = await client.get('car_data', {'session_key': session_key, 'driver_number': 1}, timeout=10)
+        return len(data) > 0
+    except Exception:
         return False
 
-def get_drivers_in_session(session_key):
-    """Get list of driver numbers that have car_data for this session"""
-    drivers_with_data = []
-    
-    # Test common driver numbers (F1 uses 1-99)
-    test_numbers = list(range(1, 100))
-    
-    for num in test_numbers:
-        url = f'{API_BASE}/car_data'
-        params = {
-            'session_key': session_key,
-            'driver_number': num
-        }
-        
-        try:
-            r = requests.get(url, params=params, timeout=5)
-            if r.status_code == 200:
-                data = r.json()
-                if len(data) > 0:
-                    drivers_with_data.append(num)
-            
-            time.sleep(0.05)  # Rate limiting
-            
-        except:
-            continue
-    
+async def get_drivers_in_session(client, session_key):
+    """
+    car_data for every driver number that has it in this session ({number: rows}).
+    F1 uses 1-99; all numbers are probed concurrently and each probe's
+    response is kept, so no driver's data is downloaded twice.
+    """
+    results = await client.fetch_per_driver('car_data', session_key, range(1, 100), timeout=30)
+    drivers_with_data = {}
+    for num, data in results.items():
+        if isinstance(data, Exception):
+            print(f"   ✗ Driver {num}: Error - {str(data)[:30]}")
+        elif len(data) > 0:
+            drivers_with_data[num] = data
     return drivers_with_data
 
-def collect_car_data_for_session(session_key, session_info):
+async def collect_car_data_for_session(client, session_key, session_info):
     """Collect all car_data for a session"""
     year = session_info['year']
     session_name = session_info['session_name']
@@ -83,9 +58,9 @@ def collect_car_data_for_session(session_key, session_info):
     
     print(f"\n🏎️  {year} - {meeting_name} - {session_name} (session {session_key})")
     
-    # Find drivers with data
+    # Find drivers with data (and their data)
     print("   Finding drivers with data...", end=' ')
-    drivers = get_drivers_in_session(session_key)
+    drivers = await get_drivers_in_session(client, session_key)
     
     if len(drivers) == 0:
         print("❌ No car_data available")
@@ -93,26 +68,10 @@ def collect_car_data_for_session(session_key, session_info):
     
     print(f"✅ Found {len(drivers)} drivers")
     
-    # Collect data for each driver
     all_data = []
-    
-    for driver_num in drivers:
-        url = f'{API_BASE}/car_data'
-        params = {
-            'session_key': session_key,
-            'driver_number': driver_num
-        }
-        
-        try:
-            r = requests.get(url, params=params, timeout=30)
-            if r.status_code == 200:
-                data = r.json()
-                all_data.extend(data)
-                print(f"   ✓ Driver {driver_num}: {len(data)} points")
-            
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"   ✗ Driver {driver_num}: Error - {str(e)[:30]}")
+    for driver_num, data in drivers.items():
+        all_data.extend(data)
+        print(f"   ✓ Driver {driver_num}: {len(data)} points")
     
     # Save to CSV
     if len(all_data) > 0:
@@ -136,15 +95,21 @@ def collect_car_data_for_session(session_key, session_info):
     
     return 0
 
-def main():
+async def run():
     print("="*80)
     print("OpenF1 CAR DATA COLLECTOR - Robust Version")
     print("="*80)
     print(f"Output directory: {OUTPUT_DIR}")
     print("="*80)
     
+    # One client for the run: pooled connections, global rate limit
+    async with OpenF1Client() as client:
+        await collect_all(client)
+        client.print_stats()
+
+async def collect_all(client):
     # Step 1: Get all sessions
-    sessions_df = get_all_sessions()
+    sessions_df = await get_all_sessions(client)
     if sessions_df is None:
         return
     
@@ -158,7 +123,7 @@ def main():
     # Step 3: Test first session
     print("🧪 Testing first session for car_data availability...")
     test_session = race_sessions.iloc[0]
-    has_data = test_session_has_car_data(test_session['session_key'])
+    has_data = await test_session_has_car_data(client, test_session['session_key'])
     
     if not has_data:
         print(f"\n⚠️  WARNING: Test session has no car_data!")
@@ -167,7 +132,7 @@ def main():
         # Try first 5 sessions
         for i in range(min(5, len(race_sessions))):
             test = race_sessions.iloc[i]
-            if test_session_has_car_data(test['session_key']):
+            if await test_session_has_car_data(client, test['session_key']):
                 print(f"   ✅ Found working session: {test['meeting_official_name']}")
                 break
         else:
@@ -186,7 +151,7 @@ def main():
         session_key = row['session_key']
         
         try:
-            records = collect_car_data_for_session(session_key, row)
+            records = await collect_car_data_for_session(client, session_key, row)
             
             if records > 0:
                 total_records += records
@@ -224,5 +189,8 @@ def main():
                 total_size = sum(os.path.getsize(f'{year_dir}/{f}') for f in files)
                 print(f"{year}: {len(files)} files, {total_size/(1024*1024):.1f} MB")
 
+def main():
+    asyncio.run(run())
+
 if __name__ == "__main__":
     main()
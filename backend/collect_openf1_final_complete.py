@@ -17,19 +17,32 @@ Collects ALL endpoints for complete dataset:
 Storage: E:/Shivam/F1/f1-ai-predictor/data/openf1_final/
 """
 
+import asyncio
 import pandas as pd
-import requests
 import os
-import time
+
+from openf1_client import OpenF1Client
 
 BASE_DIR = 'E:/Shivam/F1/f1-ai-predictor/data/openf1_final'
 os.makedirs(BASE_DIR, exist_ok=True)
 
-API = 'https://api.openf1.org/v1'
-
 # Load sessions
 SESSIONS_FILE = 'E:/Shivam/F1/f1-ai-predictor/data/openf1_race_sessions.csv'
 
+# Session-level endpoints: label, request timeout (fetched concurrently)
+SESSION_ENDPOINTS = {
+    'drivers': ("👤 Drivers", 10),
+    'weather': ("🌤️  Weather", 10),
+    'laps': ("⏱️  Laps", 10),
+    'stints': ("🛞 Stints", 10),
+    'pit': ("🔧 Pit", 10),
+    'overtakes': ("🏁 Overtakes", 10),
+    'race_control': ("🚨 Race Control", 10),
+    'intervals': ("⏳ Intervals", 30),
+    'position': ("📊 Position", 30),
+    'team_radio': ("📻 Team Radio", 10),
+}
+
 print("="*80)
 print("OpenF1 FINAL COMPREHENSIVE DATA COLLECTOR")
 print("="*80)
@@ -51,22 +64,19 @@ print("="*80)
 sessions_df = pd.read_csv(SESSIONS_FILE)
 print(f"\n📋 {len(sessions_df)} race sessions to process")
 
-def find_active_drivers(session_key):
-    """Find all drivers with data in this session"""
-    drivers = []
-    for num in range(1, 100):
-        try:
-            r = requests.get(f'{API}/car_data', 
-                           params={'session_key': session_key, 'driver_number': num}, 
-                           timeout=3)
-            if r.status_code == 200 and len(r.json()) > 0:
-                drivers.append(num)
-            time.sleep(0.02)
-        except:
-            continue
-    return drivers
+async def collect_per_driver(client, endpoint, session_key, driver_numbers):
+    """All drivers' rows for a per-driver endpoint, fetched concurrently; {driver: rows}"""
+    results = await client.fetch_per_driver(endpoint, session_key, driver_numbers, timeout=30)
+    found = {}
+    for driver_num, data in results.items():
+        if isinstance(data, Exception):
+            print(f"   ✗ Driver {driver_num}: {str(data)[:20]}", flush=True)
+        elif len(data) > 0:
+            found[driver_num] = data
+            print(f"   ✓ Driver {driver_num}: {len(data):,}", flush=True)
+    return found
 
-def collect_all_data(session_key, year, meeting_name):
+async def collect_all_data(client, session_key, year, meeting_name):
     """Collect complete dataset for one session"""
     
     print(f"\n{'='*80}")
@@ -78,177 +88,44 @@ def collect_all_data(session_key, year, meeting_name):
     
     stats = {}
     
-    # 1. DRIVERS
-    print("👤 Drivers...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/drivers', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/drivers.csv', index=False)
-            stats['drivers'] = len(r.json())
-            print(f"✅ {stats['drivers']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 2. WEATHER
-    print("🌤️  Weather...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/weather', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/weather.csv', index=False)
-            stats['weather'] = len(r.json())
-            print(f"✅ {stats['weather']}")
+    # 1-10. Session-level endpoints, all in flight at once
+    results = await client.fetch_session(
+        session_key, SESSION_ENDPOINTS,
+        timeouts={endpoint: timeout for endpoint, (_, timeout) in SESSION_ENDPOINTS.items()}
+    )
+    for endpoint, (label, _) in SESSION_ENDPOINTS.items():
+        print(f"{label}...", end=' ', flush=True)
+        data = results[endpoint]
+        if isinstance(data, Exception):
+            print(f"❌ {str(data)[:20]}")
+        elif len(data) > 0:
+            pd.DataFrame(data).to_csv(f'{session_dir}/{endpoint}.csv', index=False)
+            stats[endpoint] = len(data)
+            print(f"✅ {stats[endpoint]}")
         else:
             print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 3. LAPS
-    print("⏱️  Laps...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/laps', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/laps.csv', index=False)
-            stats['laps'] = len(r.json())
-            print(f"✅ {stats['laps']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 4. STINTS
-    print("🛞 Stints...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/stints', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/stints.csv', index=False)
-            stats['stints'] = len(r.json())
-            print(f"✅ {stats['stints']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 5. PIT STOPS
-    print("🔧 Pit...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/pit', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/pit.csv', index=False)
-            stats['pit'] = len(r.json())
-            print(f"✅ {stats['pit']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 6. OVERTAKES
-    print("🏁 Overtakes...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/overtakes', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/overtakes.csv', index=False)
-            stats['overtakes'] = len(r.json())
-            print(f"✅ {stats['overtakes']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 7. RACE CONTROL
-    print("🚨 Race Control...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/race_control', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/race_control.csv', index=False)
-            stats['race_control'] = len(r.json())
-            print(f"✅ {stats['race_control']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 8. INTERVALS
-    print("⏳ Intervals...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/intervals', params={'session_key': session_key}, timeout=30)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/intervals.csv', index=False)
-            stats['intervals'] = len(r.json())
-            print(f"✅ {stats['intervals']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 9. POSITION
-    print("📊 Position...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/position', params={'session_key': session_key}, timeout=30)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/position.csv', index=False)
-            stats['position'] = len(r.json())
-            print(f"✅ {stats['position']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
-    
-    # 10. TEAM RADIO
-    print("📻 Team Radio...", end=' ', flush=True)
-    try:
-        r = requests.get(f'{API}/team_radio', params={'session_key': session_key}, timeout=10)
-        if r.status_code == 200 and len(r.json()) > 0:
-            pd.DataFrame(r.json()).to_csv(f'{session_dir}/team_radio.csv', index=False)
-            stats['team_radio'] = len(r.json())
-            print(f"✅ {stats['team_radio']}")
-        else:
-            print("❌")
-    except Exception as e:
-        print(f"❌ {str(e)[:20]}")
     
     # 11. CAR DATA (FULL - all drivers)
+    # Car numbers come from the drivers endpoint; without it, probe 1-99.
+    # Each probe's response is kept, so a driver's car_data is downloaded once.
     print("\n🏎️  Car Data (FULL)...")
-    drivers = find_active_drivers(session_key)
+    drivers_rows = results['drivers'] if isinstance(results['drivers'], list) else []
+    candidates = sorted({int(d['driver_number']) for d in drivers_rows if d.get('driver_number')}) or list(range(1, 100))
+    car_data = await collect_per_driver(client, 'car_data', session_key, candidates)
+    drivers = sorted(car_data)
     print(f"   Found {len(drivers)} drivers")
     
-    all_car_data = []
-    for driver_num in drivers:
-        try:
-            r = requests.get(f'{API}/car_data',
-                           params={'session_key': session_key, 'driver_number': driver_num},
-                           timeout=30)
-            if r.status_code == 200:
-                data = r.json()
-                if len(data) > 0:
-                    all_car_data.extend(data)
-                    print(f"   ✓ Driver {driver_num}: {len(data):,}", flush=True)
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"   ✗ Driver {driver_num}: {str(e)[:20]}", flush=True)
-    
+    all_car_data = [row for driver_num in drivers for row in car_data[driver_num]]
     if all_car_data:
         pd.DataFrame(all_car_data).to_csv(f'{session_dir}/car_data.csv', index=False)
         stats['car_data'] = len(all_car_data)
         print(f"   ✅ Total: {stats['car_data']:,} records")
+    del car_data, all_car_data
     
     # 12. LOCATION (GPS - all drivers)
     print("\n📍 Location (GPS)...")
-    all_location_data = []
-    for driver_num in drivers:
-        try:
-            r = requests.get(f'{API}/location',
-                           params={'session_key': session_key, 'driver_number': driver_num},
-                           timeout=30)
-            if r.status_code == 200:
-                data = r.json()
-                if len(data) > 0:
-                    all_location_data.extend(data)
-                    print(f"   ✓ Driver {driver_num}: {len(data):,}", flush=True)
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"   ✗ Driver {driver_num}: {str(e)[:20]}", flush=True)
+    location = await collect_per_driver(client, 'location', session_key, drivers)
+    all_location_data = [row for driver_num in drivers if driver_num in location for row in location[driver_num]]
     
     if all_location_data:
         pd.DataFrame(all_location_data).to_csv(f'{session_dir}/location.csv', index=False)
@@ -263,46 +140,50 @@ def collect_all_data(session_key, year, meeting_name):
     return stats
 
 # Main collection
-print(f"\n🚀 Starting FINAL collection...\n")
+async def main():
+    print(f"\n🚀 Starting FINAL collection...\n")
+    
+    total_stats = {}
+    successful = 0
+    
+    # One client for the run: pooled connections, global rate limit
+    async with OpenF1Client() as client:
+        for idx, row in sessions_df.iterrows():
+            session_key = row['session_key']
+            year = row['year']
+            meeting = row.get('meeting_official_name', f'Race_{idx}')
+            
+            try:
+                session_stats = await collect_all_data(client, session_key, year, meeting)
+                
+                if session_stats:
+                    successful += 1
+                    for key, value in session_stats.items():
+                        total_stats[key] = total_stats.get(key, 0) + value
+                
+                # Progress
+                if (idx + 1) % 5 == 0:
+                    print(f"\n{'='*80}")
+                    print(f"📊 PROGRESS: {idx+1}/{len(sessions_df)} sessions")
+                    print(f"   Successful: {successful}")
+                    print(f"   Total Records: {sum(total_stats.values()):,}")
+                    print(f"{'='*80}\n")
+                
+            except Exception as e:
+                print(f"\n❌ Session {session_key} failed: {str(e)[:50]}")
+    
+    # Final summary
+    print("\n" + "="*80)
+    print("🎉 FINAL COLLECTION COMPLETE!")
+    print("="*80)
+    print(f"\nSessions: {successful}/{len(sessions_df)}")
+    print(f"\nData by endpoint:")
+    for endpoint, count in sorted(total_stats.items()):
+        print(f"  {endpoint:15s}: {count:>12,} records")
+    
+    print(f"\nGRAND TOTAL: {sum(total_stats.values()):,} data points")
+    print(f"Saved to: {BASE_DIR}")
+    client.print_stats()
+    print("="*80)
 
-total_stats = {}
-successful = 0
-
-for idx, row in sessions_df.iterrows():
-    session_key = row['session_key']
-    year = row['year']
-    meeting = row.get('meeting_official_name', f'Race_{idx}')
-    
-    try:
-        session_stats = collect_all_data(session_key, year, meeting)
-        
-        if session_stats:
-            successful += 1
-            for key, value in session_stats.items():
-                total_stats[key] = total_stats.get(key, 0) + value
-        
-        # Progress
-        if (idx + 1) % 5 == 0:
-            print(f"\n{'='*80}")
-            print(f"📊 PROGRESS: {idx+1}/{len(sessions_df)} sessions")
-            print(f"   Successful: {successful}")
-            print(f"   Total Records: {sum(total_stats.values()):,}")
-            print(f"{'='*80}\n")
-        
-        time.sleep(1)  # Rate limiting
-        
-    except Exception as e:
-        print(f"\n❌ Session {session_key} failed: {str(e)[:50]}")
-
-# Final summary
-print("\n" + "="*80)
-print("🎉 FINAL COLLECTION COMPLETE!")
-print("="*80)
-print(f"\nSessions: {successful}/{len(sessions_df)}")
-print(f"\nData by endpoint:")
-for endpoint, count in sorted(total_stats.items()):
-    print(f"  {endpoint:15s}: {count:>12,} records")
-
-print(f"\nGRAND TOTAL: {sum(total_stats.values()):,} data points")
-print(f"Saved to: {BASE_DIR}")
-print("="*80)
+asyncio.run(main())
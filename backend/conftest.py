@@ -0,0 +1,12 @@
+"""
+pytest configuration for the backend unit tests (python -m pytest in backend/).
+The scripts below predate them: they query live APIs at import time and are
+run by hand, so pytest must not collect them.
+"""
+
+collect_ignore = [
+    'test_brazilian_gp.py',
+    'test_car_data_availability.py',
+    'test_location_cardata.py',
+    'test_openf1_years.py',
+]
@@ -0,0 +1,111 @@
+"""
+Convert V5 model pickles to memory-mapped .flat artifacts
+Writes models/<name>.flat/ next to each .pkl and verifies the converted
+model against the pickle before keeping it. LiveRacePredictor picks the
+.flat directory up automatically (re-run after retraining).
+
+Parity is checked on random inputs and on a sample of real feature rows
+from the race data (snapshot or CSV), which exercise the split paths the
+API actually hits. An artifact that deviates is deleted.
+
+Usage:
+    python convert_models_to_npy.py [--model-dir models] [--data-path ../data/f1_race_data_prepared.csv]
+"""
+
+import argparse
+import os
+import shutil
+
+import joblib
+import numpy as np
+
+from forest_engine import FlatForest
+from live_predictor import MODEL_FILES
+from model_artifacts import flat_model_dir, load_flat_model, save_flat_model
+from race_data_snapshot import RaceDataSnapshot, read_csv_columns
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Max |flat - sklearn| probability difference accepted
+TOLERANCE = 1e-9
+
+
+def real_feature_rows(model_dir, data_path, n_rows=5000, seed=0):
+    """Sample of historical feature rows in model column order (None if no data is found)"""
+    features_path = os.path.join(model_dir, 'model_features_v5.txt')
+    if not os.path.exists(features_path):
+        return None
+    with open(features_path) as f:
+        features = [line.strip() for line in f if line.strip()]
+
+    snapshot = RaceDataSnapshot(os.getenv("RACE_DATA_SNAPSHOT") or
+                                os.path.join(os.path.dirname(data_path), 'race_data_snapshot.parquet'))
+    data = snapshot.load(features)
+    if data is None and os.path.exists(data_path):
+        data = read_csv_columns(data_path, features)
+    if data is None or len(data) == 0:
+        return None
+
+    # Same preparation as inference: missing features are 0, NaN -> 0
+    for feat in features:
+        if feat not in data.columns:
+            data[feat] = 0
+    X = data[features].fillna(0).to_numpy(dtype=np.float32)
+    if len(X) > n_rows:
+        X = X[np.random.default_rng(seed).choice(len(X), n_rows, replace=False)]
+    return X
+
+
+def convert(model_path, real_rows=None, n_check=2000, seed=0):
+    model = joblib.load(model_path)
+    engine = FlatForest.from_sklearn(model)
+    out_dir = flat_model_dir(model_path)
+    save_flat_model(engine, out_dir)
+
+    # Verify the mmap'd artifact against sklearn on random and real inputs
+    loaded = load_flat_model(out_dir)
+    checks = {'random': np.random.default_rng(seed).normal(size=(n_check, loaded.n_features)).astype(np.float32)}
+    if real_rows is not None:
+        checks['real'] = real_rows
+    diffs = {
+        name: float(np.abs(loaded.predict_positive(X) - model.predict_proba(X)[:, 1]).max())
+        for name, X in checks.items()
+    }
+    max_diff = max(diffs.values())
+    if max_diff > TOLERANCE:
+        del loaded
+        shutil.rmtree(out_dir, ignore_errors=True)
+        detail = ', '.join(f"{name} {diff:.2e}" for name, diff in diffs.items())
+        raise ValueError(f"converted model deviates from sklearn ({detail}), artifact removed")
+
+    size_mb = sum(
+        os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)
+    ) / 1e6
+    print(f"✅ {os.path.basename(model_path)} -> {os.path.basename(out_dir)}/ "
+          f"({len(loaded.roots)} trees, {len(loaded.feature):,} nodes, {size_mb:.1f} MB, "
+          f"max diff {max_diff:.1e} over {sum(len(X) for X in checks.values()):,} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert V5 model pickles to .flat artifacts")
+    parser.add_argument('--model-dir', default=os.path.join(BASE_DIR, 'models'))
+    parser.add_argument('--data-path', default=os.path.join(BASE_DIR, '..', 'data', 'f1_race_data_prepared.csv'))
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("CONVERTING MODELS TO MEMORY-MAPPED FORMAT")
+    print("=" * 80)
+    real_rows = real_feature_rows(args.model_dir, args.data_path)
+    if real_rows is None:
+        print("⚠️ No race data found, checking parity on random inputs only")
+    else:
+        print(f"📋 Checking parity on {len(real_rows):,} real feature rows + random inputs")
+    for filename in MODEL_FILES.values():
+        path = os.path.join(args.model_dir, filename)
+        if not os.path.exists(path):
+            print(f"⚠️ {filename} not found, skipping")
+            continue
+        try:
+            convert(path, real_rows)
+        except Exception as e:
+            print(f"❌ {filename}: {e}")
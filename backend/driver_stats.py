@@ -0,0 +1,75 @@
+"""
+Driver Stats Store
+Keeps models/driver_stats_v5.json in memory and hot-reloads it when
+calculate_driver_stats.py regenerates the file. Requests only touch the
+in-memory dict; the file is stat()-ed at most once per check interval.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class DriverStatsStore:
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._stats = {}
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def load(self):
+        """Force a (re)load from disk. Returns True if stats are available."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            self._reload_if_changed(force=True)
+        return bool(self._stats)
+
+    def get(self):
+        """Current driver_id -> {'dry_pace', 'wet_pace', ...} mapping"""
+        self.poll()
+        return self._stats
+
+    def poll(self):
+        """Cheap mtime check, throttled to once per check interval"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            self._reload_if_changed()
+
+    def _reload_if_changed(self, force=False):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            if force:
+                print(f"⚠️ Driver stats not found at {self.path}, using defaults")
+            return
+
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature and not force:
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                stats = json.load(f)
+        except (OSError, ValueError) as e:
+            # Probably caught mid-write; keep serving the old stats and retry
+            print(f"⚠️ Could not read driver stats ({e}), keeping previous")
+            return
+
+        if not isinstance(stats, dict):
+            print("⚠️ Driver stats file is not a mapping, keeping previous")
+            return
+
+        # Single reference swap: readers see either the old or the new dict
+        self._stats = stats
+        self._signature = signature
+        self.reloads += 1
+        print(f"✅ Loaded driver stats for {len(stats)} drivers")
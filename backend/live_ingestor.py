@@ -0,0 +1,396 @@
+"""
+Live OpenF1 Ingestor
+Polls OpenF1 during a session and keeps per-driver rolling state that
+LiveRacePredictor.predict_live can consume as `live_telemetry`.
+- intervals, position, laps, pit and race_control polled concurrently on one
+  pooled httpx.AsyncClient
+- each endpoint keeps a `date>=` cursor, so every poll only returns new rows;
+  rows at the cursor timestamp that were already applied are skipped
+- laps are polled by `lap_number>=` from the oldest lap still missing its
+  lap_duration: OpenF1 publishes a lap when it starts and fills the duration
+  in later, so rows are re-read and replaced per (driver, lap)
+- every row updates the state in O(1); snapshot() builds the telemetry dict on demand
+
+Feature definitions follow merge_openf1_data.py (the training pipeline):
+pace ratio against the fastest driver's average lap, gap trend as the
+least-squares slope of gap_to_leader per interval sample, and safety-car
+count as race_control messages in the SafetyCar category. Overtakes are
+counted from position gains, since the overtakes endpoint lags live timing.
+
+Env:
+    OPENF1_BASE_URL   API root (default https://api.openf1.org/v1); point it
+                      at openf1_stub.py to replay recorded sessions
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import httpx
+
+from live_predictor import DRIVER_CODES, DRIVER_NUMBERS
+
+OPENF1_BASE_URL = "https://api.openf1.org/v1"
+
+# Polled endpoint -> column of its incremental `>=` cursor
+ENDPOINTS = {
+    'intervals': 'date',
+    'position': 'date',
+    'laps': 'lap_number',
+    'pit': 'date',
+    'race_control': 'date',
+}
+
+# Laps without a duration are re-polled until this many laps after the
+# driver's latest lap (a retired car's last lap never gets one), and never
+# from further back than this many laps behind the leader
+LAP_REPOLL = 3
+LAP_WINDOW = 5
+
+# Weight of the newest lap in the rolling lap-time average
+PACE_ALPHA = 0.3
+
+
+def parse_date(value):
+    """OpenF1 ISO timestamp -> datetime (None if missing/unparseable)"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def to_float(value):
+    """Numeric field or None ("+1 LAP" gaps, nulls)"""
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if result != result else result
+
+
+def row_key(row):
+    """Identity of an OpenF1 row, for dropping re-sent rows"""
+    return json.dumps(row, sort_keys=True, default=str)
+
+
+class DriverState:
+    """Rolling telemetry for one driver, every update O(1)"""
+
+    __slots__ = ('lap_ewma', 'laps', 'lap_times', 'gap_n', 'gap_mean_x', 'gap_mean_y', 'gap_sxx', 'gap_sxy',
+                 'pit_laps', 'position', 'overtakes', 'last_lap')
+
+    def __init__(self):
+        self.lap_ewma = None
+        self.laps = 0
+        self.lap_times = {}   # lap_number -> lap_duration
+        # Welford-style running sums for the gap-vs-sample slope
+        self.gap_n = 0
+        self.gap_mean_x = 0.0
+        self.gap_mean_y = 0.0
+        self.gap_sxx = 0.0
+        self.gap_sxy = 0.0
+        self.pit_laps = set()
+        self.position = None
+        self.overtakes = 0
+        self.last_lap = 0
+
+    def add_lap(self, lap_number, duration):
+        """Insert or replace one lap; the average folds laps in lap order"""
+        if not lap_number:
+            return
+        lap_number = int(lap_number)
+        self.last_lap = max(self.last_lap, lap_number)
+        if duration is None or self.lap_times.get(lap_number) == duration:
+            return
+        newest = not self.lap_times or lap_number > max(self.lap_times)
+        self.lap_times[lap_number] = duration
+        self.laps = len(self.lap_times)
+        if newest and self.lap_ewma is not None:
+            self.lap_ewma += PACE_ALPHA * (duration - self.lap_ewma)
+            return
+        # First lap, a late duration for an earlier lap, or a corrected time
+        ewma = None
+        for lap in sorted(self.lap_times):
+            value = self.lap_times[lap]
+            ewma = value if ewma is None else ewma + PACE_ALPHA * (value - ewma)
+        self.lap_ewma = ewma
+
+    def open_lap(self):
+        """Oldest recent lap still waiting for its duration (None if all are timed)"""
+        for lap in range(max(1, self.last_lap - LAP_REPOLL), self.last_lap + 1):
+            if lap not in self.lap_times:
+                return lap
+        return None
+
+    def add_gap(self, gap):
+        # x is the sample index, as in np.polyfit(range(len(gaps)), gaps, 1)
+        x = float(self.gap_n)
+        self.gap_n += 1
+        dx = x - self.gap_mean_x
+        self.gap_mean_x += dx / self.gap_n
+        self.gap_mean_y += (gap - self.gap_mean_y) / self.gap_n
+        self.gap_sxx += dx * (x - self.gap_mean_x)
+        self.gap_sxy += dx * (gap - self.gap_mean_y)
+
+    def add_position(self, position):
+        if self.position is not None and position < self.position:
+            self.overtakes += self.position - position
+        self.position = position
+
+    @property
+    def gap_trend(self):
+        return self.gap_sxy / self.gap_sxx if self.gap_sxx > 0 else 0.0
+
+
+class LiveSessionState:
+    """Per-driver rolling state for one session, fed row by row"""
+
+    def __init__(self, driver_map=None):
+        self.driver_map = dict(driver_map or DRIVER_NUMBERS)
+        self.drivers = {}
+        self.safety_car_count = 0
+        self.leader_lap = 0
+        self.rows = 0
+        self.updated_at = None
+
+    def _driver(self, number):
+        if number is None:
+            return None
+        number = int(number)
+        state = self.drivers.get(number)
+        if state is None:
+            state = self.drivers[number] = DriverState()
+        return state
+
+    def apply(self, endpoint, row):
+        """Fold one OpenF1 row into the state"""
+        self.rows += 1
+        self.updated_at = time.time()
+        driver = self._driver(to_float(row.get('driver_number')))
+
+        if endpoint == 'laps' and driver is not None:
+            driver.add_lap(to_float(row.get('lap_number')), to_float(row.get('lap_duration')))
+            self.leader_lap = max(self.leader_lap, driver.last_lap)
+        elif endpoint == 'intervals' and driver is not None:
+            gap = to_float(row.get('gap_to_leader'))
+            if gap is not None:
+                driver.add_gap(gap)
+        elif endpoint == 'position' and driver is not None:
+            position = to_float(row.get('position'))
+            if position is not None:
+                driver.add_position(int(position))
+        elif endpoint == 'pit' and driver is not None:
+            # Keyed by lap so a re-sent row is not counted twice
+            driver.pit_laps.add(row.get('lap_number') or row.get('date'))
+        elif endpoint == 'race_control':
+            if 'safetycar' in str(row.get('category', '')).lower():
+                self.safety_car_count += 1
+
+    def snapshot(self):
+        """
+        driver_id -> telemetry dict for predict_live. Pace is relative to the
+        fastest rolling average; drivers without a timed lap get no pace_ratio
+        (the predictor falls back to their recent pace).
+        """
+        paces = [d.lap_ewma for d in self.drivers.values() if d.lap_ewma is not None]
+        best = min(paces) if paces else None
+        telemetry = {}
+        for number, driver in self.drivers.items():
+            entry = {
+                'gap_trend': driver.gap_trend,
+                'pit_stops': len(driver.pit_laps),
+                'overtakes': driver.overtakes,
+                'safety_car_count': self.safety_car_count,
+                'position': driver.position,
+                'lap': driver.last_lap,
+            }
+            if best and driver.lap_ewma is not None:
+                entry['pace_ratio'] = driver.lap_ewma / best
+            telemetry[self.driver_map.get(number, f'driver_{number}')] = entry
+        return telemetry
+
+
+class LiveIngestor:
+    def __init__(self, session_key, base_url=None, poll_interval=2.0, timeout=10.0, transport=None):
+        self.session_key = session_key
+        self.base_url = (base_url or os.getenv("OPENF1_BASE_URL") or OPENF1_BASE_URL).rstrip('/')
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.transport = transport
+        self.state = LiveSessionState()
+        self.cursors = {}   # endpoint -> (datetime, raw timestamp string, keys of rows at that timestamp)
+        self.laps_from = None
+        self._lap_rows = {}   # (driver_number, lap_number) -> lap_duration last applied
+        self._client = None
+        self._task = None
+        self.polls = 0
+        self.errors = 0
+        self.rows_by_endpoint = {endpoint: 0 for endpoint in ENDPOINTS}
+        self._listeners = []
+
+    async def start(self, poll=True):
+        """Open the shared client, resolve driver numbers and (optionally) start polling"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                transport=self.transport
+            )
+            await self.load_drivers()
+        if poll and self._task is None:
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def load_drivers(self):
+        """Map this session's car numbers to driver ids via name acronyms"""
+        try:
+            rows = await self._fetch('drivers')
+        except Exception as e:
+            print(f"⚠️ OpenF1 drivers unavailable ({e}), using 2025 car numbers")
+            return
+        for row in rows:
+            number = to_float(row.get('driver_number'))
+            driver_id = DRIVER_CODES.get(str(row.get('name_acronym', '')).upper())
+            if number is not None and driver_id:
+                self.state.driver_map[int(number)] = driver_id
+
+    async def _fetch(self, endpoint, cursor=None):
+        # Built by hand: OpenF1 filters are written `field>=value`, not `field=value`
+        url = f"{self.base_url}/{endpoint}?session_key={self.session_key}"
+        if cursor is not None:
+            url += f"&{ENDPOINTS[endpoint]}>={quote(str(cursor), safe=':.-T')}"
+        response = await self._client.get(url)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        return response.json()
+
+    async def _poll_endpoint(self, endpoint):
+        """New rows since the endpoint's cursor, applied in timestamp order"""
+        if endpoint == 'laps':
+            return await self._poll_laps()
+        date_field = ENDPOINTS[endpoint]
+        cursor = self.cursors.get(endpoint)
+        rows = await self._fetch(endpoint, cursor[1] if cursor else None)
+
+        dated = []
+        for row in rows:
+            ts = parse_date(row.get(date_field))
+            # Rows without a timestamp can't be ordered or used as a cursor
+            if ts is None or (cursor is not None and ts < cursor[0]):
+                continue
+            # `>=` re-sends the cursor's timestamp; skip the rows already applied
+            if cursor is not None and ts == cursor[0] and row_key(row) in cursor[2]:
+                continue
+            dated.append((ts, row))
+        dated.sort(key=lambda item: item[0])
+        for _, row in dated:
+            self.state.apply(endpoint, row)
+        if dated:
+            last = dated[-1][0]
+            keys = {row_key(row) for ts, row in dated if ts == last}
+            if cursor is not None and last == cursor[0]:
+                keys |= cursor[2]
+            self.cursors[endpoint] = (last, dated[-1][1][date_field], keys)
+        self.rows_by_endpoint[endpoint] += len(dated)
+        return len(dated)
+
+    def _laps_cursor(self):
+        """First lap_number to poll: the oldest recent lap without a duration (None = all laps)"""
+        floor = self.state.leader_lap - LAP_WINDOW
+        laps = [
+            driver.open_lap() or driver.last_lap + 1
+            for driver in self.state.drivers.values()
+            if driver.last_lap and driver.last_lap >= floor
+        ]
+        return max(1, min(laps)) if laps else None
+
+    async def _poll_laps(self):
+        """Re-read laps still in progress; new or changed (driver, lap) rows replace the old ones"""
+        self.laps_from = self._laps_cursor()
+        rows = await self._fetch('laps', self.laps_from)
+
+        changed = []
+        for row in rows:
+            number, lap = to_float(row.get('driver_number')), to_float(row.get('lap_number'))
+            if number is None or lap is None:
+                continue
+            key = (int(number), int(lap))
+            duration = to_float(row.get('lap_duration'))
+            if key in self._lap_rows and self._lap_rows[key] == duration:
+                continue
+            self._lap_rows[key] = duration
+            changed.append((key[1], row))
+        changed.sort(key=lambda item: item[0])
+        for _, row in changed:
+            self.state.apply('laps', row)
+        self.rows_by_endpoint['laps'] += len(changed)
+        return len(changed)
+
+    async def poll_once(self):
+        """Poll every endpoint concurrently; returns new rows per endpoint"""
+        if self._client is None:
+            raise RuntimeError("LiveIngestor.start() has not been called")
+        results = await asyncio.gather(
+            *(self._poll_endpoint(endpoint) for endpoint in ENDPOINTS), return_exceptions=True
+        )
+        self.polls += 1
+        new_rows = {}
+        for endpoint, result in zip(ENDPOINTS, results):
+            if isinstance(result, Exception):
+                self.errors += 1
+                print(f"⚠️ OpenF1 {endpoint} poll failed: {result}")
+                new_rows[endpoint] = 0
+            else:
+                new_rows[endpoint] = result
+        for listener in self._listeners:
+            try:
+                await listener(new_rows)
+            except Exception as e:
+                print(f"⚠️ Live listener failed: {e}")
+        return new_rows
+
+    def add_listener(self, callback):
+        """Await callback(new_rows_by_endpoint) after every poll"""
+        self._listeners.append(callback)
+
+    async def _poll_loop(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Live poll failed: {e}")
+            await asyncio.sleep(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    def snapshot(self):
+        """Telemetry dict for LiveRacePredictor.predict_live"""
+        return self.state.snapshot()
+
+    def stats(self):
+        return {
+            'session_key': self.session_key,
+            'polls': self.polls,
+            'errors': self.errors,
+            'rows': dict(self.rows_by_endpoint),
+            'leader_lap': self.state.leader_lap,
+            'drivers': len(self.state.drivers),
+            'cursors': {endpoint: raw for endpoint, (_, raw, _) in self.cursors.items()},
+            'laps_from': self.laps_from,
+        }
@@ -8,59 +8,271 @@ import numpy as np
 import joblib
 import warnings
 import os
+import time
+from race_context import RaceContextIndex, CircuitFormTables
+from driver_stats import DriverStatsStore
+from metrics import metrics
+from forest_engine import FlatForest
+from model_artifacts import flat_model_dir, is_current, load_flat_model
+from race_data_snapshot import (
+    RaceDataSnapshot, db_fingerprint, read_csv_columns, read_db_columns, required_columns
+)
 warnings.filterwarnings('ignore')
 
+# Map to Round Number (2025 Calendar)
+ROUND_MAP = {
+    'bahrain': 1, 'jeddah': 2, 'melbourne': 3, 'suzuka': 4, 'shanghai': 5,
+    'miami': 6, 'imola': 7, 'monaco': 8, 'montreal': 9, 'barcelona': 10,
+    'spielberg': 11, 'silverstone': 12, 'hungaroring': 13, 'spa': 14,
+    'zandvoort': 15, 'monza': 16, 'baku': 17, 'singapore': 18,
+    'austin': 19, 'mexico': 20, 'interlagos': 21, 'vegas': 22,
+    'lusail': 23, 'abudhabi': 24
+}
+
+# Map to Database Circuit ID
+CIRCUIT_ID_MAP = {
+    'bahrain': 'bahrain', 'jeddah': 'jeddah', 'melbourne': 'albert_park', 
+    'suzuka': 'suzuka', 'shanghai': 'shanghai', 'miami': 'miami', 
+    'imola': 'imola', 'monaco': 'monaco', 'montreal': 'villeneuve', 
+    'barcelona': 'catalunya', 'spielberg': 'red_bull_ring', 'silverstone': 'silverstone', 
+    'hungaroring': 'hungaroring', 'spa': 'spa', 'zandvoort': 'zandvoort', 
+    'monza': 'monza', 'baku': 'baku', 'singapore': 'marina_bay', 
+    'austin': 'americas', 'mexico': 'rodriguez', 'interlagos': 'interlagos', 
+    'vegas': 'las_vegas', 'lusail': 'losail', 'abudhabi': 'yas_marina'
+}
+
+# 2025 Driver-Team Mapping
+DRIVER_TEAM_MAP = {
+    'max_verstappen': 'red_bull', 'tsunoda': 'red_bull',
+    'hamilton': 'ferrari', 'leclerc': 'ferrari',
+    'norris': 'mclaren', 'piastri': 'mclaren',
+    'russell': 'mercedes', 'antonelli': 'mercedes',
+    'alonso': 'aston_martin', 'stroll': 'aston_martin',
+    'gasly': 'alpine', 'colapinto': 'alpine',
+    'albon': 'williams', 'sainz': 'williams',
+    'lawson': 'rb', 'hadjar': 'rb',
+    'ocon': 'haas', 'bearman': 'haas',
+    'hulkenberg': 'sauber', 'bortoleto': 'sauber'
+}
+
+# Three-letter driver codes (FastF1, OpenF1 name_acronym) -> driver ids
+DRIVER_CODES = {
+    'VER': 'max_verstappen', 'TSU': 'tsunoda', 'HAM': 'hamilton', 'LEC': 'leclerc',
+    'NOR': 'norris', 'PIA': 'piastri', 'RUS': 'russell', 'ANT': 'antonelli',
+    'ALO': 'alonso', 'STR': 'stroll', 'GAS': 'gasly', 'COL': 'colapinto',
+    'ALB': 'albon', 'SAI': 'sainz', 'LAW': 'lawson', 'HAD': 'hadjar',
+    'OCO': 'ocon', 'BEA': 'bearman', 'HUL': 'hulkenberg', 'BOR': 'bortoleto',
+}
+
+# 2025 permanent car numbers (OpenF1 driver_number) -> driver ids
+DRIVER_NUMBERS = {
+    1: 'max_verstappen', 22: 'tsunoda', 44: 'hamilton', 16: 'leclerc',
+    4: 'norris', 81: 'piastri', 63: 'russell', 12: 'antonelli',
+    14: 'alonso', 18: 'stroll', 10: 'gasly', 43: 'colapinto',
+    23: 'albon', 55: 'sainz', 30: 'lawson', 6: 'hadjar',
+    31: 'ocon', 87: 'bearman', 27: 'hulkenberg', 5: 'bortoleto',
+}
+
+# Model name -> pickled artifact in model_dir
+MODEL_FILES = {
+    'winner': 'race_winner_model_v5.pkl',
+    'podium': 'podium_model_v5.pkl',
+    'points': 'points_model_v5.pkl',
+}
+
+# Live telemetry key -> model feature column (None default = driver's recent pace)
+TELEMETRY_FIELDS = [
+    ('pace_ratio', 'pace_ratio', None),
+    ('gap_trend', 'gap_trend', 0),
+    ('pit_stops', 'num_pit_stops', 0),
+    ('overtakes', 'overtakes_made', 0),
+    ('safety_car_count', 'safety_car_count', 0),
+]
+
+metrics.describe('resource_load_seconds', 'Duration of the last load of each model/data resource')
+metrics.describe('resource_loads_total', 'Completed load_resources() runs')
+
+# Rain probability (%) above which simulations use wet pace
+WET_RAIN_THRESHOLD = 40
+
+# Simulated safety_car_count per requested safety-car level (race_control
+# SafetyCar messages in the training data; unknown levels count as one)
+SAFETY_CAR_COUNTS = {'none': 0, 'low': 1, 'medium': 2, 'high': 3}
+
+def resolve_circuit_key(circuit):
+    """Normalize a frontend circuit name to a calendar key"""
+    circuit_key = circuit.lower()
+    
+    # Handle variations
+    if 'saudi' in circuit_key: circuit_key = 'jeddah'
+    if 'albert' in circuit_key: circuit_key = 'melbourne'
+    if 'red bull' in circuit_key: circuit_key = 'spielberg'
+    if 'qatar' in circuit_key: circuit_key = 'lusail'
+    if 'abu' in circuit_key: circuit_key = 'abudhabi'
+    return circuit_key
+
+def simulation_cache_key(params):
+    """
+    Normalized key for a simulation request. Weather is rounded to 0.1;
+    the wet flag is kept explicitly so rounding never crosses the wet threshold.
+    """
+    rain_prob = float(params.get('rain_prob', 0))
+    return (
+        resolve_circuit_key(params.get('circuit', 'bahrain')),
+        round(float(params.get('air_temp', 0)), 1),
+        round(float(params.get('track_temp', 0)), 1),
+        round(rain_prob, 1),
+        rain_prob > WET_RAIN_THRESHOLD,
+        round(float(params.get('humidity', 0)), 1),
+        str(params.get('tire', '')),
+        int(params.get('pit_stops', 0)),
+        str(params.get('safety_car', 'none')),
+    )
+
+def telemetry_value(value):
+    """Numeric telemetry value; null or non-numeric input is NaN (missing)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
 class LiveRacePredictor:
-    def __init__(self, model_dir=None, data_path=None):
+    def __init__(self, model_dir=None, data_path=None, use_flat_engine=None, snapshot_path=None):
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.model_dir = model_dir or os.path.join(base_dir, 'models')
         # Assuming data is in ../data relative to backend/
         self.data_path = data_path or os.path.join(base_dir, '..', 'data', 'f1_race_data_prepared.csv')
+        # Local Parquet copy of race_data, refreshed when the DB fingerprint changes
+        snapshot_path = snapshot_path or os.getenv("RACE_DATA_SNAPSHOT") or \
+            os.path.join(os.path.dirname(self.data_path), 'race_data_snapshot.parquet')
+        self.snapshot = RaceDataSnapshot(snapshot_path)
         self.models = {}
+        # Flat NumPy evaluators for the forests (sklearn stays as the fallback)
+        if use_flat_engine is None:
+            use_flat_engine = os.getenv("FLAT_FOREST_ENGINE", "1") != "0"
+        self.use_flat_engine = use_flat_engine
+        self.engines = {}
         self.features = None
         self.historical_data = None
+        self.context_index = None
+        self.form_tables = None
+        self.driver_stats = DriverStatsStore(os.path.join(self.model_dir, 'driver_stats_v5.json'))
+        # Bumped whenever models or historical data are (re)loaded
+        self._resources_version = 0
+        self._synthetic_contexts = {}
         
     def load_resources(self):
         """Load V5 models and data"""
         try:
             print("\n🔄 Loading Model V5 resources...")
+            load_start = time.perf_counter()
             
-            # Load Models
-            self.models['winner'] = joblib.load(f'{self.model_dir}/race_winner_model_v5.pkl')
-            self.models['podium'] = joblib.load(f'{self.model_dir}/podium_model_v5.pkl')
-            self.models['points'] = joblib.load(f'{self.model_dir}/points_model_v5.pkl')
+            # Load Models (memory-mapped .flat artifacts when present and current)
+            for name, filename in MODEL_FILES.items():
+                start = time.perf_counter()
+                self.models[name] = self._load_model(f'{self.model_dir}/{filename}')
+                metrics.set_gauge('resource_load_seconds', time.perf_counter() - start, resource=name)
+            self._resources_version += 1
             print("✅ Loaded Winner, Podium, and Points models")
             
+            # Winner artifact is either the 3-fold calibrated ensemble or a
+            # single forest with a held-out calibrator; both predict the same way
+            winner = self.models['winner']
+            if isinstance(winner, FlatForest):
+                n_forests = len(winner.calibrators)
+            else:
+                n_forests = len(getattr(winner, 'calibrated_classifiers_', [None]))
+            print(f"   Winner model: {n_forests} calibrated forest(s)")
+            
             # Load Features List
             with open(f'{self.model_dir}/model_features_v5.txt', 'r') as f:
                 self.features = [line.strip() for line in f.readlines()]
             print(f"✅ Loaded {len(self.features)} features schema")
             
-            # Load Historical Data (DB or CSV)
-            from sqlalchemy import create_engine
-            from dotenv import load_dotenv
-            load_dotenv()
+            # Load Driver Stats (hot-reloaded on change)
+            self.driver_stats.load()
             
-            db_url = os.getenv("DATABASE_URL")
-            if db_url:
-                try:
-                    print("📡 Connecting to Supabase DB...")
-                    engine = create_engine(db_url)
-                    self.historical_data = pd.read_sql("SELECT * FROM race_data", engine)
-                    print(f"✅ Loaded {len(self.historical_data)} records from Database")
-                except Exception as db_err:
-                    print(f"⚠️ DB Connection failed ({db_err}), falling back to CSV...")
-                    self.historical_data = pd.read_csv(self.data_path)
-                    print(f"✅ Loaded {len(self.historical_data)} records from CSV")
-            else:
-                self.historical_data = pd.read_csv(self.data_path)
-                print(f"✅ Loaded {len(self.historical_data)} records from CSV")
+            # Load Historical Data (snapshot, DB or CSV)
+            start = time.perf_counter()
+            self._load_historical_data()
+            metrics.set_gauge('resource_load_seconds', time.perf_counter() - start, resource='historical_data')
+            
+            if self.use_flat_engine:
+                start = time.perf_counter()
+                self._build_engines()
+                metrics.set_gauge('resource_load_seconds', time.perf_counter() - start, resource='flat_engines')
             
+            metrics.set_gauge('resource_load_seconds', time.perf_counter() - load_start, resource='total')
+            metrics.inc('resource_loads_total')
             return True
         except Exception as e:
             print(f"❌ Error loading resources: {e}")
             return False
 
+    def _load_historical_data(self):
+        """Prefer the local snapshot while the DB fingerprint is unchanged"""
+        from sqlalchemy import create_engine
+        from dotenv import load_dotenv
+        load_dotenv()
+        
+        columns = required_columns(self.features)
+        db_url = os.getenv("DATABASE_URL")
+        if db_url:
+            try:
+                print("📡 Connecting to Supabase DB...")
+                engine = create_engine(db_url)
+                fingerprint = db_fingerprint(engine)
+                data = self.snapshot.load(columns, fingerprint)
+                if data is not None:
+                    self.set_historical_data(data)
+                    print(f"✅ Loaded {len(data)} records from snapshot (DB unchanged)")
+                    return
+                data = read_db_columns(engine, columns)
+                self.set_historical_data(data)
+                print(f"✅ Loaded {len(data)} records from Database")
+                if self.snapshot.save(data, fingerprint, columns):
+                    print(f"💾 Saved race data snapshot to {self.snapshot.path}")
+                return
+            except Exception as db_err:
+                print(f"⚠️ DB Connection failed ({db_err}), falling back to local data...")
+                # Possibly stale, but closer to the DB than the CSV export
+                data = self.snapshot.load(columns)
+                if data is not None:
+                    self.set_historical_data(data)
+                    print(f"✅ Loaded {len(data)} records from snapshot")
+                    return
+        
+        self.set_historical_data(read_csv_columns(self.data_path, columns))
+        print(f"✅ Loaded {len(self.historical_data)} records from CSV")
+
+    def _load_model(self, model_path):
+        """Memory-map the flat artifact if it is up to date, else unpickle"""
+        if self.use_flat_engine and is_current(model_path):
+            try:
+                model = load_flat_model(flat_model_dir(model_path))
+                print(f"✅ Memory-mapped {os.path.basename(flat_model_dir(model_path))}")
+                return model
+            except Exception as e:
+                print(f"⚠️ Flat artifact for {os.path.basename(model_path)} unusable ({e}), loading pickle")
+        return joblib.load(model_path)
+
+    def set_historical_data(self, data):
+        """Swap in new historical data and rebuild the index and derived stats"""
+        context_index = RaceContextIndex(data)
+        form_tables = CircuitFormTables(context_index, CIRCUIT_ID_MAP.values())
+        self.context_index = context_index
+        self.form_tables = form_tables
+        self._synthetic_contexts = {}
+        self.historical_data = data
+        self._resources_version += 1
+
+    @property
+    def version(self):
+        """Changes whenever models, historical data or driver stats are reloaded"""
+        self.driver_stats.poll()
+        return self._resources_version + self.driver_stats.reloads
+
+    @metrics.timed('predict_live')
     def predict_live(self, season, round_num, live_telemetry=None, circuit_id=None):
         """
         Make predictions using Live Telemetry
@@ -87,59 +299,167 @@ class LiveRacePredictor:
         
         return results
 
+    @metrics.timed('predict_simulation')
     def predict_simulation(self, params):
         """
         Adapter for Frontend Simulation Requests
         params: dict with circuit, air_temp, rain_prob, etc.
         """
-        # 1. Dynamic Circuit Mapping
-        circuit_key = params.get('circuit', 'bahrain').lower()
-        
-        # Map to Round Number (2025 Calendar)
-        round_map = {
-            'bahrain': 1, 'jeddah': 2, 'melbourne': 3, 'suzuka': 4, 'shanghai': 5,
-            'miami': 6, 'imola': 7, 'monaco': 8, 'montreal': 9, 'barcelona': 10,
-            'spielberg': 11, 'silverstone': 12, 'hungaroring': 13, 'spa': 14,
-            'zandvoort': 15, 'monza': 16, 'baku': 17, 'singapore': 18,
-            'austin': 19, 'mexico': 20, 'interlagos': 21, 'vegas': 22,
-            'lusail': 23, 'abudhabi': 24
-        }
+        season, round_num, circuit_id, telemetry = self._simulation_inputs(params)
+        return self.predict_live(season, round_num, telemetry, circuit_id)
+
+    @metrics.timed('predict_simulation_batch')
+    def predict_simulation_batch(self, params_list):
+        """
+        Predict many simulation scenarios with a single inference pass per model.
+        Returns one results frame per scenario, identical to predict_simulation.
+        """
+        prepared = []
+        for params in params_list:
+            season, round_num, circuit_id, telemetry = self._simulation_inputs(params)
+            race_data = self._get_race_context(season, round_num, circuit_id)
+            prepared.append(self._merge_telemetry(race_data, telemetry))
         
-        # Map to Database Circuit ID
-        circuit_id_map = {
-            'bahrain': 'bahrain', 'jeddah': 'jeddah', 'melbourne': 'albert_park', 
-            'suzuka': 'suzuka', 'shanghai': 'shanghai', 'miami': 'miami', 
-            'imola': 'imola', 'monaco': 'monaco', 'montreal': 'villeneuve', 
-            'barcelona': 'catalunya', 'spielberg': 'red_bull_ring', 'silverstone': 'silverstone', 
-            'hungaroring': 'hungaroring', 'spa': 'spa', 'zandvoort': 'zandvoort', 
-            'monza': 'monza', 'baku': 'baku', 'singapore': 'marina_bay', 
-            'austin': 'americas', 'mexico': 'rodriguez', 'interlagos': 'interlagos', 
-            'vegas': 'las_vegas', 'lusail': 'losail', 'abudhabi': 'yas_marina'
-        }
+        if not prepared:
+            return []
+        
+        # Stack every scenario's rows into one feature matrix
+        X = pd.concat([data[self.features] for data in prepared], ignore_index=True).fillna(0)
+        win_probs, podium_probs, points_probs = self._predict_probas(X)
+        
+        # Split back per scenario and normalize each independently
+        results = []
+        start = 0
+        for data in prepared:
+            end = start + len(data)
+            results.append(self._rank_results(
+                data, win_probs[start:end], podium_probs[start:end], points_probs[start:end]
+            ))
+            start = end
+        return results
+
+    @metrics.timed('predict_simulation_sweep')
+    def predict_simulation_sweep(self, params, parameter, values):
+        """
+        Predict one scenario with `parameter` set to each of `values`.
+        The race context is built once; each sweep point only rewrites the
+        telemetry feature columns, distinct points share one batched
+        inference. Returns one results frame per value, identical to
+        predict_simulation with that value.
+        """
+        season, round_num, circuit_id, telemetry = self._simulation_inputs(params)
+        race_data = self._get_race_context(season, round_num, circuit_id)
+        base = self._merge_telemetry(race_data.copy(), telemetry)
+        X_base = base[self.features].fillna(0).to_numpy(dtype=np.float64)
+        feature_index = {f: i for i, f in enumerate(self.features)}
 
-        # Handle variations
-        if 'saudi' in circuit_key: circuit_key = 'jeddah'
-        if 'albert' in circuit_key: circuit_key = 'melbourne'
-        if 'red bull' in circuit_key: circuit_key = 'spielberg'
-        if 'qatar' in circuit_key: circuit_key = 'lusail'
-        if 'abu' in circuit_key: circuit_key = 'abudhabi'
+        # Feature rows per distinct point (most sweeps cross few thresholds)
+        blocks = []
+        point_block = []
+        seen = {}
+        for value in values:
+            _, _, _, telemetry = self._simulation_inputs(dict(params, **{parameter: value}))
+            columns = self._telemetry_columns(race_data, telemetry)
+            key = b''.join(v.tobytes() for v in columns.values())
+            if key not in seen:
+                seen[key] = len(blocks)
+                blocks.append(self._with_columns(X_base, columns, feature_index))
+            point_block.append(seen[key])
+
+        X = pd.DataFrame(np.vstack(blocks), columns=self.features)
+        win_probs, podium_probs, points_probs = self._predict_probas(X)
+
+        n = len(base)
+        ranked = [
+            self._rank_results(
+                base, win_probs[b * n:(b + 1) * n], podium_probs[b * n:(b + 1) * n], points_probs[b * n:(b + 1) * n]
+            )
+            for b in range(len(blocks))
+        ]
+        return [ranked[b].copy() for b in point_block]
+
+    @metrics.timed('predict_live_grouped')
+    def predict_live_grouped(self, races):
+        """
+        Score many live snapshots of many races with one batched inference.
+        races: iterable of (season, round_num, circuit_id, snapshots), where
+        snapshots is a list of live_telemetry dicts (e.g. one per lap).
+        Returns one long frame with `race` and `snapshot` indices; within each
+        (race, snapshot) group the columns and ranking match predict_live.
+        """
+        feature_index = {f: i for i, f in enumerate(self.features)}
+        blocks = []
+        frames = []
+        for race_idx, (season, round_num, circuit_id, snapshots) in enumerate(races):
+            if not snapshots:
+                continue
+            race_data = self._get_race_context(season, round_num, circuit_id)
+            if race_data is None or len(race_data) == 0:
+                continue
+            # Pre-race snapshots take predict_live's no-telemetry path
+            live = next((t for t in snapshots if t), None)
+            bases = {
+                True: self._merge_telemetry(race_data.copy(), live) if live else None,
+                False: self._merge_telemetry(race_data.copy(), None) if not all(snapshots) else None,
+            }
+            matrices = {k: b[self.features].fillna(0).to_numpy(dtype=np.float64)
+                        for k, b in bases.items() if b is not None}
+            for snap_idx, telemetry in enumerate(snapshots):
+                if telemetry:
+                    columns = self._telemetry_columns(race_data, telemetry)
+                    blocks.append(self._with_columns(matrices[True], columns, feature_index))
+                else:
+                    blocks.append(matrices[False])
+                frame = bases[bool(telemetry)][['driver_id', 'grid', 'season', 'round']].copy()
+                frame.insert(0, 'snapshot', snap_idx)
+                frame.insert(0, 'race', race_idx)
+                frames.append(frame)
+
+        if not blocks:
+            return pd.DataFrame(columns=['race', 'snapshot', 'driver_id', 'grid', 'season', 'round'])
+        X = pd.DataFrame(np.vstack(blocks), columns=self.features)
+        win_probs, podium_probs, points_probs = self._predict_probas(X)
+        data = pd.concat(frames, ignore_index=True)
+        return self._rank_groups(data, ['race', 'snapshot'], win_probs, podium_probs, points_probs)
+
+    @staticmethod
+    def _with_columns(X_base, columns, feature_index):
+        """Copy of a feature matrix with telemetry columns rewritten"""
+        X = X_base.copy()
+        for col, values in columns.items():
+            if col in feature_index:
+                X[:, feature_index[col]] = np.nan_to_num(values, nan=0.0)
+        return X
+
+    def _simulation_inputs(self, params):
+        """Resolve the circuit and simulate telemetry for a frontend request"""
+        # 1. Dynamic Circuit Mapping
+        circuit_key = resolve_circuit_key(params.get('circuit', 'bahrain'))
         
-        round_num = round_map.get(circuit_key, 1)
-        circuit_id = circuit_id_map.get(circuit_key, circuit_key)
+        round_num = ROUND_MAP.get(circuit_key, 1)
+        circuit_id = CIRCUIT_ID_MAP.get(circuit_key, circuit_key)
         season = 2025
         
-        # 2. Load Data-Driven Stats
-        try:
-            with open(f'{self.model_dir}/driver_stats_v5.json', 'r') as f:
-                driver_stats = json.load(f)
-        except:
-            driver_stats = {} # Fallback
-            
-        # 3. Simulate Telemetry
+        # 2. Simulate Telemetry
         telemetry = {}
-        is_wet = params.get('rain_prob', 0) > 40
-        safety_car = params.get('safety_car', 'none')
-        sc_count = 1 if safety_car != 'none' else 0
+        is_wet = params.get('rain_prob', 0) > WET_RAIN_THRESHOLD
+        safety_car = str(params.get('safety_car', 'none')).lower()
+        sc_count = SAFETY_CAR_COUNTS.get(safety_car, 1)
+        
+        for driver, pace in self.simulation_pace(circuit_key, is_wet).items():
+            telemetry[driver] = {
+                'pace_ratio': pace,
+                'gap_trend': -0.2 if pace < 1.01 else 0,
+                'safety_car_count': sc_count,
+                'rain_prob': params.get('rain_prob', 0)
+            }
+            
+        return season, round_num, circuit_id, telemetry
+
+    def simulation_pace(self, circuit_key, is_wet):
+        """Per-driver pace ratio for a simulated race (lower is faster)"""
+        # Data-Driven Stats (in memory; empty dict falls back to defaults)
+        driver_stats = self.driver_stats.get()
         
         # 2025 Grid
         drivers = [
@@ -155,6 +475,7 @@ class LiveRacePredictor:
             'hulkenberg', 'bortoleto'         # Sauber
         ]
         
+        paces = {}
         for driver in drivers:
             stats = driver_stats.get(driver, {'dry_pace': 1.02, 'wet_pace': 1.05})
             
@@ -171,158 +492,123 @@ class LiveRacePredictor:
                 pace -= 0.01
             if circuit_key == 'zandvoort' and driver == 'max_verstappen':
                 pace -= 0.01
-                
-            telemetry[driver] = {
-                'pace_ratio': pace,
-                'gap_trend': -0.2 if pace < 1.01 else 0,
-                'safety_car_count': sc_count,
-                'rain_prob': params.get('rain_prob', 0)
-            }
-            
-        return self.predict_live(season, round_num, telemetry, circuit_id)
+            paces[driver] = pace
+        return paces
 
+    @metrics.timed('get_race_context')
     def _get_race_context(self, season, round_num, circuit_id=None):
         """Get static race data (grid, history)"""
         # Find race in historical data
-        race_slice = self.historical_data[
-            (self.historical_data['season'] == season) & 
-            (self.historical_data['round'] == round_num)
-        ].copy()
+        race_slice = self.context_index.race(season, round_num)
         
         if len(race_slice) == 0:
             print(f"⚠️  Race not found in history. Generating SMART PREDICTION based on 2025 Form + Track History.")
+            return self._synthetic_context(season, round_num, circuit_id)
             
-            # 1. Calculate Current 2025 Form (Avg Finish Position)
-            current_season_data = self.historical_data[self.historical_data['season'] == 2025]
-            if len(current_season_data) > 0:
-                form = current_season_data.groupby('driver_id')['position'].mean().to_dict()
-            else:
-                # Fallback to 2024 if 2025 not started in data
-                form = self.historical_data[self.historical_data['season'] == 2024].groupby('driver_id')['position'].mean().to_dict()
-                
-            # 2. Calculate Track History (Driver & Team)
-            driver_track_history = {}
-            team_track_history = {}
+        return race_slice
+
+    def _synthetic_context(self, season, round_num, circuit_id=None):
+        """Synthetic grid from form/track tables, memoized until the data changes"""
+        key = (season, round_num, circuit_id)
+        context = self._synthetic_contexts.get(key)
+        if context is None:
+            context = self._build_synthetic_context(season, round_num, circuit_id)
+            if circuit_id is None or self.form_tables.covers(circuit_id):
+                self._synthetic_contexts[key] = context
+        return context.copy()
+
+    def _build_synthetic_context(self, season, round_num, circuit_id=None):
+        """Blend 2025 form with driver/team track history into a grid"""
+        form = self.form_tables.form
+        driver_track_history = {}
+        team_track_history = {}
+        if circuit_id:
+            driver_track_history, team_track_history = self.form_tables.track(circuit_id)
+
+        driver_team_map = DRIVER_TEAM_MAP
+        drivers = list(driver_team_map.keys())
+        synthetic_data = []
+        
+        # Calculate Composite Score for Grid Sorting
+        driver_scores = {}
+        for driver in drivers:
+            team = driver_team_map.get(driver, 'unknown')
             
-            if circuit_id:
-                print(f"📊 Analyzing historical performance at {circuit_id}...")
-                # Look for this circuit in past data (2019-2024)
-                track_data = self.historical_data[
-                    (self.historical_data['circuit_id'] == circuit_id) & 
-                    (self.historical_data['season'] >= 2019)
-                ]
-                
-                if len(track_data) > 0:
-                    # Driver History
-                    driver_track_history = track_data.groupby('driver_id')['position'].mean().to_dict()
-                    
-                    # Team History
-                    team_track_history = track_data.groupby('constructor_id')['position'].mean().to_dict()
-                    
-                    # Boost for wins (Driver)
-                    wins = track_data[track_data['position'] == 1].groupby('driver_id').size().to_dict()
-                    for d, w in wins.items():
-                        if d in driver_track_history:
-                            driver_track_history[d] -= (w * 1.5)
-
-            # 2025 Driver-Team Mapping
-            driver_team_map = {
-                'max_verstappen': 'red_bull', 'tsunoda': 'red_bull',
-                'hamilton': 'ferrari', 'leclerc': 'ferrari',
-                'norris': 'mclaren', 'piastri': 'mclaren',
-                'russell': 'mercedes', 'antonelli': 'mercedes',
-                'alonso': 'aston_martin', 'stroll': 'aston_martin',
-                'gasly': 'alpine', 'colapinto': 'alpine',
-                'albon': 'williams', 'sainz': 'williams',
-                'lawson': 'rb', 'hadjar': 'rb',
-                'ocon': 'haas', 'bearman': 'haas',
-                'hulkenberg': 'sauber', 'bortoleto': 'sauber'
-            }
+            # 1. Current Form Score (50% Weight)
+            # Default to 12.0 (midfield) if no data
+            avg_pos_form = form.get(driver, 12.0)
             
-            drivers = list(driver_team_map.keys())
-            synthetic_data = []
+            # 2. Driver Track History (30% Weight)
+            # Default to current form if no history
+            avg_pos_driver_track = driver_track_history.get(driver, avg_pos_form)
             
-            # Calculate Composite Score for Grid Sorting
-            driver_scores = {}
-            for driver in drivers:
-                team = driver_team_map.get(driver, 'unknown')
-                
-                # 1. Current Form Score (50% Weight)
-                # Default to 12.0 (midfield) if no data
-                avg_pos_form = form.get(driver, 12.0)
-                
-                # 2. Driver Track History (30% Weight)
-                # Default to current form if no history
-                avg_pos_driver_track = driver_track_history.get(driver, avg_pos_form)
-                
-                # 3. Team Track History (20% Weight)
-                # Default to current form if no history
-                avg_pos_team_track = team_track_history.get(team, avg_pos_form)
-                
-                # BLENDED SCORE FORMULA
-                # Lower score is better (position)
-                composite_score = (
-                    (avg_pos_form * 0.5) + 
-                    (avg_pos_driver_track * 0.3) + 
-                    (avg_pos_team_track * 0.2)
-                )
-                
-                # Rookie Penalty (if truly no data anywhere)
-                if driver not in form and driver not in driver_track_history:
-                    composite_score = 16.0 # Rookie default
-                    
-                driver_scores[driver] = composite_score
-
-            # Sort drivers by composite score
-            sorted_drivers = sorted(drivers, key=lambda d: driver_scores.get(d, 15.0))
+            # 3. Team Track History (20% Weight)
+            # Default to current form if no history
+            avg_pos_team_track = team_track_history.get(team, avg_pos_form)
             
-            for i, driver in enumerate(sorted_drivers):
-                score = driver_scores.get(driver, 15.0)
-                team = driver_team_map.get(driver, 'unknown')
-                
-                # Normalize metrics (1.0 is best, 0.0 is worst)
-                performance_score = max(0.1, 1.0 - ((score - 1) / 19.0))
-                
-                # Track Specific Bonus (Final Polish)
-                track_bonus = 0.0
-                if circuit_id:
-                    # Driver loves track
-                    if driver in driver_track_history and driver_track_history[driver] < 4.0:
-                        track_bonus += 0.05
-                    # Team loves track
-                    if team in team_track_history and team_track_history[team] < 4.0:
-                        track_bonus += 0.05
-                
-                final_suitability = min(1.0, performance_score + track_bonus)
+            # BLENDED SCORE FORMULA
+            # Lower score is better (position)
+            composite_score = (
+                (avg_pos_form * 0.5) + 
+                (avg_pos_driver_track * 0.3) + 
+                (avg_pos_team_track * 0.2)
+            )
+            
+            # Rookie Penalty (if truly no data anywhere)
+            if driver not in form and driver not in driver_track_history:
+                composite_score = 16.0 # Rookie default
                 
-                synthetic_data.append({
-                    'season': season,
-                    'round': round_num,
-                    'driver_id': driver,
-                    'constructor_id': team,
-                    'grid': i + 1,
-                    'recent_pace': 1.0 + (score * 0.001), 
-                    'recent_consistency': performance_score,
-                    'experience_years': 5,
-                    'podium_rate': performance_score * 0.5,
-                    'dnf_rate': 0.05,
-                    'avg_pit_stop': 2.5,
-                    'qualifying_performance': performance_score,
-                    'wet_weather_ability': performance_score,
-                    'circuit_suitability': final_suitability,
-                    'reliability_score': 0.9,
-                    'team_strategy_score': 0.8 + (performance_score * 0.1),
-                    'tire_management': 0.8 + (performance_score * 0.1),
-                    'pressure_handling': 0.8 + (performance_score * 0.1),
-                    'overtaking_ability': 0.8 + (performance_score * 0.1),
-                    'defending_ability': 0.8 + (performance_score * 0.1),
-                    'start_performance': 0.8 + (performance_score * 0.1)
-                })
+            driver_scores[driver] = composite_score
+
+        # Sort drivers by composite score
+        sorted_drivers = sorted(drivers, key=lambda d: driver_scores.get(d, 15.0))
+        
+        for i, driver in enumerate(sorted_drivers):
+            score = driver_scores.get(driver, 15.0)
+            team = driver_team_map.get(driver, 'unknown')
             
-            return pd.DataFrame(synthetic_data)
+            # Normalize metrics (1.0 is best, 0.0 is worst)
+            performance_score = max(0.1, 1.0 - ((score - 1) / 19.0))
             
-        return race_slice
+            # Track Specific Bonus (Final Polish)
+            track_bonus = 0.0
+            if circuit_id:
+                # Driver loves track
+                if driver in driver_track_history and driver_track_history[driver] < 4.0:
+                    track_bonus += 0.05
+                # Team loves track
+                if team in team_track_history and team_track_history[team] < 4.0:
+                    track_bonus += 0.05
+            
+            final_suitability = min(1.0, performance_score + track_bonus)
+            
+            synthetic_data.append({
+                'season': season,
+                'round': round_num,
+                'driver_id': driver,
+                'constructor_id': team,
+                'grid': i + 1,
+                'recent_pace': 1.0 + (score * 0.001), 
+                'recent_consistency': performance_score,
+                'experience_years': 5,
+                'podium_rate': performance_score * 0.5,
+                'dnf_rate': 0.05,
+                'avg_pit_stop': 2.5,
+                'qualifying_performance': performance_score,
+                'wet_weather_ability': performance_score,
+                'circuit_suitability': final_suitability,
+                'reliability_score': 0.9,
+                'team_strategy_score': 0.8 + (performance_score * 0.1),
+                'tire_management': 0.8 + (performance_score * 0.1),
+                'pressure_handling': 0.8 + (performance_score * 0.1),
+                'overtaking_ability': 0.8 + (performance_score * 0.1),
+                'defending_ability': 0.8 + (performance_score * 0.1),
+                'start_performance': 0.8 + (performance_score * 0.1)
+            })
+        
+        return pd.DataFrame(synthetic_data)
 
+    @metrics.timed('merge_telemetry')
     def _merge_telemetry(self, race_df, telemetry):
         """Merge live telemetry into race dataframe"""
         if not telemetry:
@@ -337,16 +623,8 @@ class LiveRacePredictor:
             race_df['has_telemetry'] = 0
         else:
             print("✅  Using LIVE TELEMETRY for prediction.")
-            # Map telemetry to rows
-            for idx, row in race_df.iterrows():
-                driver = row['driver_id']
-                if driver in telemetry:
-                    t = telemetry[driver]
-                    race_df.at[idx, 'pace_ratio'] = t.get('pace_ratio', row['recent_pace'])
-                    race_df.at[idx, 'gap_trend'] = t.get('gap_trend', 0)
-                    race_df.at[idx, 'num_pit_stops'] = t.get('pit_stops', 0)
-                    race_df.at[idx, 'overtakes_made'] = t.get('overtakes', 0)
-                    race_df.at[idx, 'has_telemetry'] = 1
+            for col, values in self._telemetry_columns(race_df, telemetry).items():
+                race_df[col] = values
         
         # Ensure all model features exist
         for feat in self.features:
@@ -355,21 +633,102 @@ class LiveRacePredictor:
                 
         return race_df
 
+    def _telemetry_columns(self, race_df, telemetry):
+        """
+        Align a driver_id -> telemetry dict with race_df rows, one array per
+        feature column. Drivers without telemetry keep their existing values.
+        """
+        rows = [telemetry.get(d) for d in race_df['driver_id'].tolist()]
+        n = len(rows)
+        has = np.fromiter((r is not None for r in rows), dtype=bool, count=n)
+
+        if 'recent_pace' in race_df.columns:
+            pace_default = race_df['recent_pace'].to_numpy(dtype=float)
+        else:
+            pace_default = np.full(n, np.nan)
+
+        columns = {}
+        for key, col, default in TELEMETRY_FIELDS:
+            values = np.fromiter(
+                (telemetry_value(r.get(key)) if r is not None else np.nan for r in rows),
+                dtype=float, count=n
+            )
+            missing = np.isnan(values)
+            if missing.any():
+                values[missing] = pace_default[missing] if default is None else default
+            columns[col] = values
+        columns['has_telemetry'] = np.ones(n)
+
+        if has.all():
+            return columns
+
+        for col, values in columns.items():
+            existing = race_df[col].to_numpy(dtype=float) if col in race_df.columns else np.full(n, np.nan)
+            columns[col] = np.where(has, values, existing)
+        return columns
+
+    @metrics.timed('run_inference')
     def _run_inference(self, data):
         """Run the ensemble models"""
         # Ensure no NaNs in features
         X = data[self.features].fillna(0)
         
-        # Get probabilities from all models
+        win_probs, podium_probs, points_probs = self._predict_probas(X)
+        return self._rank_results(data, win_probs, podium_probs, points_probs)
+
+    def _predict_probas(self, X):
+        """Get probabilities from all models"""
+        if self.engines:
+            values = X.to_numpy(dtype=np.float32)
+            return tuple(
+                self.engines[name].predict_positive(values) if name in self.engines
+                else self.models[name].predict_proba(X)[:, 1]
+                for name in ('winner', 'podium', 'points')
+            )
+        
         win_probs = self.models['winner'].predict_proba(X)[:, 1]
         podium_probs = self.models['podium'].predict_proba(X)[:, 1]
         points_probs = self.models['points'].predict_proba(X)[:, 1]
+        return win_probs, podium_probs, points_probs
+
+    def _build_engines(self):
+        """Flatten each model and keep it only if it agrees with sklearn"""
+        self.engines = {}
+        sample = self.historical_data.reindex(columns=self.features).head(200).fillna(0)
         
+        for name, model in self.models.items():
+            if isinstance(model, FlatForest):
+                # Loaded from a .flat artifact, already verified at conversion
+                self.engines[name] = model
+                continue
+            try:
+                engine = FlatForest.from_sklearn(model)
+                if engine.feature_names is not None and engine.feature_names != list(self.features):
+                    raise ValueError("feature order differs from model_features_v5.txt")
+                if len(sample) > 0:
+                    diff = np.abs(engine.predict_positive(sample.to_numpy(dtype=np.float32))
+                                  - model.predict_proba(sample)[:, 1]).max()
+                    if diff > 1e-9:
+                        raise ValueError(f"max deviation {diff:.2e} from sklearn")
+                self.engines[name] = engine
+            except Exception as e:
+                print(f"⚠️ Flat engine disabled for {name} model ({e}), using sklearn")
+        
+        if self.engines:
+            print(f"✅ Flat forest engine active for: {', '.join(self.engines)}")
+
+    def _rank_results(self, data, win_probs, podium_probs, points_probs):
+        """Normalize one race's probabilities and rank the drivers"""
         # Create results dataframe
         results = data[['driver_id', 'grid', 'season', 'round']].copy()
+        if 'dnf_rate' in data.columns:
+            # Per-driver reliability from the race context, for the simulators
+            results['dnf_rate'] = data['dnf_rate'].to_numpy()
         results['win_prob'] = win_probs
         results['podium_prob'] = podium_probs
         results['points_prob'] = points_probs
+        # Calibrated model output before sharpening (used by the Monte Carlo simulator)
+        results['model_win_prob'] = win_probs
         
         # --- CALIBRATION & NORMALIZATION ---
         # 1. Normalize Win Probabilities to sum to 100%
@@ -398,6 +757,31 @@ class LiveRacePredictor:
         
         return results
 
+    def _rank_groups(self, data, group_cols, win_probs, podium_probs, points_probs):
+        """_rank_results applied to every group of a long frame at once"""
+        results = data.copy()
+        groups = [results[c] for c in group_cols]
+        results['win_prob'] = win_probs
+        results['podium_prob'] = podium_probs
+        results['points_prob'] = points_probs
+        results['model_win_prob'] = win_probs
+        
+        # Same sharpening and scaling as _rank_results, per group
+        sharpened = results['win_prob'] ** 3.0
+        results['win_prob'] = sharpened / sharpened.groupby(groups).transform('sum') * 100
+        low = results['podium_prob'].groupby(groups).transform('max') < 0.1
+        results['podium_prob'] = results['podium_prob'].where(~low, results['podium_prob'] * 10) * 100
+        results['score'] = (
+            (results['win_prob'] * 0.5) +
+            (results['podium_prob'] * 0.3) +
+            (results['points_prob'] * 0.2)
+        )
+        # Stable descending sort within each group (ties keep row order)
+        results['predicted_position'] = results['score'].groupby(groups).rank(
+            method='first', ascending=False
+        ).astype(int)
+        return results.sort_values(group_cols + ['predicted_position'], kind='stable').reset_index(drop=True)
+
 if __name__ == "__main__":
     # Test Run
     predictor = LiveRacePredictor()
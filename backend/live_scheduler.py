@@ -0,0 +1,138 @@
+"""
+Live Re-prediction Scheduler
+Decides when a live session actually needs a fresh predict_live call.
+Most polls only nudge gaps by a few hundredths, which does not move any
+feature the forests split on, so re-scoring on every intervals row burns CPU.
+
+An update re-scores when:
+  - a feature column moved past its threshold for any driver since the last inference
+  - the leader starts a new lap
+  - a pit stop is recorded
+and otherwise keeps serving the previous results. Counters report how many
+inferences ran (by trigger) and how many were skipped.
+"""
+
+from starlette.concurrency import run_in_threadpool
+
+from live_predictor import TELEMETRY_FIELDS
+from metrics import metrics
+
+# Minimum absolute change per model feature column that triggers a re-score
+DEFAULT_THRESHOLDS = {
+    'pace_ratio': 0.002,
+    'gap_trend': 0.05,
+    'num_pit_stops': 0.5,
+    'overtakes_made': 0.5,
+    'safety_car_count': 0.5,
+}
+
+metrics.describe('live_inferences_total', 'Live re-predictions run, by trigger')
+metrics.describe('live_inferences_skipped_total', 'Live updates that did not need a re-prediction')
+
+
+class LiveScheduler:
+    def __init__(self, predictor, season, round_num, circuit_id=None, thresholds=None):
+        self.predictor = predictor
+        self.season = season
+        self.round_num = round_num
+        self.circuit_id = circuit_id
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.ingestor = None
+        self.latest = None
+        self.sequence = 0
+        self.inferred = 0
+        self.skipped = 0
+        self.triggers = {}
+        self.last_changed = []
+        self._last_values = None
+        self._last_lap = 0
+        self._last_pits = 0
+
+    @staticmethod
+    def feature_values(telemetry):
+        """column -> {driver_id: value} for the telemetry fields the model uses"""
+        return {
+            col: {driver: entry.get(key) for driver, entry in telemetry.items()}
+            for key, col, _ in TELEMETRY_FIELDS
+        }
+
+    def changed_columns(self, values):
+        """Feature columns that moved past their threshold for any driver"""
+        if self._last_values is None:
+            return list(values)
+        changed = []
+        for col, by_driver in values.items():
+            last = self._last_values.get(col, {})
+            threshold = self.thresholds.get(col, 0.0)
+            for driver, value in by_driver.items():
+                previous = last.get(driver)
+                if value is None or previous is None:
+                    moved = (value is None) != (previous is None)
+                else:
+                    moved = abs(value - previous) > threshold
+                if moved:
+                    changed.append(col)
+                    break
+        return changed
+
+    def triggers_for(self, telemetry, values):
+        """Reasons to re-score now (empty list = keep the last results)"""
+        lap = max((entry.get('lap') or 0 for entry in telemetry.values()), default=0)
+        pits = sum(entry.get('pit_stops') or 0 for entry in telemetry.values())
+        changed = self.changed_columns(values)
+
+        reasons = []
+        if self.latest is None:
+            reasons.append('initial')
+        if lap > self._last_lap:
+            reasons.append('lap')
+        if pits > self._last_pits:
+            reasons.append('pit')
+        if changed and self.latest is not None:
+            reasons.append('delta')
+        return reasons, changed, lap, pits
+
+    def update(self, telemetry, force=False):
+        """Re-score if the telemetry changed meaningfully; returns the latest results"""
+        values = self.feature_values(telemetry)
+        reasons, changed, lap, pits = self.triggers_for(telemetry, values)
+        if force:
+            reasons.append('forced')
+        if not reasons:
+            self.skipped += 1
+            metrics.inc('live_inferences_skipped_total')
+            return self.latest
+
+        results = self.predictor.predict_live(self.season, self.round_num, telemetry, self.circuit_id)
+        self.latest = results
+        self.sequence += 1
+        self.inferred += 1
+        self.last_changed = changed
+        self._last_values = values
+        self._last_lap = lap
+        self._last_pits = pits
+        trigger = reasons[0]
+        self.triggers[trigger] = self.triggers.get(trigger, 0) + 1
+        metrics.inc('live_inferences_total', trigger=trigger)
+        return results
+
+    def attach(self, ingestor):
+        """Re-evaluate after every LiveIngestor poll that returned new rows"""
+        self.ingestor = ingestor
+        ingestor.add_listener(self.on_poll)
+
+    async def on_poll(self, new_rows):
+        if not any(new_rows.values()):
+            return
+        await run_in_threadpool(self.update, self.ingestor.snapshot())
+
+    def stats(self):
+        evaluated = self.inferred + self.skipped
+        return {
+            'inferred': self.inferred,
+            'skipped': self.skipped,
+            'skip_rate': round(self.skipped / evaluated, 4) if evaluated else 0.0,
+            'triggers': dict(self.triggers),
+            'last_changed': list(self.last_changed),
+            'sequence': self.sequence,
+        }
@@ -0,0 +1,217 @@
+"""
+Live Prediction Fan-out (Server-Sent Events)
+One prediction stream per OpenF1 session_key, shared by every subscriber.
+- the first subscriber starts a LiveIngestor + LiveScheduler for the session,
+  the last one to leave stops them
+- each new prediction is serialized to an SSE frame once and the same bytes
+  are queued for every subscriber
+- subscriber queues are bounded; a slow consumer loses its oldest pending
+  frames (counted as dropped) instead of holding up the session or growing memory
+- late joiners immediately receive the most recent frame
+- a session is started outside the hub lock, so a slow OpenF1 response for
+  one session does not hold up subscribers of the others; a session is bound
+  to the race (season, round, circuit) of its first subscriber and other
+  race parameters are rejected
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from live_ingestor import LiveIngestor
+from live_scheduler import LiveScheduler
+from metrics import metrics
+
+# Frames buffered per subscriber before the oldest is dropped
+QUEUE_SIZE = int(os.getenv("LIVE_STREAM_QUEUE", "16"))
+# Comment frame sent when nothing was published for this long (keeps proxies from closing)
+KEEPALIVE_SECONDS = 15.0
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+metrics.describe('live_stream_subscribers', 'Open SSE subscribers across live sessions')
+metrics.describe('live_stream_frames_dropped_total', 'Frames dropped for slow SSE subscribers')
+
+
+class LiveSessionConflict(ValueError):
+    """Subscribe parameters differ from the race the session is already streaming"""
+
+
+def sse_frame(event, data, event_id=None):
+    """Encode one Server-Sent Events frame"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Subscriber:
+    __slots__ = ('queue', 'dropped', 'sent')
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+        self.sent = 0
+
+    def offer(self, frame):
+        """Queue a frame, evicting the oldest one if the consumer is behind"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.dropped += 1
+            metrics.inc('live_stream_frames_dropped_total')
+        self.queue.put_nowait(frame)
+
+
+class SessionBroadcaster:
+    """Ingest, schedule and fan out predictions for one session"""
+
+    def __init__(self, session_key, predictor, render, season, round_num, circuit_id, queue_size=QUEUE_SIZE):
+        self.session_key = session_key
+        self.race = (season, round_num, circuit_id)
+        self.render = render
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.latest_frame = None
+        self.published = 0
+        self.dropped_total = 0
+        self.ingestor = LiveIngestor(session_key)
+        self.scheduler = LiveScheduler(predictor, season, round_num, circuit_id)
+        self.scheduler.attach(self.ingestor)
+        # Registered after the scheduler, so it sees each poll's re-prediction
+        self.ingestor.add_listener(self._after_poll)
+        self._sent_sequence = 0
+        self.starting = None
+
+    async def start(self):
+        await self.ingestor.start()
+
+    def ensure_started(self):
+        """Start once; every subscriber awaits the same task (shielded from their cancellation)"""
+        if self.starting is None:
+            self.starting = asyncio.ensure_future(self.start())
+        return asyncio.shield(self.starting)
+
+    async def close(self):
+        if self.starting is not None and not self.starting.done():
+            self.starting.cancel()
+        await self.ingestor.close()
+
+    async def _after_poll(self, new_rows):
+        if self.scheduler.sequence != self._sent_sequence:
+            self._sent_sequence = self.scheduler.sequence
+            self.publish(self.scheduler.latest)
+
+    def publish(self, results):
+        """Serialize once, enqueue the same bytes for every subscriber"""
+        payload = {
+            'session_key': self.session_key,
+            'sequence': self.scheduler.sequence,
+            'lap': self.ingestor.state.leader_lap,
+            'published_at': time.time(),
+            'predictions': self.render(results),
+        }
+        frame = sse_frame('prediction', payload, event_id=self.scheduler.sequence)
+        self.latest_frame = frame
+        self.published += 1
+        for subscriber in self.subscribers:
+            subscriber.offer(frame)
+
+    def subscribe(self):
+        subscriber = Subscriber(self.queue_size)
+        if self.latest_frame is not None:
+            subscriber.offer(self.latest_frame)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+        self.dropped_total += subscriber.dropped
+
+    def stats(self):
+        return {
+            'subscribers': len(self.subscribers),
+            'published': self.published,
+            'dropped': self.dropped_total + sum(s.dropped for s in self.subscribers),
+            'ingestor': self.ingestor.stats(),
+            'scheduler': self.scheduler.stats(),
+        }
+
+
+class LiveHub:
+    """session_key -> SessionBroadcaster, created on first subscribe and closed with the last"""
+
+    def __init__(self, predictor, render):
+        self.predictor = predictor
+        self.render = render
+        self.sessions = {}
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, session_key, season, round_num, circuit_id):
+        """Register a subscriber, starting the session if needed; returns the Subscriber"""
+        async with self._lock:
+            broadcaster = self.sessions.get(session_key)
+            if broadcaster is None:
+                broadcaster = SessionBroadcaster(
+                    session_key, self.predictor, self.render, season, round_num, circuit_id
+                )
+                self.sessions[session_key] = broadcaster
+                print(f"📡 Live stream started for session {session_key}")
+            elif broadcaster.race != (season, round_num, circuit_id):
+                raise LiveSessionConflict(
+                    f"Session {session_key} is streaming season {broadcaster.race[0]} round "
+                    f"{broadcaster.race[1]} ({broadcaster.race[2]})"
+                )
+            subscriber = broadcaster.subscribe()
+            metrics.set_gauge('live_stream_subscribers', self.subscriber_count())
+
+        # Network calls (driver list) happen outside the hub lock
+        try:
+            await broadcaster.ensure_started()
+        except BaseException:
+            await self.unsubscribe(session_key, subscriber)
+            raise
+        return subscriber
+
+    async def unsubscribe(self, session_key, subscriber):
+        closing = None
+        async with self._lock:
+            broadcaster = self.sessions.get(session_key)
+            if broadcaster is None or subscriber not in broadcaster.subscribers:
+                return
+            broadcaster.unsubscribe(subscriber)
+            if not broadcaster.subscribers:
+                del self.sessions[session_key]
+                closing = broadcaster
+            metrics.set_gauge('live_stream_subscribers', self.subscriber_count())
+        if closing is not None:
+            await closing.close()
+            print(f"🏁 Live stream stopped for session {session_key}")
+
+    async def stream(self, session_key, subscriber):
+        """Async iterator of SSE frames for a subscriber returned by subscribe()"""
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    frame = KEEPALIVE_FRAME
+                subscriber.sent += 1
+                yield frame
+        finally:
+            await self.unsubscribe(session_key, subscriber)
+
+    def subscriber_count(self):
+        return sum(len(b.subscribers) for b in self.sessions.values())
+
+    async def close(self):
+        for broadcaster in list(self.sessions.values()):
+            await broadcaster.close()
+        self.sessions.clear()
+
+    def stats(self):
+        return {key: broadcaster.stats() for key, broadcaster in self.sessions.items()}
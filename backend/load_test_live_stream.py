@@ -0,0 +1,100 @@
+"""
+Load test for /live/{session_key}/stream
+Opens many concurrent SSE subscribers against one API worker and reports
+connection success, frames delivered per subscriber and publish-to-receive
+latency. A share of subscribers can read slowly to exercise the drop-oldest
+backpressure (their drops show up in the server's /live/stats).
+
+Run (replaying a recorded session through the OpenF1 stand-in):
+    OPENF1_STUB_DIR=../data/openf1_final STUB_SPEED=20 uvicorn openf1_stub:app --port 8020
+    OPENF1_BASE_URL=http://localhost:8020/v1 uvicorn main:app --port 8000 --workers 1
+    python load_test_live_stream.py --session-key 9158 --circuit silverstone --subscribers 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import numpy as np
+
+
+async def subscriber(client, url, stats, stop_at, slow_delay):
+    received = 0
+    latencies = []
+    try:
+        async with client.stream('GET', url) as response:
+            if response.status_code != 200:
+                stats['http_errors'] += 1
+                return
+            stats['connected'] += 1
+            async for line in response.aiter_lines():
+                if line.startswith('data:'):
+                    received += 1
+                    published_at = json.loads(line[5:]).get('published_at')
+                    if published_at:
+                        latencies.append(time.time() - published_at)
+                    if slow_delay:
+                        await asyncio.sleep(slow_delay)
+                if time.monotonic() >= stop_at:
+                    break
+    except (httpx.HTTPError, asyncio.TimeoutError):
+        stats['errors'] += 1
+    finally:
+        stats['received'].append(received)
+        stats['latencies'].extend(latencies)
+
+
+async def run(args):
+    url = f"{args.url.rstrip('/')}/live/{args.session_key}/stream?circuit={args.circuit}"
+    stats = {'connected': 0, 'http_errors': 0, 'errors': 0, 'received': [], 'latencies': []}
+    limits = httpx.Limits(max_connections=args.subscribers + 10, max_keepalive_connections=args.subscribers + 10)
+    timeout = httpx.Timeout(connect=30.0, read=None, write=30.0, pool=None)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        stop_at = time.monotonic() + args.duration
+        n_slow = int(args.subscribers * args.slow_share)
+        tasks = [
+            asyncio.create_task(subscriber(
+                client, url, stats, stop_at, args.slow_delay if i < n_slow else 0.0
+            ))
+            for i in range(args.subscribers)
+        ]
+        await asyncio.sleep(args.duration)
+        server_stats = (await client.get(f"{args.url.rstrip('/')}/live/stats")).json()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    received = np.array(stats['received'])
+    latencies = np.array(stats['latencies']) * 1000
+    session = server_stats.get(str(args.session_key), {})
+
+    print("=" * 60)
+    print(f"📡 {args.subscribers} subscribers, {args.duration:.0f}s, {n_slow} slow readers")
+    print(f"   Connected:      {stats['connected']} (HTTP errors {stats['http_errors']}, failures {stats['errors']})")
+    print(f"   Published:      {session.get('published', 0)} frames, server subscribers {session.get('subscribers', 0)}")
+    if len(received):
+        print(f"   Frames/sub:     min {received.min()}  median {np.median(received):.0f}  max {received.max()}")
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"   Latency (ms):   p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {latencies.max():.1f}")
+    print(f"   Dropped frames: {session.get('dropped', 0)}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE fan-out load test")
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--session-key', type=int, required=True)
+    parser.add_argument('--circuit', default='silverstone')
+    parser.add_argument('--subscribers', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=60.0)
+    parser.add_argument('--slow-share', type=float, default=0.05, help='fraction of subscribers reading slowly')
+    parser.add_argument('--slow-delay', type=float, default=5.0, help='seconds a slow subscriber waits per frame')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
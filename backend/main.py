@@ -1,12 +1,28 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 import os
-import requests
+import numpy as np
 from dotenv import load_dotenv
-from live_predictor import LiveRacePredictor
-from datetime import datetime, timedelta
+from live_predictor import (
+    LiveRacePredictor, simulation_cache_key, resolve_circuit_key, CIRCUIT_ID_MAP, ROUND_MAP, WET_RAIN_THRESHOLD
+)
+from prediction_cache import PredictionCache
+from weather_forecast import ForecastService
+from metrics import metrics, RequestMetricsMiddleware
+import profiler
+from singleflight import SingleFlight
+from live_stream import LiveHub, LiveSessionConflict
+from montecarlo import MonteCarloSimulator
+from race_simulator import RaceSimulator
+from championship import project_championship
+from trajectories import TrajectoryStore
+from strategy_optimizer import StrategyOptimizer, conditions_bucket, load_driver_degradation, order_stints
+from circuit_metadata import get_circuit_features
 
 # Load environment variables
 load_dotenv()
@@ -22,9 +38,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request latency for /metrics
+app.add_middleware(RequestMetricsMiddleware, registry=metrics)
+
+# Opt-in per-request profiling (only installed when PROFILE_SECRET is set)
+profiler.install(app)
+
 # Initialize predictor
 predictor = LiveRacePredictor()
 
+# Cache for identical simulation requests (invalidated on model/data reload)
+prediction_cache = PredictionCache(
+    max_size=int(os.getenv("PREDICTION_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("PREDICTION_CACHE_TTL", "600"))
+)
+
+# Strategy results per (circuit, conditions bucket)
+strategy_cache = PredictionCache(max_size=256, ttl=3600)
+
+# Championship projections per (n_samples, seed), recomputed when race data reloads
+championship_cache = PredictionCache(max_size=32, ttl=3600)
+
+# Per-driver tire wear from collect_telemetry_comprehensive.py output (optional)
+driver_degradation = load_driver_degradation(os.getenv("STRATEGY_DEGRADATION_CSV"))
+
+# Concurrent identical /predict misses share one computation
+prediction_flight = SingleFlight()
+
+# One live prediction stream per OpenF1 session, fanned out over SSE
+live_hub = LiveHub(predictor, lambda results_df: jsonable_encoder(build_predictions(results_df)))
+
+# Lap-by-lap predictions for recorded sessions (precomputed by trajectories.py)
+trajectory_store = TrajectoryStore()
+
 # Circuit Coordinates
 CIRCUIT_LOCATIONS = {
     'bahrain': {'lat': 26.0325, 'lon': 50.5106},
@@ -53,6 +99,44 @@ CIRCUIT_LOCATIONS = {
     'abudhabi': {'lat': 24.4672, 'lon': 54.6031}
 }
 
+# Comprehensive Circuit Data (Laps & Dates based on 2025 calendar)
+CIRCUIT_DEFAULTS = {
+    'bahrain': {'laps': 57, 'date': '02 Mar 2025', 'weather_summary': 'Clear Night', 'air_temp': 26, 'track_temp': 32, 'rain_prob': 0, 'humidity': 45, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'low'},
+    'jeddah': {'laps': 50, 'date': '09 Mar 2025', 'weather_summary': 'Hot & Humid', 'air_temp': 28, 'track_temp': 35, 'rain_prob': 0, 'humidity': 60, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'high'},
+    'melbourne': {'laps': 58, 'date': '16 Mar 2025', 'weather_summary': 'Partly Cloudy', 'air_temp': 22, 'track_temp': 35, 'rain_prob': 10, 'humidity': 55, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'high'},
+    'suzuka': {'laps': 53, 'date': '06 Apr 2025', 'weather_summary': 'Cool & Overcast', 'air_temp': 18, 'track_temp': 28, 'rain_prob': 30, 'humidity': 65, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'medium'},
+    'shanghai': {'laps': 56, 'date': '23 Mar 2025', 'weather_summary': 'Hazy Sunshine', 'air_temp': 20, 'track_temp': 30, 'rain_prob': 40, 'humidity': 70, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
+    'miami': {'laps': 57, 'date': '04 May 2025', 'weather_summary': 'Sunny & Hot', 'air_temp': 29, 'track_temp': 45, 'rain_prob': 20, 'humidity': 60, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'medium'},
+    'imola': {'laps': 63, 'date': '18 May 2025', 'weather_summary': 'Chance of Rain', 'air_temp': 22, 'track_temp': 35, 'rain_prob': 30, 'humidity': 60, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'high'},
+    'monaco': {'laps': 78, 'date': '25 May 2025', 'weather_summary': 'Sunny Intervals', 'air_temp': 23, 'track_temp': 40, 'rain_prob': 10, 'humidity': 65, 'tire': 'soft', 'pit_stops': 1, 'safety_car': 'high'},
+    'montreal': {'laps': 70, 'date': '15 Jun 2025', 'weather_summary': 'Windy', 'air_temp': 20, 'track_temp': 30, 'rain_prob': 40, 'humidity': 55, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'high'},
+    'barcelona': {'laps': 66, 'date': '01 Jun 2025', 'weather_summary': 'Sunny', 'air_temp': 26, 'track_temp': 42, 'rain_prob': 5, 'humidity': 50, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'low'},
+    'spielberg': {'laps': 71, 'date': '29 Jun 2025', 'weather_summary': 'Mountain Weather', 'air_temp': 24, 'track_temp': 40, 'rain_prob': 30, 'humidity': 50, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
+    'silverstone': {'laps': 52, 'date': '06 Jul 2025', 'weather_summary': 'Typical British Summer', 'air_temp': 19, 'track_temp': 30, 'rain_prob': 45, 'humidity': 70, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'medium'},
+    'hungaroring': {'laps': 70, 'date': '03 Aug 2025', 'weather_summary': 'Scorching Heat', 'air_temp': 28, 'track_temp': 45, 'rain_prob': 20, 'humidity': 45, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'},
+    'spa': {'laps': 44, 'date': '27 Jul 2025', 'weather_summary': 'Mixed Conditions', 'air_temp': 18, 'track_temp': 28, 'rain_prob': 45, 'humidity': 70, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
+    'zandvoort': {'laps': 72, 'date': '31 Aug 2025', 'weather_summary': 'Coastal Winds', 'air_temp': 19, 'track_temp': 30, 'rain_prob': 35, 'humidity': 75, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'},
+    'monza': {'laps': 53, 'date': '07 Sep 2025', 'weather_summary': 'Warm & Dry', 'air_temp': 26, 'track_temp': 42, 'rain_prob': 15, 'humidity': 55, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'low'},
+    'baku': {'laps': 51, 'date': '21 Sep 2025', 'weather_summary': 'Clear Skies', 'air_temp': 25, 'track_temp': 38, 'rain_prob': 10, 'humidity': 50, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'high'},
+    'singapore': {'laps': 62, 'date': '05 Oct 2025', 'weather_summary': 'Tropical Heat', 'air_temp': 30, 'track_temp': 35, 'rain_prob': 60, 'humidity': 85, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'high'},
+    'austin': {'laps': 56, 'date': '19 Oct 2025', 'weather_summary': 'Sunny', 'air_temp': 27, 'track_temp': 40, 'rain_prob': 10, 'humidity': 40, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
+    'mexico': {'laps': 71, 'date': '26 Oct 2025', 'weather_summary': 'High Altitude Sun', 'air_temp': 22, 'track_temp': 35, 'rain_prob': 15, 'humidity': 40, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'medium'},
+    'interlagos': {'laps': 71, 'date': '09 Nov 2025', 'weather_summary': 'Unpredictable', 'air_temp': 24, 'track_temp': 40, 'rain_prob': 40, 'humidity': 60, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'high'},
+    'vegas': {'laps': 50, 'date': '22 Nov 2025', 'weather_summary': 'Cold Desert Night', 'air_temp': 15, 'track_temp': 20, 'rain_prob': 0, 'humidity': 30, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'high'},
+    'lusail': {'laps': 57, 'date': '30 Nov 2025', 'weather_summary': 'Warm Night', 'air_temp': 28, 'track_temp': 35, 'rain_prob': 0, 'humidity': 60, 'tire': 'hard', 'pit_stops': 3, 'safety_car': 'medium'},
+    'abudhabi': {'laps': 58, 'date': '07 Dec 2025', 'weather_summary': 'Twilight Clear', 'air_temp': 25, 'track_temp': 32, 'rain_prob': 0, 'humidity': 50, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'}
+}
+
+# Used when a circuit is not on the calendar
+FALLBACK_DEFAULTS = {
+    'laps': 55, 'date': 'TBD', 'weather_summary': 'Unknown',
+    'air_temp': 25, 'track_temp': 35, 'rain_prob': 20, 'humidity': 50,
+    'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'
+}
+
+# Shared async forecast client + per-circuit cache
+forecast_service = ForecastService(CIRCUIT_LOCATIONS)
+
 # Pydantic models
 class SimulationRequest(BaseModel):
     circuit: str
@@ -60,6 +144,8 @@ class SimulationRequest(BaseModel):
     track_temp: float
     rain_prob: float
     humidity: float
+    # Start tire and stop count only shape /simulate/race; the /predict model
+    # has no strategy features, so there they do not change the prediction
     tire: str
     pit_stops: int
     safety_car: str
@@ -77,6 +163,173 @@ class PredictionResponse(BaseModel):
     circuit: str
     conditions: dict
 
+class MonteCarloRequest(SimulationRequest):
+    n_samples: int = 100000
+    seed: Optional[int] = None
+
+class MonteCarloDriver(BaseModel):
+    driver_id: str
+    constructor_id: str
+    win_probability: float
+    podium_probability: float
+    points_probability: float
+    dnf_probability: float
+    expected_points: float
+    expected_position: float
+    position_distribution: List[float]
+
+class MonteCarloResponse(BaseModel):
+    circuit: str
+    conditions: dict
+    n_samples: int
+    mean_safety_cars: float
+    drivers: List[MonteCarloDriver]
+    # head_to_head[i][j] = P(drivers[i] finishes ahead of drivers[j])
+    head_to_head: List[List[float]]
+
+class RaceSimulationRequest(SimulationRequest):
+    n_samples: int = 2000
+    seed: Optional[int] = None
+
+class RaceSimulationDriver(BaseModel):
+    driver_id: str
+    constructor_id: str
+    grid: int
+    win_probability: float
+    podium_probability: float
+    dnf_probability: float
+    expected_points: float
+    expected_position: float
+    median_gap_seconds: Optional[float]
+    mean_pit_stops: float
+    position_distribution: List[float]
+    mean_position_by_lap: List[float]
+
+class RaceSimulationResponse(BaseModel):
+    circuit: str
+    conditions: dict
+    laps: int
+    strategy: List[str]
+    n_samples: int
+    mean_safety_cars: float
+    drivers: List[RaceSimulationDriver]
+
+class StintItem(BaseModel):
+    compound: str
+    laps: int
+
+class StrategyItem(BaseModel):
+    stops: int
+    stints: List[StintItem]
+    pit_laps: List[int]
+    time_loss: float
+    delta_to_best: float
+
+class DriverStrategy(BaseModel):
+    driver_id: str
+    constructor_id: str
+    wear_factor: float
+    best_stops: int
+    strategies: List[StrategyItem]
+
+class StrategyResponse(BaseModel):
+    circuit: str
+    laps: int
+    wet: bool
+    track_temp_bucket: int
+    safety_car: str
+    pit_loss: float
+    drivers: List[DriverStrategy]
+
+class PointsPercentiles(BaseModel):
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+class StandingProjection(BaseModel):
+    id: str
+    current_points: float
+    title_probability: float
+    expected_points: float
+    points_std: float
+    points_percentiles: PointsPercentiles
+    expected_final_position: float
+
+class RoundItem(BaseModel):
+    round: int
+    circuit: str
+
+class ChampionshipResponse(BaseModel):
+    season: int
+    n_samples: int
+    completed_rounds: List[int]
+    remaining_rounds: List[RoundItem]
+    drivers: List[StandingProjection]
+    constructors: List[StandingProjection]
+
+class SweepRequest(SimulationRequest):
+    parameter: str
+    values: Optional[List[Union[float, str]]] = None
+    steps: int = 21
+
+class SweepPoint(BaseModel):
+    value: Union[float, str]
+    predictions: List[PredictionItem]
+
+class SweepDriver(BaseModel):
+    driver_id: str
+    constructor_id: str
+    win_probability: List[float]
+    podium_probability: List[float]
+    position: List[int]
+
+class SweepResponse(BaseModel):
+    circuit: str
+    parameter: str
+    conditions: dict
+    values: List[Union[float, str]]
+    points: List[SweepPoint]
+    drivers: List[SweepDriver]
+
+class TrajectoryDriver(BaseModel):
+    driver_id: str
+    win_probability: List[float]
+    position: List[int]
+
+class TrajectoryResponse(BaseModel):
+    session_key: int
+    season: int
+    round: int
+    laps: List[int]
+    predicted_winner: List[str]
+    drivers: List[TrajectoryDriver]
+
+class BatchSimulationRequest(BaseModel):
+    scenarios: List[SimulationRequest]
+
+class BatchPredictionResponse(BaseModel):
+    results: List[PredictionResponse]
+
+# Upper bound on scenarios per /predict/batch call
+MAX_BATCH_SCENARIOS = int(os.getenv("MAX_BATCH_SCENARIOS", "200"))
+MAX_MONTECARLO_SAMPLES = int(os.getenv("MAX_MONTECARLO_SAMPLES", "500000"))
+MAX_RACE_SIM_SAMPLES = int(os.getenv("MAX_RACE_SIM_SAMPLES", "20000"))
+MAX_RACE_SIM_PIT_STOPS = 5
+MAX_SWEEP_POINTS = int(os.getenv("MAX_SWEEP_POINTS", "200"))
+
+# Default sweep grids: numeric ranges (swept in `steps` points) and categorical levels.
+# Only inputs that reach the model's features are listed: rain_prob switches
+# wet/dry pace, safety_car sets safety_car_count
+SWEEP_RANGES = {'rain_prob': (0, 100)}
+SWEEP_LEVELS = {'safety_car': ['none', 'low', 'medium', 'high']}
+# Accepted by /predict but not part of the simulated feature vector, so a
+# sweep over them would only return flat curves
+UNSWEEPABLE = ('air_temp', 'track_temp', 'humidity', 'tire', 'pit_stops')
+
+MAX_CHAMPIONSHIP_SAMPLES = int(os.getenv("MAX_CHAMPIONSHIP_SAMPLES", "100000"))
+
 # 2025 Constructor Mapping
 def get_constructor_2025(driver_id):
     mapping = {
@@ -93,121 +346,70 @@ def get_constructor_2025(driver_id):
     }
     return mapping.get(driver_id, 'unknown')
 
-def fetch_forecast_weather(circuit_key, race_date_str):
-    """
-    Fetch 5-day forecast from OpenWeather API if race is upcoming.
-    race_date_str format: "DD Mon YYYY" (e.g. "30 Nov 2025")
-    """
-    api_key = os.getenv("OPENWEATHER")
-    if not api_key:
-        return None
-        
-    coords = CIRCUIT_LOCATIONS.get(circuit_key)
-    if not coords:
-        return None
-        
-    try:
-        # Parse Race Date
-        race_date = datetime.strptime(race_date_str, "%d %b %Y")
-        now = datetime.now()
-        
-        # Check if race is within next 5 days (OpenWeather Free Limit)
-        delta = (race_date - now).days
-        
-        if 0 <= delta <= 5:
-            print(f"🌤️ Fetching FORECAST for {circuit_key} on {race_date_str}...")
-            url = f"https://api.openweathermap.org/data/2.5/forecast?lat={coords['lat']}&lon={coords['lon']}&appid={api_key}&units=metric"
-            response = requests.get(url, timeout=2)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Find forecast closest to 14:00 on race day
-                target_date = race_date.strftime("%Y-%m-%d")
-                best_match = None
-                
-                for item in data['list']:
-                    dt_txt = item['dt_txt'] # "2025-11-30 15:00:00"
-                    if target_date in dt_txt and "15:00" in dt_txt:
-                        best_match = item
-                        break
-                
-                # Fallback to any time on that day
-                if not best_match:
-                    for item in data['list']:
-                        if target_date in dt_txt:
-                            best_match = item
-                            break
-                            
-                if best_match:
-                    temp = best_match['main']['temp']
-                    humidity = best_match['main']['humidity']
-                    clouds = best_match['clouds']['all']
-                    
-                    # Estimate Rain
-                    rain_prob = 0
-                    if 'rain' in best_match:
-                        rain_prob = 80
-                    elif clouds > 70:
-                        rain_prob = 30
-                    elif clouds > 90:
-                        rain_prob = 50
-                        
-                    summary = best_match['weather'][0]['description'].title()
-                    
-                    print(f"✅ Forecast found: {temp}°C, {summary}")
-                    
-                    return {
-                        'air_temp': round(temp, 1),
-                        'track_temp': round(temp + 10, 1),
-                        'rain_prob': rain_prob,
-                        'humidity': humidity,
-                        'weather_summary': f"{summary} (Forecast)"
-                    }
-        else:
-            print(f"ℹ️ Race date {race_date_str} is not within 5-day forecast range.")
-            
-    except Exception as e:
-        print(f"❌ Weather Forecast Error: {e}")
-        
-    return None
+def build_predictions(results_df):
+    """Convert ranked predictor output into response items"""
+    predictions = []
+    for _, row in results_df.iterrows():
+        predictions.append(PredictionItem(
+            position=int(row['predicted_position']),
+            driver_id=row['driver_id'],
+            constructor_id=get_constructor_2025(row['driver_id']),
+            win_probability=float(row['win_prob']),
+            podium_probability=float(row['podium_prob']),
+            confidence=float(row['score'])
+        ))
+    return predictions
 
 @app.on_event("startup")
 async def startup_event():
     print("🚀 Starting F1 Prediction API (Model V5)...")
     if predictor.load_resources():
         print("✅ Live Predictor V5 ready!")
+    await forecast_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await forecast_service.close()
+    await live_hub.close()
 
 @app.get("/")
 async def root():
     return {"message": "F1 Prediction API V5 (Live)", "status": "running"}
 
+def get_simulation_params(request):
+    return {
+        'circuit': request.circuit,
+        'air_temp': request.air_temp,
+        'track_temp': request.track_temp,
+        'rain_prob': request.rain_prob,
+        'humidity': request.humidity,
+        'tire': request.tire,
+        'pit_stops': request.pit_stops,
+        'safety_car': request.safety_car
+    }
+
+def compute_predictions(simulation_params, cache_key, version):
+    """Run one simulation and cache its response items (called in the thread pool)"""
+    with profiler.profiled_thread():
+        results_df = predictor.predict_simulation(simulation_params)
+        with metrics.timer('build_response'):
+            predictions = build_predictions(results_df)
+    prediction_cache.put(cache_key, predictions, version)
+    return predictions
+
 @app.post("/predict", response_model=PredictionResponse)
 async def predict_race(request: SimulationRequest):
+    """Model ranking for the scenario; `tire` and `pit_stops` are ignored (see /simulate/race)"""
     try:
-        simulation_params = {
-            'circuit': request.circuit,
-            'air_temp': request.air_temp,
-            'track_temp': request.track_temp,
-            'rain_prob': request.rain_prob,
-            'humidity': request.humidity,
-            'tire': request.tire,
-            'pit_stops': request.pit_stops,
-            'safety_car': request.safety_car
-        }
-        
-        results_df = predictor.predict_simulation(simulation_params)
+        simulation_params = get_simulation_params(request)
         
-        predictions = []
-        for _, row in results_df.iterrows():
-            predictions.append(PredictionItem(
-                position=int(row['predicted_position']),
-                driver_id=row['driver_id'],
-                constructor_id=get_constructor_2025(row['driver_id']),
-                win_probability=float(row['win_prob']),
-                podium_probability=float(row['podium_prob']),
-                confidence=float(row['score'])
-            ))
+        cache_key = simulation_cache_key(simulation_params)
+        version = predictor.version
+        predictions = prediction_cache.get(cache_key, version)
+        if predictions is None:
+            predictions = await prediction_flight.run(
+                (cache_key, version), compute_predictions, simulation_params, cache_key, version
+            )
         
         return PredictionResponse(
             predictions=predictions,
@@ -218,36 +420,478 @@ async def predict_race(request: SimulationRequest):
         print(f"❌ Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/defaults/{circuit}")
-async def get_circuit_defaults(circuit: str):
-    # Comprehensive Circuit Data (Laps & Dates based on 2025 calendar)
-    circuit_defaults = {
-        'bahrain': {'laps': 57, 'date': '02 Mar 2025', 'weather_summary': 'Clear Night', 'air_temp': 26, 'track_temp': 32, 'rain_prob': 0, 'humidity': 45, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'low'},
-        'jeddah': {'laps': 50, 'date': '09 Mar 2025', 'weather_summary': 'Hot & Humid', 'air_temp': 28, 'track_temp': 35, 'rain_prob': 0, 'humidity': 60, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'high'},
-        'melbourne': {'laps': 58, 'date': '16 Mar 2025', 'weather_summary': 'Partly Cloudy', 'air_temp': 22, 'track_temp': 35, 'rain_prob': 10, 'humidity': 55, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'high'},
-        'suzuka': {'laps': 53, 'date': '06 Apr 2025', 'weather_summary': 'Cool & Overcast', 'air_temp': 18, 'track_temp': 28, 'rain_prob': 30, 'humidity': 65, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'medium'},
-        'shanghai': {'laps': 56, 'date': '23 Mar 2025', 'weather_summary': 'Hazy Sunshine', 'air_temp': 20, 'track_temp': 30, 'rain_prob': 40, 'humidity': 70, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
-        'miami': {'laps': 57, 'date': '04 May 2025', 'weather_summary': 'Sunny & Hot', 'air_temp': 29, 'track_temp': 45, 'rain_prob': 20, 'humidity': 60, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'medium'},
-        'imola': {'laps': 63, 'date': '18 May 2025', 'weather_summary': 'Chance of Rain', 'air_temp': 22, 'track_temp': 35, 'rain_prob': 30, 'humidity': 60, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'high'},
-        'monaco': {'laps': 78, 'date': '25 May 2025', 'weather_summary': 'Sunny Intervals', 'air_temp': 23, 'track_temp': 40, 'rain_prob': 10, 'humidity': 65, 'tire': 'soft', 'pit_stops': 1, 'safety_car': 'high'},
-        'montreal': {'laps': 70, 'date': '15 Jun 2025', 'weather_summary': 'Windy', 'air_temp': 20, 'track_temp': 30, 'rain_prob': 40, 'humidity': 55, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'high'},
-        'barcelona': {'laps': 66, 'date': '01 Jun 2025', 'weather_summary': 'Sunny', 'air_temp': 26, 'track_temp': 42, 'rain_prob': 5, 'humidity': 50, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'low'},
-        'spielberg': {'laps': 71, 'date': '29 Jun 2025', 'weather_summary': 'Mountain Weather', 'air_temp': 24, 'track_temp': 40, 'rain_prob': 30, 'humidity': 50, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
-        'silverstone': {'laps': 52, 'date': '06 Jul 2025', 'weather_summary': 'Typical British Summer', 'air_temp': 19, 'track_temp': 30, 'rain_prob': 45, 'humidity': 70, 'tire': 'hard', 'pit_stops': 2, 'safety_car': 'medium'},
-        'hungaroring': {'laps': 70, 'date': '03 Aug 2025', 'weather_summary': 'Scorching Heat', 'air_temp': 28, 'track_temp': 45, 'rain_prob': 20, 'humidity': 45, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'},
-        'spa': {'laps': 44, 'date': '27 Jul 2025', 'weather_summary': 'Mixed Conditions', 'air_temp': 18, 'track_temp': 28, 'rain_prob': 45, 'humidity': 70, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
-        'zandvoort': {'laps': 72, 'date': '31 Aug 2025', 'weather_summary': 'Coastal Winds', 'air_temp': 19, 'track_temp': 30, 'rain_prob': 35, 'humidity': 75, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'},
-        'monza': {'laps': 53, 'date': '07 Sep 2025', 'weather_summary': 'Warm & Dry', 'air_temp': 26, 'track_temp': 42, 'rain_prob': 15, 'humidity': 55, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'low'},
-        'baku': {'laps': 51, 'date': '21 Sep 2025', 'weather_summary': 'Clear Skies', 'air_temp': 25, 'track_temp': 38, 'rain_prob': 10, 'humidity': 50, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'high'},
-        'singapore': {'laps': 62, 'date': '05 Oct 2025', 'weather_summary': 'Tropical Heat', 'air_temp': 30, 'track_temp': 35, 'rain_prob': 60, 'humidity': 85, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'high'},
-        'austin': {'laps': 56, 'date': '19 Oct 2025', 'weather_summary': 'Sunny', 'air_temp': 27, 'track_temp': 40, 'rain_prob': 10, 'humidity': 40, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'medium'},
-        'mexico': {'laps': 71, 'date': '26 Oct 2025', 'weather_summary': 'High Altitude Sun', 'air_temp': 22, 'track_temp': 35, 'rain_prob': 15, 'humidity': 40, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'medium'},
-        'interlagos': {'laps': 71, 'date': '09 Nov 2025', 'weather_summary': 'Unpredictable', 'air_temp': 24, 'track_temp': 40, 'rain_prob': 40, 'humidity': 60, 'tire': 'soft', 'pit_stops': 2, 'safety_car': 'high'},
-        'vegas': {'laps': 50, 'date': '22 Nov 2025', 'weather_summary': 'Cold Desert Night', 'air_temp': 15, 'track_temp': 20, 'rain_prob': 0, 'humidity': 30, 'tire': 'medium', 'pit_stops': 1, 'safety_car': 'high'},
-        'lusail': {'laps': 57, 'date': '30 Nov 2025', 'weather_summary': 'Warm Night', 'air_temp': 28, 'track_temp': 35, 'rain_prob': 0, 'humidity': 60, 'tire': 'hard', 'pit_stops': 3, 'safety_car': 'medium'},
-        'abudhabi': {'laps': 58, 'date': '07 Dec 2025', 'weather_summary': 'Twilight Clear', 'air_temp': 25, 'track_temp': 32, 'rain_prob': 0, 'humidity': 50, 'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'}
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_race_batch(batch: BatchSimulationRequest):
+    if len(batch.scenarios) > MAX_BATCH_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many scenarios ({len(batch.scenarios)}), max is {MAX_BATCH_SCENARIOS}"
+        )
+    
+    try:
+        version = predictor.version
+        all_params = [get_simulation_params(request) for request in batch.scenarios]
+        keys = [simulation_cache_key(params) for params in all_params]
+        
+        # Serve repeats from the cache; run every distinct miss in one batch
+        predictions_by_key = {}
+        pending = {}
+        for key, params in zip(keys, all_params):
+            if key in predictions_by_key or key in pending:
+                continue
+            cached = prediction_cache.get(key, version)
+            if cached is not None:
+                predictions_by_key[key] = cached
+            else:
+                pending[key] = params
+        
+        if pending:
+            results = await run_in_threadpool(predictor.predict_simulation_batch, list(pending.values()))
+            for key, results_df in zip(pending.keys(), results):
+                with metrics.timer('build_response'):
+                    predictions = build_predictions(results_df)
+                prediction_cache.put(key, predictions, version)
+                predictions_by_key[key] = predictions
+        
+        return BatchPredictionResponse(results=[
+            PredictionResponse(
+                predictions=predictions_by_key[key],
+                circuit=request.circuit,
+                conditions=params
+            )
+            for request, params, key in zip(batch.scenarios, all_params, keys)
+        ])
+    except Exception as e:
+        print(f"❌ Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def sweep_values(request):
+    """Validated sweep grid for a /predict/sweep request"""
+    sweepable = sorted(SWEEP_RANGES) + sorted(SWEEP_LEVELS)
+    if request.parameter in UNSWEEPABLE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"'{request.parameter}' does not feed the model's features, so predictions would not change "
+                   f"across a sweep; sweepable parameters: {sweepable}"
+        )
+    if request.parameter in SWEEP_LEVELS:
+        levels = SWEEP_LEVELS[request.parameter]
+        values = [str(v).lower() for v in (request.values or levels)]
+        unknown = [v for v in values if v not in levels]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown {request.parameter} levels {unknown}, use {levels}")
+        return values
+    if request.parameter not in SWEEP_RANGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sweep '{request.parameter}', use one of {sweepable}"
+        )
+    if request.values is not None:
+        try:
+            values = [float(v) for v in request.values]
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"{request.parameter} values must be numeric")
+    else:
+        low, high = SWEEP_RANGES[request.parameter]
+        values = np.linspace(low, high, max(request.steps, 1)).tolist()
+    return values
+
+def run_sweep(simulation_params, parameter, values):
+    """One shared context and batched inference for every sweep point (called in the thread pool)"""
+    with profiler.profiled_thread():
+        results = predictor.predict_simulation_sweep(simulation_params, parameter, values)
+        with metrics.timer('build_response'):
+            return [build_predictions(results_df) for results_df in results]
+
+@app.post("/predict/sweep", response_model=SweepResponse)
+async def predict_sweep(request: SweepRequest):
+    values = sweep_values(request)
+    if not 1 <= len(values) <= MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep needs between 1 and {MAX_SWEEP_POINTS} points, got {len(values)}"
+        )
+    
+    try:
+        simulation_params = get_simulation_params(request)
+        points = await run_in_threadpool(run_sweep, simulation_params, request.parameter, values)
+        
+        # Per-driver curves across the sweep, in the first point's finishing order
+        curves = {}
+        for predictions in points:
+            for item in predictions:
+                curve = curves.setdefault(item.driver_id, SweepDriver(
+                    driver_id=item.driver_id, constructor_id=item.constructor_id,
+                    win_probability=[], podium_probability=[], position=[]
+                ))
+                curve.win_probability.append(item.win_probability)
+                curve.podium_probability.append(item.podium_probability)
+                curve.position.append(item.position)
+        
+        return SweepResponse(
+            circuit=request.circuit,
+            parameter=request.parameter,
+            conditions=simulation_params,
+            values=values,
+            points=[SweepPoint(value=v, predictions=p) for v, p in zip(values, points)],
+            drivers=list(curves.values())
+        )
+    except Exception as e:
+        print(f"❌ Sweep error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def run_montecarlo(simulation_params, n_samples, seed):
+    """Score the scenario once, then sample finishing orders (called in the thread pool)"""
+    with profiler.profiled_thread():
+        results_df = predictor.predict_simulation(simulation_params)
+        simulator = MonteCarloSimulator(
+            results_df['driver_id'], results_df['model_win_prob'], results_df.get('dnf_rate')
+        )
+        with metrics.timer('montecarlo'):
+            outcome = simulator.run(
+                n_samples,
+                safety_car=simulation_params['safety_car'],
+                rain_prob=simulation_params['rain_prob'],
+                seed=seed
+            )
+    
+    drivers = [
+        MonteCarloDriver(
+            driver_id=driver_id,
+            constructor_id=get_constructor_2025(driver_id),
+            win_probability=float(outcome['win_probs'][i] * 100),
+            podium_probability=float(outcome['podium_probs'][i] * 100),
+            points_probability=float(outcome['points_probs'][i] * 100),
+            dnf_probability=float(outcome['dnf_probs'][i] * 100),
+            expected_points=float(outcome['expected_points'][i]),
+            expected_position=float(outcome['expected_position'][i]),
+            position_distribution=outcome['position_probs'][i].round(5).tolist()
+        )
+        for i, driver_id in enumerate(outcome['driver_ids'])
+    ]
+    # Most expected points first, keeping the head-to-head matrix aligned
+    order = sorted(range(len(drivers)), key=lambda i: -drivers[i].expected_points)
+    head_to_head = outcome['head_to_head'][np.ix_(order, order)].round(5).tolist()
+    return [drivers[i] for i in order], head_to_head, outcome['mean_safety_cars']
+
+@app.post("/simulate/montecarlo", response_model=MonteCarloResponse)
+async def simulate_montecarlo(request: MonteCarloRequest):
+    if not 1 <= request.n_samples <= MAX_MONTECARLO_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"n_samples must be between 1 and {MAX_MONTECARLO_SAMPLES}"
+        )
+    
+    try:
+        simulation_params = get_simulation_params(request)
+        drivers, head_to_head, mean_safety_cars = await run_in_threadpool(
+            run_montecarlo, simulation_params, request.n_samples, request.seed
+        )
+        return MonteCarloResponse(
+            circuit=request.circuit,
+            conditions=simulation_params,
+            n_samples=request.n_samples,
+            mean_safety_cars=mean_safety_cars,
+            drivers=drivers,
+            head_to_head=head_to_head
+        )
+    except Exception as e:
+        print(f"❌ Monte Carlo error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def run_race_simulation(simulation_params, n_samples, seed):
+    """Lap-by-lap simulation from the model's grid (called in the thread pool)"""
+    with profiler.profiled_thread():
+        circuit_key = resolve_circuit_key(simulation_params['circuit'])
+        laps = CIRCUIT_DEFAULTS.get(circuit_key, FALLBACK_DEFAULTS)['laps']
+        is_wet = simulation_params['rain_prob'] > WET_RAIN_THRESHOLD
+        
+        # Start from the context's grid; pace from driver stats
+        results_df = predictor.predict_simulation(simulation_params)
+        grid = results_df.sort_values('grid', kind='stable')['driver_id'].tolist()
+        paces = predictor.simulation_pace(circuit_key, is_wet)
+        # Per-driver reliability from the race context (NaN = default rate)
+        dnf_rates = dict(zip(results_df['driver_id'], results_df['dnf_rate'])) if 'dnf_rate' in results_df else {}
+        simulator = RaceSimulator(
+            list(paces.keys()), list(paces.values()),
+            CIRCUIT_ID_MAP.get(circuit_key, circuit_key), laps, grid=grid,
+            dnf_rates=[dnf_rates.get(d, np.nan) for d in paces],
+            deg_factors=[driver_degradation.get(d, 1.0) for d in paces]
+        )
+        with metrics.timer('race_simulation'):
+            outcome = simulator.run(
+                n_samples,
+                tire=str(simulation_params['tire']).lower(),
+                pit_stops=simulation_params['pit_stops'],
+                safety_car=simulation_params['safety_car'],
+                rain_prob=simulation_params['rain_prob'],
+                wet=is_wet,
+                seed=seed
+            )
+    
+    drivers = []
+    for i, driver_id in enumerate(outcome['driver_ids']):
+        median_gap = outcome['median_gap'][i]
+        drivers.append(RaceSimulationDriver(
+            driver_id=driver_id,
+            constructor_id=get_constructor_2025(driver_id),
+            grid=int(simulator.grid_slot[i] + 1),
+            win_probability=float(outcome['win_probs'][i] * 100),
+            podium_probability=float(outcome['podium_probs'][i] * 100),
+            dnf_probability=float(outcome['dnf_probs'][i] * 100),
+            expected_points=float(outcome['expected_points'][i]),
+            expected_position=float(outcome['expected_position'][i]),
+            median_gap_seconds=None if np.isnan(median_gap) else float(median_gap),
+            mean_pit_stops=float(outcome['mean_stops'][i]),
+            position_distribution=outcome['position_probs'][i].round(5).tolist(),
+            mean_position_by_lap=outcome['mean_position_by_lap'][i].round(3).tolist()
+        ))
+    drivers.sort(key=lambda d: d.expected_position)
+    return drivers, outcome
+
+@app.post("/simulate/race", response_model=RaceSimulationResponse)
+async def simulate_race(request: RaceSimulationRequest):
+    if not 1 <= request.n_samples <= MAX_RACE_SIM_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"n_samples must be between 1 and {MAX_RACE_SIM_SAMPLES}"
+        )
+    # Pit laps fall on laps 2..laps-1, one stop per lap at most
+    laps = CIRCUIT_DEFAULTS.get(resolve_circuit_key(request.circuit), FALLBACK_DEFAULTS)['laps']
+    max_stops = min(MAX_RACE_SIM_PIT_STOPS, laps - 2)
+    if not 0 <= request.pit_stops <= max_stops:
+        raise HTTPException(
+            status_code=400,
+            detail=f"pit_stops must be between 0 and {max_stops}"
+        )
+    
+    try:
+        simulation_params = get_simulation_params(request)
+        drivers, outcome = await run_in_threadpool(
+            run_race_simulation, simulation_params, request.n_samples, request.seed
+        )
+        return RaceSimulationResponse(
+            circuit=request.circuit,
+            conditions=simulation_params,
+            laps=outcome['laps'],
+            strategy=outcome['strategy'],
+            n_samples=request.n_samples,
+            mean_safety_cars=outcome['mean_safety_cars'],
+            drivers=drivers
+        )
+    except Exception as e:
+        print(f"❌ Race simulation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def compute_strategies(circuit, bucket, start_tire):
+    """Optimize 1-3 stop strategies for every driver (called in the thread pool)"""
+    circuit_key, wet, track_temp, safety_car = bucket
+    laps = CIRCUIT_DEFAULTS.get(circuit_key, FALLBACK_DEFAULTS)['laps']
+    tire_stress = get_circuit_features(CIRCUIT_ID_MAP.get(circuit_key, circuit_key))['tire_stress']
+    driver_ids = list(predictor.simulation_pace(circuit_key, wet).keys())
+    wear = [driver_degradation.get(d, 1.0) for d in driver_ids]
+    
+    with profiler.profiled_thread(), metrics.timer('strategy_optimizer'):
+        optimizer = StrategyOptimizer(laps, tire_stress, wet=wet, track_temp=track_temp, safety_car=safety_car)
+        results = optimizer.optimize(wear)
+    
+    drivers = []
+    for driver_id, factor, by_stops in zip(driver_ids, wear, results):
+        best = min(option['time_loss'] for option in by_stops.values())
+        strategies = []
+        for stops, option in sorted(by_stops.items()):
+            stints, pit_laps = order_stints(option['stints'], start_tire)
+            strategies.append(StrategyItem(
+                stops=stops,
+                stints=[StintItem(compound=compound, laps=length) for compound, length in stints],
+                pit_laps=pit_laps,
+                time_loss=round(option['time_loss'], 3),
+                delta_to_best=round(option['time_loss'] - best, 3)
+            ))
+        drivers.append(DriverStrategy(
+            driver_id=driver_id,
+            constructor_id=get_constructor_2025(driver_id),
+            wear_factor=factor,
+            best_stops=min(by_stops, key=lambda k: by_stops[k]['time_loss']),
+            strategies=strategies
+        ))
+    
+    return StrategyResponse(
+        circuit=circuit,
+        laps=laps,
+        wet=wet,
+        track_temp_bucket=track_temp,
+        safety_car=safety_car,
+        pit_loss=round(optimizer.pit_loss, 3),
+        drivers=drivers
+    )
+
+@app.get("/strategy/{circuit}", response_model=StrategyResponse)
+async def get_strategy(circuit: str, track_temp: Optional[float] = None, rain_prob: Optional[float] = None,
+                       safety_car: Optional[str] = None, start_tire: Optional[str] = None):
+    circuit_key = resolve_circuit_key(circuit)
+    defaults = CIRCUIT_DEFAULTS.get(circuit_key, FALLBACK_DEFAULTS)
+    bucket = conditions_bucket(
+        circuit_key,
+        defaults['track_temp'] if track_temp is None else track_temp,
+        defaults['rain_prob'] if rain_prob is None else rain_prob,
+        safety_car or defaults['safety_car'],
+        WET_RAIN_THRESHOLD
+    )
+    start_tire = (start_tire or defaults['tire']).lower()
+    
+    try:
+        cache_key = bucket + (start_tire,)
+        version = predictor.version
+        response = strategy_cache.get(cache_key, version)
+        if response is None:
+            response = await run_in_threadpool(compute_strategies, circuit, bucket, start_tire)
+            strategy_cache.put(cache_key, response, version)
+        return response
+    except Exception as e:
+        print(f"❌ Strategy error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def compute_championship(n_samples, seed):
+    """Project the rest of the season from the calendar defaults (called in the thread pool)"""
+    round_params = {
+        circuit_key: {'circuit': circuit_key, **CIRCUIT_DEFAULTS.get(circuit_key, FALLBACK_DEFAULTS)}
+        for circuit_key in ROUND_MAP
     }
+    with profiler.profiled_thread(), metrics.timer('championship_projection'):
+        return ChampionshipResponse(**project_championship(
+            predictor, ROUND_MAP, round_params, n_samples=n_samples, seed=seed
+        ))
+
+@app.get("/championship/projection", response_model=ChampionshipResponse)
+async def championship_projection(n_samples: int = 20000, seed: Optional[int] = None):
+    if not 1 <= n_samples <= MAX_CHAMPIONSHIP_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"n_samples must be between 1 and {MAX_CHAMPIONSHIP_SAMPLES}"
+        )
     
+    try:
+        # Version bumps when models or race data reload, invalidating old projections
+        cache_key = (n_samples, seed)
+        version = predictor.version
+        response = championship_cache.get(cache_key, version)
+        if response is None:
+            response = await run_in_threadpool(compute_championship, n_samples, seed)
+            championship_cache.put(cache_key, response, version)
+        return response
+    except Exception as e:
+        print(f"❌ Championship projection error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def build_trajectory(session_key, rows):
+    """Per-driver series over the session's laps (a lap without a row reads as 0% / last place)"""
+    laps = sorted(rows['lap'].unique().tolist())
+    lap_index = {lap: i for i, lap in enumerate(laps)}
+    n_drivers = rows['driver_id'].nunique()
+    winners = rows[rows['predicted_position'] == 1].set_index('lap')['driver_id']
+
+    drivers = []
+    final = rows[rows['lap'] == laps[-1]].sort_values('predicted_position')
+    order = final['driver_id'].tolist() + sorted(set(rows['driver_id']) - set(final['driver_id']))
+    for driver_id, group in rows.groupby('driver_id', sort=False):
+        win = [0.0] * len(laps)
+        position = [n_drivers] * len(laps)
+        for lap, prob, pos in zip(group['lap'], group['win_prob'], group['predicted_position']):
+            win[lap_index[lap]] = round(float(prob), 2)
+            position[lap_index[lap]] = int(pos)
+        drivers.append(TrajectoryDriver(driver_id=driver_id, win_probability=win, position=position))
+    drivers.sort(key=lambda d: order.index(d.driver_id))
+
+    return TrajectoryResponse(
+        session_key=session_key,
+        season=int(rows['season'].iloc[0]),
+        round=int(rows['round'].iloc[0]),
+        laps=laps,
+        predicted_winner=[str(winners.get(lap, '')) for lap in laps],
+        drivers=drivers
+    )
+
+@app.get("/trajectories/{session_key}", response_model=TrajectoryResponse)
+async def trajectories(session_key: int):
+    """How the predicted winner evolved lap by lap in a recorded session"""
+    if not trajectory_store.available:
+        raise HTTPException(status_code=503, detail="Prediction trajectories have not been computed (run trajectories.py)")
+    rows = trajectory_store.get(session_key)
+    if rows is None:
+        raise HTTPException(status_code=404, detail=f"No trajectory for session {session_key}")
+    return build_trajectory(session_key, rows)
+
+@app.get("/live/{session_key}/stream")
+async def live_stream(session_key: int, circuit: str, season: int = 2025):
+    """Server-Sent Events: a `prediction` event whenever the live session is re-scored"""
+    circuit_key = resolve_circuit_key(circuit)
+    try:
+        subscriber = await live_hub.subscribe(
+            session_key, season, ROUND_MAP.get(circuit_key, 1), CIRCUIT_ID_MAP.get(circuit_key, circuit_key)
+        )
+    except LiveSessionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        print(f"❌ Live stream error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(
+        live_hub.stream(session_key, subscriber),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.get("/live/stats")
+async def live_stats():
+    return live_hub.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        'predictions': prediction_cache.stats(),
+        'forecasts': forecast_service.stats(),
+        'strategies': strategy_cache.stats(),
+        'championship': championship_cache.stats(),
+        'inflight': prediction_flight.stats()
+    }
+
+def cache_metrics():
+    """Cache and in-flight stats for the /metrics scrape"""
+    predictions = prediction_cache.stats()
+    forecasts = forecast_service.stats()
+    flight = prediction_flight.stats()
+    return [
+        ('cache_hits_total', 'counter', 'Cache hits',
+         [({'cache': 'predictions'}, predictions['hits']), ({'cache': 'forecasts'}, forecasts['hits'])]),
+        ('cache_misses_total', 'counter', 'Cache misses',
+         [({'cache': 'predictions'}, predictions['misses']), ({'cache': 'forecasts'}, forecasts['misses'])]),
+        ('cache_entries', 'gauge', 'Entries currently cached',
+         [({'cache': 'predictions'}, predictions['size']), ({'cache': 'forecasts'}, forecasts['entries'])]),
+        ('prediction_cache_evictions_total', 'counter', 'LRU evictions', [({}, predictions['evictions'])]),
+        ('prediction_cache_expirations_total', 'counter', 'TTL expirations', [({}, predictions['expirations'])]),
+        ('prediction_cache_invalidations_total', 'counter', 'Clears after a model/data reload',
+         [({}, predictions['invalidations'])]),
+        ('forecast_refreshes_total', 'counter', 'Background forecast refreshes', [({}, forecasts['background_refreshes'])]),
+        ('forecast_errors_total', 'counter', 'Failed forecast fetches', [({}, forecasts['errors'])]),
+        ('predictions_inflight', 'gauge', 'Distinct /predict computations currently running',
+         [({}, flight['inflight'])]),
+        ('predictions_inflight_max', 'gauge', 'Peak concurrent /predict computations',
+         [({}, flight['max_inflight'])]),
+        ('prediction_executions_total', 'counter', '/predict computations started',
+         [({}, flight['executions'])]),
+        ('prediction_coalesced_total', 'counter', '/predict requests that joined an in-flight computation',
+         [({}, flight['coalesced'])]),
+        ('resources_version', 'gauge', 'Model/data version used for cache invalidation', [({}, predictor.version)]),
+    ]
+
+metrics.register_collector(cache_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/defaults/{circuit}")
+async def get_circuit_defaults(circuit: str):
     circuit_key = circuit.lower()
     if 'saudi' in circuit_key: circuit_key = 'jeddah'
     if 'albert' in circuit_key: circuit_key = 'melbourne'
@@ -255,15 +899,12 @@ async def get_circuit_defaults(circuit: str):
     if 'mexico' in circuit_key: circuit_key = 'mexico'
     if 'brazil' in circuit_key: circuit_key = 'interlagos'
     
-    defaults = circuit_defaults.get(circuit_key, {
-        'laps': 55, 'date': 'TBD', 'weather_summary': 'Unknown',
-        'air_temp': 25, 'track_temp': 35, 'rain_prob': 20, 'humidity': 50,
-        'tire': 'medium', 'pit_stops': 2, 'safety_car': 'low'
-    })
+    # Copy: the forecast below must not leak into the shared table
+    defaults = dict(CIRCUIT_DEFAULTS.get(circuit_key, FALLBACK_DEFAULTS))
     
     # Try to fetch FORECAST weather (if race is upcoming)
     if defaults['date'] != 'TBD':
-        forecast = fetch_forecast_weather(circuit_key, defaults['date'])
+        forecast = await forecast_service.get_forecast(circuit_key, defaults['date'])
         if forecast:
             defaults.update(forecast)
         
@@ -0,0 +1,116 @@
+"""
+Memory-Mapped Model Artifacts
+Stores a FlatForest as uncompressed .npy arrays plus a small meta.json:
+
+    models/race_winner_model_v5.flat/
+        meta.json  feature.npy  threshold.npy  children.npy  value.npy
+        roots.npy  group_starts.npy  [calib_<g>_x.npy  calib_<g>_y.npy]
+
+Arrays are opened with np.load(mmap_mode='r'), so every uvicorn worker on a
+host maps the same page-cache pages instead of unpickling its own copy of
+each forest, and loading is just an mmap call.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from forest_engine import FlatForest
+
+FORMAT_VERSION = 1
+
+ARRAYS = {
+    'feature': np.int64,
+    'threshold': np.float64,
+    'children': np.int64,
+    'value': np.float64,
+    'roots': np.int64,
+    'group_starts': np.int64,
+}
+
+
+def flat_model_dir(model_path):
+    """models/x.pkl -> models/x.flat"""
+    return os.path.splitext(model_path)[0] + '.flat'
+
+
+def save_flat_model(engine, out_dir):
+    """Write a FlatForest to out_dir (replaced atomically)"""
+    tmp_dir = out_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name, dtype in ARRAYS.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'),
+                np.ascontiguousarray(getattr(engine, name), dtype=dtype))
+
+    calibrators = []
+    for g, calibrator in enumerate(engine.calibrators):
+        if calibrator is None:
+            calibrators.append(None)
+        elif calibrator[0] == 'sigmoid':
+            calibrators.append({'kind': 'sigmoid', 'a': calibrator[1], 'b': calibrator[2]})
+        else:
+            np.save(os.path.join(tmp_dir, f'calib_{g}_x.npy'), calibrator[1])
+            np.save(os.path.join(tmp_dir, f'calib_{g}_y.npy'), calibrator[2])
+            calibrators.append({'kind': 'isotonic'})
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'max_depth': engine.max_depth,
+        'n_features': engine.n_features,
+        'n_trees': int(len(engine.roots)),
+        'n_nodes': int(len(engine.feature)),
+        'feature_names': engine.feature_names,
+        'calibrators': calibrators,
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+
+def load_flat_model(model_dir, mmap=True):
+    """Open a saved FlatForest; arrays are memory-mapped read-only by default"""
+    with open(os.path.join(model_dir, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported flat model format: {meta.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.load(os.path.join(model_dir, f'{name}.npy'), mmap_mode=mmap_mode)
+        for name in ARRAYS
+    }
+
+    calibrators = []
+    for g, calibrator in enumerate(meta['calibrators']):
+        if calibrator is None:
+            calibrators.append(None)
+        elif calibrator['kind'] == 'sigmoid':
+            calibrators.append(('sigmoid', calibrator['a'], calibrator['b']))
+        else:
+            calibrators.append(('isotonic',
+                                np.load(os.path.join(model_dir, f'calib_{g}_x.npy')),
+                                np.load(os.path.join(model_dir, f'calib_{g}_y.npy'))))
+
+    return FlatForest(
+        max_depth=meta['max_depth'],
+        n_features=meta['n_features'],
+        calibrators=calibrators,
+        feature_names=meta['feature_names'],
+        **arrays
+    )
+
+
+def is_current(model_path):
+    """True if a flat artifact exists and is at least as new as its .pkl"""
+    meta_path = os.path.join(flat_model_dir(model_path), 'meta.json')
+    if not os.path.exists(meta_path):
+        return False
+    if not os.path.exists(model_path):
+        return True
+    return os.path.getmtime(meta_path) >= os.path.getmtime(model_path)
@@ -0,0 +1,131 @@
+"""
+Monte Carlo Race Outcome Simulator
+Samples full finishing orders from the model's win probabilities instead of
+collapsing them into one deterministic ranking.
+
+Each sample is a Plackett-Luce draw, done in one shot with the Gumbel-max
+trick: sort log(strength) / T + Gumbel noise. With T = 1 a driver's chance
+of finishing first equals their calibrated (unsharpened) win probability.
+Race chaos widens the spread:
+  - safety cars: a Poisson number per sample (rate by `safety_car` level),
+    each one raising that sample's temperature T
+  - rain: raises T and every driver's DNF rate in proportion to `rain_prob`
+  - DNFs: Bernoulli per driver, retired cars fill the last positions and score nothing
+
+All samples are drawn as (samples x drivers) arrays in chunks, so 100k
+samples for 20 drivers take a fraction of a second.
+"""
+
+import numpy as np
+
+# Points for P1..P10
+POINTS_TABLE = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], dtype=np.float64)
+
+# Per-driver retirement probability in a dry race without incidents, used
+# when the race context has no dnf_rate for a driver
+BASE_DNF_RATE = 0.06
+
+# Expected safety-car periods per race by `safety_car` level
+SAFETY_CAR_RATE = {'none': 0.0, 'low': 0.4, 'medium': 0.8, 'high': 1.3}
+
+# Temperature added per safety car and at 100% rain probability
+SAFETY_CAR_TEMPERATURE = 0.15
+RAIN_TEMPERATURE = 0.5
+
+# DNF rate multiplier at 100% rain probability (1 + RAIN_DNF_FACTOR)
+RAIN_DNF_FACTOR = 0.8
+
+# Samples per chunk; bounds the (chunk x drivers x drivers) head-to-head array
+CHUNK_SIZE = 20000
+
+
+def driver_dnf_rates(dnf_rates, n_drivers):
+    """Per-driver base DNF probabilities; BASE_DNF_RATE where none is known"""
+    if dnf_rates is None:
+        return np.full(n_drivers, BASE_DNF_RATE)
+    rates = np.asarray(dnf_rates, dtype=np.float64)
+    return np.where(np.isfinite(rates), np.clip(rates, 0.0, 0.95), BASE_DNF_RATE)
+
+
+class MonteCarloSimulator:
+    def __init__(self, driver_ids, win_probs, dnf_rates=None):
+        """
+        driver_ids: sequence of driver ids
+        win_probs:  calibrated model win probabilities (any positive scale)
+        dnf_rates:  optional per-driver base DNF probabilities (NaN = BASE_DNF_RATE)
+        """
+        self.driver_ids = list(driver_ids)
+        strength = np.clip(np.asarray(win_probs, dtype=np.float64), 1e-9, None)
+        self.log_strength = np.log(strength / strength.sum())
+        self.dnf_rates = driver_dnf_rates(dnf_rates, len(self.driver_ids))
+
+    def sample(self, n, rng, safety_car='none', rain_prob=0.0):
+        """
+        One chunk of n simulated races.
+        Returns (ranks, dnf, safety_cars): ranks[s, d] is the 0-based finishing
+        position of driver d in sample s; retired drivers fill the last places.
+        """
+        n_drivers = len(self.driver_ids)
+        rain = min(max(float(rain_prob), 0.0), 100.0) / 100
+        sc_rate = SAFETY_CAR_RATE.get(str(safety_car).lower(), SAFETY_CAR_RATE['medium'])
+        dnf_rates = np.clip(self.dnf_rates * (1 + RAIN_DNF_FACTOR * rain), 0.0, 0.95)
+
+        safety_cars = rng.poisson(sc_rate, size=n) if sc_rate else np.zeros(n, dtype=np.int64)
+        temperature = 1.0 + SAFETY_CAR_TEMPERATURE * safety_cars + RAIN_TEMPERATURE * rain
+
+        keys = self.log_strength / temperature[:, None] + rng.gumbel(size=(n, n_drivers))
+        dnf = rng.random((n, n_drivers)) < dnf_rates
+        # Retired cars go behind every finisher, in random order
+        keys = np.where(dnf, keys - 1e6, keys)
+
+        order = np.argsort(-keys, axis=1)
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(n_drivers)[None, :], axis=1)
+        return ranks, dnf, safety_cars
+
+    def points(self, ranks, dnf):
+        """Championship points per (sample, driver) for sampled results"""
+        table = np.zeros(len(self.driver_ids))
+        scored = min(len(self.driver_ids), len(POINTS_TABLE))
+        table[:scored] = POINTS_TABLE[:scored]
+        return np.where(dnf, 0.0, table[ranks])
+
+    def run(self, n_samples=100000, safety_car='none', rain_prob=0.0, seed=None):
+        """Aggregate statistics over n_samples simulated races"""
+        n_drivers = len(self.driver_ids)
+        rng = np.random.default_rng(seed)
+
+        position_counts = np.zeros(n_drivers * n_drivers, dtype=np.int64)
+        ahead_counts = np.zeros((n_drivers, n_drivers), dtype=np.int64)
+        dnf_counts = np.zeros(n_drivers, dtype=np.int64)
+        scored_counts = np.zeros(n_drivers, dtype=np.int64)
+        points_sum = np.zeros(n_drivers)
+        sc_total = 0
+        driver_offsets = np.arange(n_drivers) * n_drivers
+
+        for start in range(0, n_samples, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, n_samples - start)
+            ranks, dnf, safety_cars = self.sample(n, rng, safety_car, rain_prob)
+            sc_total += int(safety_cars.sum())
+
+            position_counts += np.bincount((ranks + driver_offsets).ravel(),
+                                           minlength=n_drivers * n_drivers)
+            dnf_counts += dnf.sum(axis=0)
+            scored_counts += (~dnf & (ranks < len(POINTS_TABLE))).sum(axis=0)
+            points_sum += self.points(ranks, dnf).sum(axis=0)
+            ahead_counts += (ranks[:, :, None] < ranks[:, None, :]).sum(axis=0)
+
+        position_probs = position_counts.reshape(n_drivers, n_drivers) / n_samples
+        return {
+            'driver_ids': self.driver_ids,
+            'n_samples': n_samples,
+            'position_probs': position_probs,
+            'win_probs': position_probs[:, 0],
+            'podium_probs': position_probs[:, :3].sum(axis=1),
+            'points_probs': scored_counts / n_samples,
+            'dnf_probs': dnf_counts / n_samples,
+            'expected_points': points_sum / n_samples,
+            'expected_position': position_probs @ np.arange(1, n_drivers + 1),
+            'head_to_head': ahead_counts / n_samples,
+            'mean_safety_cars': sc_total / n_samples,
+        }
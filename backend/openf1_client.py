@@ -0,0 +1,219 @@
+"""
+Async OpenF1 Client
+Shared by the OpenF1 collectors:
+- one pooled httpx.AsyncClient (keep-alive) for the whole run
+- a global token bucket caps the request rate across all concurrent fetches;
+  a 429 with Retry-After pauses the bucket, not just the request that got it
+- a semaphore bounds requests in flight
+- transport errors, timeouts, 429, 5xx and 200s with an unparseable body
+  are retried with jittered exponential backoff; OpenF1's 404 "No results
+  found" is an empty result
+- per-endpoint request counts, rows, retries and latency percentiles
+
+Usage:
+    async with OpenF1Client() as client:
+        results = await client.fetch_session(9158, ['laps', 'pit', 'weather'])
+    client.print_stats()
+
+Env:
+    OPENF1_BASE_URL      API root (default https://api.openf1.org/v1)
+    OPENF1_RATE          requests per second across the client (default 5, 0 = unlimited)
+    OPENF1_CONCURRENCY   requests in flight (default 8)
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import httpx
+import numpy as np
+
+OPENF1_BASE_URL = "https://api.openf1.org/v1"
+
+# Statuses worth retrying; anything else non-2xx fails immediately
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class OpenF1Error(Exception):
+    def __init__(self, endpoint, status, message=''):
+        super().__init__(f"{endpoint}: HTTP {status} {message}".strip())
+        self.endpoint = endpoint
+        self.status = status
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` saved; waiters are served in arrival order"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst if burst is not None else rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def defer(self, seconds):
+        """Hold back every request for `seconds` (server asked us to slow down)"""
+        if self.rate:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class EndpointStats:
+    __slots__ = ('requests', 'errors', 'retries', 'rows', 'seconds')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rows = 0
+        self.seconds = []
+
+    def summary(self):
+        latencies = np.array(self.seconds) * 1000
+        summary = {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rows': self.rows,
+            'total_seconds': float(latencies.sum() / 1000),
+        }
+        if len(latencies):
+            p50, p95 = np.percentile(latencies, [50, 95])
+            summary.update({'p50_ms': float(p50), 'p95_ms': float(p95), 'max_ms': float(latencies.max())})
+        return summary
+
+
+class OpenF1Client:
+    def __init__(self, base_url=None, rate=None, burst=None, max_concurrency=None,
+                 retries=4, backoff=0.5, timeout=30.0, transport=None):
+        self.base_url = (base_url or os.getenv("OPENF1_BASE_URL") or OPENF1_BASE_URL).rstrip('/')
+        rate = float(os.getenv("OPENF1_RATE", "5")) if rate is None else rate
+        max_concurrency = max_concurrency or int(os.getenv("OPENF1_CONCURRENCY", "8"))
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self.transport = transport
+        self.endpoint_stats = {}
+        self.started = None
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self.transport)
+        self.started = time.monotonic()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def _stats(self, endpoint):
+        stats = self.endpoint_stats.get(endpoint)
+        if stats is None:
+            stats = self.endpoint_stats[endpoint] = EndpointStats()
+        return stats
+
+    async def get(self, endpoint, params=None, timeout=None):
+        """Rows for one OpenF1 query; raises OpenF1Error / httpx.TransportError once retries run out"""
+        stats = self._stats(endpoint)
+        url = f"{self.base_url}/{endpoint}"
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            retry_after = None
+            async with self.semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await self._client.get(url, params=params, timeout=timeout or self.timeout)
+                    error = None
+                except httpx.TransportError as e:
+                    response, error = None, e
+                stats.requests += 1
+                stats.seconds.append(time.perf_counter() - start)
+
+            if response is not None and response.status_code == 200:
+                try:
+                    rows = response.json()
+                except ValueError:
+                    # Truncated body or a proxy's HTML page: retry like a 5xx
+                    error = OpenF1Error(endpoint, 200, f"invalid JSON: {response.text[:100]}")
+                else:
+                    rows = rows if isinstance(rows, list) else []
+                    stats.rows += len(rows)
+                    return rows
+            elif response is not None:
+                if response.status_code == 404:
+                    return []
+                error = OpenF1Error(endpoint, response.status_code, response.text[:100])
+                if response.status_code not in RETRY_STATUS:
+                    stats.errors += 1
+                    raise error
+                try:
+                    retry_after = float(response.headers.get('Retry-After', ''))
+                except ValueError:
+                    retry_after = None
+
+            if attempt == self.retries:
+                stats.errors += 1
+                raise error
+            stats.retries += 1
+            # Jitter keeps concurrent fetches that failed together from retrying in lockstep
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            if retry_after:
+                self.bucket.defer(retry_after)
+                delay = max(delay, retry_after)
+            await asyncio.sleep(delay)
+
+    async def fetch_many(self, queries):
+        """{name: (endpoint, params, timeout)} -> {name: rows or the exception}, fetched concurrently"""
+        results = await asyncio.gather(
+            *(self.get(endpoint, params, timeout) for endpoint, params, timeout in queries.values()),
+            return_exceptions=True
+        )
+        return dict(zip(queries, results))
+
+    async def fetch_session(self, session_key, endpoints, timeouts=None):
+        """Session-level endpoints for one session, concurrently"""
+        timeouts = timeouts or {}
+        return await self.fetch_many({
+            endpoint: (endpoint, {'session_key': session_key}, timeouts.get(endpoint))
+            for endpoint in endpoints
+        })
+
+    async def fetch_per_driver(self, endpoint, session_key, driver_numbers, timeout=None):
+        """Per-driver endpoint (car_data, location) for several drivers, concurrently"""
+        return await self.fetch_many({
+            number: (endpoint, {'session_key': session_key, 'driver_number': number}, timeout)
+            for number in driver_numbers
+        })
+
+    def stats(self):
+        return {endpoint: stats.summary() for endpoint, stats in sorted(self.endpoint_stats.items())}
+
+    def print_stats(self):
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        summaries = self.stats()
+        total = sum(s['requests'] for s in summaries.values())
+        print(f"\n📡 OpenF1 requests: {total:,} in {elapsed:.1f}s")
+        print(f"   {'endpoint':15s} {'requests':>9s} {'rows':>12s} {'retries':>8s} {'errors':>7s} "
+              f"{'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s}")
+        for endpoint, s in summaries.items():
+            print(f"   {endpoint:15s} {s['requests']:>9,} {s['rows']:>12,} {s['retries']:>8} {s['errors']:>7} "
+                  f"{s.get('p50_ms', 0):>8.0f} {s.get('p95_ms', 0):>8.0f} {s.get('max_ms', 0):>8.0f}")
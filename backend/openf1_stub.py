@@ -0,0 +1,161 @@
+"""
+Local OpenF1 Stand-in
+Serves /v1/{endpoint} in the OpenF1 response shape from the per-session CSVs
+written by collect_openf1_final_complete.py, so the live ingestor can be
+exercised without network access.
+
+Rows are released on a replay clock: the first request for a session starts
+it at the session's earliest timestamp, and it advances STUB_SPEED times real
+time (files are loaded and sorted by session_replay.SessionRecording).
+Filters use OpenF1 syntax (`session_key=9161`, `date>2023-09-16T13:03:35`,
+`lap_number>=10`); `>`/`<` filters on the date columns are binary searches.
+
+Run:
+    OPENF1_STUB_DIR=../data/openf1_final STUB_SPEED=10 uvicorn openf1_stub:app --port 8020
+    OPENF1_BASE_URL=http://localhost:8020/v1 python -c "..."
+
+Env:
+    OPENF1_STUB_DIR   root holding {year}/session_{key}/{endpoint}.csv
+    STUB_SPEED        replay speed (default 1; 0 serves every row immediately)
+    STUB_LATENCY_MS   artificial response delay (default 0)
+"""
+
+import asyncio
+import os
+import re
+import time
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+
+from session_replay import DATE_COLUMNS, SessionRecording, find_session_dir, to_utc
+
+app = FastAPI(title="OpenF1 Stand-in")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FILTER = re.compile(r'^([A-Za-z_0-9]+?)(>=|<=|>|<|=)(.*)$')
+
+# Requests served per endpoint, for asserting polling behaviour in tests
+request_counts = {}
+
+
+def parse_filters(query):
+    """OpenF1 query string -> [(field, op, value)]; `date>x` has no '=' so parse by hand"""
+    filters = []
+    for part in query.split('&'):
+        match = FILTER.match(unquote(part))
+        if match:
+            filters.append(match.groups())
+    return filters
+
+
+class StubSession:
+    """One recorded session served on a replay clock"""
+
+    def __init__(self, recording, speed=1.0):
+        self.recording = recording
+        self.speed = speed
+        self.origin = None
+        self.started = None
+
+    def _start_clock(self):
+        if self.started is None:
+            self.origin = self.recording.first_time()
+            self.started = time.monotonic()
+
+    def clock(self):
+        """Replay time: rows stamped after this are not released yet (None = all)"""
+        self._start_clock()
+        if not self.speed or self.origin is None:
+            return None
+        elapsed = (time.monotonic() - self.started) * self.speed
+        return self.origin + np.timedelta64(int(elapsed * 1e9), 'ns')
+
+    def query(self, endpoint, filters):
+        df, times = self.recording.frame(endpoint)
+        if df is None:
+            return None
+        date_col = DATE_COLUMNS.get(endpoint)
+        lo, hi = 0, len(df)
+
+        if times is not None:
+            now = self.clock()
+            if now is not None:
+                hi = int(np.searchsorted(times, now, side='right'))
+        mask = np.ones(hi, dtype=bool)
+
+        for field, op, value in filters:
+            if field == 'session_key' or field not in df.columns:
+                continue
+            if field == date_col and times is not None:
+                bound = to_utc(pd.Series([value])).to_numpy(dtype='datetime64[ns]')[0]
+                if op in ('>', '>='):
+                    lo = max(lo, int(np.searchsorted(times, bound, side='right' if op == '>' else 'left')))
+                elif op in ('<', '<='):
+                    hi = min(hi, int(np.searchsorted(times, bound, side='left' if op == '<' else 'right')))
+                continue
+            column = df[field].iloc[:len(mask)]
+            numeric = pd.to_numeric(pd.Series([value]), errors='coerce')[0]
+            if not pd.isna(numeric):
+                column, value = pd.to_numeric(column, errors='coerce'), numeric
+            else:
+                column = column.astype(str)
+            compare = {'=': column == value, '>': column > value, '<': column < value,
+                       '>=': column >= value, '<=': column <= value}[op]
+            mask &= compare.fillna(False).to_numpy(dtype=bool)
+
+        if hi <= lo:
+            return []
+        rows = df.iloc[lo:hi][mask[lo:hi]]
+        return rows.astype(object).where(rows.notna(), None).to_dict('records')
+
+
+sessions = {}
+
+
+def get_session(session_key):
+    session = sessions.get(session_key)
+    if session is None:
+        root = os.getenv("OPENF1_STUB_DIR") or os.path.join(BASE_DIR, '..', 'data', 'openf1_final')
+        session_dir = find_session_dir(root, session_key)
+        if session_dir is None:
+            return None
+        session = sessions[session_key] = StubSession(
+            SessionRecording(session_dir), float(os.getenv("STUB_SPEED", "1"))
+        )
+    return session
+
+
+@app.get("/v1/{endpoint}")
+async def openf1(endpoint: str, request: Request):
+    request_counts[endpoint] = request_counts.get(endpoint, 0) + 1
+
+    latency_ms = float(os.getenv("STUB_LATENCY_MS", "0"))
+    if latency_ms:
+        await asyncio.sleep(latency_ms / 1000)
+
+    filters = parse_filters(request.url.query)
+    session_key = next((v for f, op, v in filters if f == 'session_key' and op == '='), None)
+    session = get_session(session_key) if session_key else None
+    if session is None:
+        raise HTTPException(status_code=404, detail="session_key not recorded")
+    rows = session.query(endpoint, filters)
+    if rows is None:
+        raise HTTPException(status_code=404, detail=f"no {endpoint} data for this session")
+    return rows
+
+
+@app.post("/reset")
+async def reset():
+    """Forget loaded sessions so every replay clock restarts"""
+    sessions.clear()
+    request_counts.clear()
+    return {'ok': True}
+
+
+@app.get("/stats")
+async def stats():
+    return {'requests': dict(request_counts), 'sessions': list(sessions)}
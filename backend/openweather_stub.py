@@ -0,0 +1,66 @@
+"""
+Local OpenWeather Stand-in
+Serves /data/2.5/forecast in the OpenWeather response shape so the forecast
+service can be exercised without network access or an API key quota.
+
+Run:
+    uvicorn openweather_stub:app --port 8010
+    OPENWEATHER_BASE_URL=http://localhost:8010 OPENWEATHER=test python main.py
+
+Env:
+    STUB_LATENCY_MS   artificial response delay (default 0)
+    STUB_RAIN         "1" to put rain in every slot
+"""
+
+import asyncio
+import math
+import os
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+
+app = FastAPI(title="OpenWeather Stand-in")
+
+# Requests served, for asserting cache behaviour in tests
+request_count = 0
+
+
+def build_forecast(lat, lon, start=None, rain=False):
+    """40 three-hour slots (5 days), deterministic per location"""
+    start = start or datetime.now().replace(minute=0, second=0, microsecond=0)
+    start = start - timedelta(hours=start.hour % 3)
+
+    base_temp = 30 - abs(lat) * 0.3
+    slots = []
+    for i in range(40):
+        ts = start + timedelta(hours=3 * i)
+        temp = base_temp + 5 * math.sin((ts.hour - 9) / 24 * 2 * math.pi)
+        clouds = int((abs(lon) * 7 + i * 11) % 100)
+        item = {
+            'dt': int(ts.timestamp()),
+            'dt_txt': ts.strftime("%Y-%m-%d %H:%M:%S"),
+            'main': {'temp': round(temp, 2), 'humidity': 40 + clouds // 3},
+            'clouds': {'all': clouds},
+            'weather': [{'description': 'light rain' if rain else 'scattered clouds'}],
+        }
+        if rain:
+            item['rain'] = {'3h': 1.2}
+        slots.append(item)
+    return {'cod': '200', 'cnt': len(slots), 'list': slots}
+
+
+@app.get("/data/2.5/forecast")
+async def forecast(lat: float, lon: float, appid: str = "", units: str = "metric"):
+    global request_count
+    request_count += 1
+
+    latency_ms = float(os.getenv("STUB_LATENCY_MS", "0"))
+    if latency_ms:
+        await asyncio.sleep(latency_ms / 1000)
+
+    return build_forecast(lat, lon, rain=os.getenv("STUB_RAIN") == "1")
+
+
+@app.get("/stats")
+async def stats():
+    return {'requests': request_count}
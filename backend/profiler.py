@@ -0,0 +1,175 @@
+"""
+Opt-in Request Profiler
+Samples the stacks of the threads serving one request and writes them in
+collapsed-stack format (one "frame;frame;frame count" line per stack), which
+flamegraph.pl, speedscope and inferno read directly.
+
+Enabled only when PROFILE_SECRET is set; a request is profiled when it sends
+`X-Profile: <secret>`. The response carries `X-Profile-File` naming the
+output under PROFILE_DIR. Without the env var the middleware is not installed,
+so normal requests pay nothing; with it, unprofiled requests pay one header scan.
+
+Limitation: the event-loop thread is shared by every in-flight request, so
+its samples also contain other requests' async work (parsing, serialization,
+other handlers). Only the thread-pool work wrapped in profiled_thread() is
+this request's alone. Stacks are rooted at `event_loop (shared)` or
+`worker` so the two can be told apart; profile an otherwise idle server when
+the event-loop side matters.
+
+Env:
+    PROFILE_SECRET        shared secret enabling the X-Profile header
+    PROFILE_DIR           output directory (default backend/profiles)
+    PROFILE_INTERVAL_MS   sampling interval (default 1)
+"""
+
+import contextvars
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_HEADER = b'x-profile'
+
+# Root frame of each sampled stack, by the thread it came from
+EVENT_LOOP_ROOT = 'event_loop (shared)'
+WORKER_ROOT = 'worker'
+
+# Profile of the request being handled in this context (None almost always)
+active_profile = contextvars.ContextVar('active_profile', default=None)
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Background thread sampling the stacks of a set of thread ids"""
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = Counter()
+        self.n_samples = 0
+        self._threads = {}   # thread id -> root frame label
+        self._stop = threading.Event()
+        self._sampler = None
+        self.started = None
+        self.duration = 0.0
+
+    def add_thread(self, thread_id=None, root=WORKER_ROOT):
+        """Include a thread (default: the calling one) in the samples, its stacks under `root`"""
+        self._threads[thread_id or threading.get_ident()] = root
+
+    def remove_thread(self, thread_id):
+        self._threads.pop(thread_id, None)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self.started
+
+    def _run(self):
+        labels = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, root in tuple(self._threads.items()):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(root)
+                self.samples[';'.join(reversed(stack))] += 1
+                self.n_samples += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+
+@contextmanager
+def profiled_thread():
+    """Wrap work on a pool thread so the active request profile samples it too"""
+    profile = active_profile.get()
+    if profile is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profile.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        profile.remove_thread(thread_id)
+
+
+class ProfileMiddleware:
+    """Plain ASGI middleware; profiles requests carrying the secret header"""
+
+    def __init__(self, app, secret, profile_dir, interval=0.001):
+        self.app = app
+        self.secret = secret.encode()
+        self.profile_dir = profile_dir
+        self.interval = interval
+
+    def _requested(self, scope):
+        for name, value in scope.get('headers', ()):
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.secret)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', scope['path']).strip('_') or 'root'
+        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{scope['method'].lower()}_{slug}.folded"
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                headers.append((b'x-profile-file', filename.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        profiler.add_thread(root=EVENT_LOOP_ROOT)
+        token = active_profile.set(profiler)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            active_profile.reset(token)
+            os.makedirs(self.profile_dir, exist_ok=True)
+            with open(os.path.join(self.profile_dir, filename), 'w') as f:
+                f.write(profiler.collapsed())
+            print(f"🔬 Profiled {scope['method']} {scope['path']}: {profiler.n_samples} samples "
+                  f"in {profiler.duration * 1000:.1f} ms -> {filename}")
+
+
+def install(app):
+    """Add the middleware if PROFILE_SECRET is configured"""
+    secret = os.getenv("PROFILE_SECRET")
+    if not secret:
+        return False
+    profile_dir = os.getenv("PROFILE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+    interval = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+    app.add_middleware(ProfileMiddleware, secret=secret, profile_dir=profile_dir, interval=interval)
+    print(f"🔬 Request profiling enabled (X-Profile header), writing to {profile_dir}")
+    return True
@@ -0,0 +1,120 @@
+"""
+Race Context Index
+Row-position lookups over the historical race data, built once per data load.
+Lets the live predictor fetch a race, a season or a circuit's history without
+scanning the whole frame on every request.
+"""
+
+import numpy as np
+
+
+class RaceContextIndex:
+    def __init__(self, data):
+        self.data = data
+        self.race_rows = {}
+        self.season_rows = {}
+        self.circuit_rows = {}
+        self.circuit_seasons = {}
+        self._build()
+
+    def _build(self):
+        """Group row positions by (season, round), season and circuit"""
+        df = self.data
+        if df is None or len(df) == 0:
+            return
+
+        seasons = df['season'].to_numpy()
+
+        for (season, round_num), rows in df.groupby(['season', 'round'], sort=False).indices.items():
+            self.race_rows[(int(season), int(round_num))] = rows
+
+        for season, rows in df.groupby('season', sort=False).indices.items():
+            self.season_rows[int(season)] = rows
+
+        if 'circuit_id' in df.columns:
+            for circuit_id, rows in df.groupby('circuit_id', sort=False).indices.items():
+                # Keep each circuit's rows ordered by season so "since year X"
+                # becomes a binary search instead of a filter
+                order = np.argsort(seasons[rows], kind='stable')
+                self.circuit_rows[circuit_id] = rows[order]
+                self.circuit_seasons[circuit_id] = seasons[rows[order]]
+
+    def _take(self, rows):
+        if rows is None or len(rows) == 0:
+            return self.data.iloc[0:0]
+        return self.data.iloc[rows]
+
+    def race(self, season, round_num):
+        """All rows for a single race (empty frame if not in history)"""
+        return self._take(self.race_rows.get((int(season), int(round_num)))).copy()
+
+    def season(self, season):
+        """All rows for a season"""
+        return self._take(self.season_rows.get(int(season)))
+
+    def circuit(self, circuit_id, min_season=None):
+        """All rows at a circuit, optionally only from min_season onwards"""
+        rows = self.circuit_rows.get(circuit_id)
+        if rows is not None and min_season is not None:
+            start = np.searchsorted(self.circuit_seasons[circuit_id], min_season, side='left')
+            rows = rows[start:]
+        return self._take(rows)
+
+    def has_race(self, season, round_num):
+        return (int(season), int(round_num)) in self.race_rows
+
+    def season_rounds(self, season):
+        """Sorted round numbers present for a season"""
+        return sorted(r for (s, r) in self.race_rows if s == int(season))
+
+
+class CircuitFormTables:
+    """
+    Derived stats for the SMART PREDICTION fallback: current-season form plus
+    driver/team track history (with win boosts) for every calendar circuit.
+    Built once per data load from a RaceContextIndex.
+    """
+
+    def __init__(self, index, circuit_ids, form_season=2025, history_since=2019):
+        self.index = index
+        self.history_since = history_since
+        self.form = self._season_form(form_season)
+        self.track_history = {}
+        for circuit_id in circuit_ids:
+            self.track_history[circuit_id] = self._track_history(circuit_id)
+
+    def _season_form(self, season):
+        """Average finish position per driver (falls back to the previous season)"""
+        season_data = self.index.season(season)
+        if len(season_data) == 0:
+            season_data = self.index.season(season - 1)
+        if len(season_data) == 0:
+            return {}
+        return season_data.groupby('driver_id')['position'].mean().to_dict()
+
+    def _track_history(self, circuit_id):
+        """(driver_history, team_history) average positions at a circuit"""
+        track_data = self.index.circuit(circuit_id, min_season=self.history_since)
+        if len(track_data) == 0:
+            return {}, {}
+
+        driver_track_history = track_data.groupby('driver_id')['position'].mean().to_dict()
+        team_track_history = track_data.groupby('constructor_id')['position'].mean().to_dict()
+
+        # Boost for wins (Driver)
+        wins = track_data[track_data['position'] == 1].groupby('driver_id').size().to_dict()
+        for d, w in wins.items():
+            if d in driver_track_history:
+                driver_track_history[d] -= (w * 1.5)
+
+        return driver_track_history, team_track_history
+
+    def track(self, circuit_id):
+        """Track history for a circuit; off-calendar circuits are computed on demand"""
+        history = self.track_history.get(circuit_id)
+        if history is None:
+            history = self._track_history(circuit_id)
+        return history
+
+    def covers(self, circuit_id):
+        return circuit_id in self.track_history
@@ -0,0 +1,132 @@
+"""
+Race Data Snapshot
+Local Parquet copy of the race_data table so startup does not have to pull
+the whole table from Supabase every time.
+
+    race_data_snapshot.parquet   columns the predictor uses (zstd compressed)
+    race_data_snapshot.json      DB fingerprint + column list it was built from
+
+The fingerprint is one cheap aggregate query (row count + latest
+season/round). If it matches the sidecar, the snapshot is loaded instead of
+the table; otherwise the table is read (needed columns only) and the
+snapshot rewritten. pyarrow is optional: without it snapshots are skipped.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+# Non-feature columns read by the context index, form tables and merge
+CONTEXT_COLUMNS = [
+    'season', 'round', 'circuit_id', 'driver_id', 'constructor_id',
+    'position', 'grid', 'recent_pace',
+]
+
+FINGERPRINT_QUERY = (
+    "SELECT COUNT(*) AS n_rows, MAX(season * 100 + round) AS last_race FROM race_data"
+)
+
+
+def required_columns(features):
+    """Context columns followed by model features, without duplicates"""
+    return list(dict.fromkeys(CONTEXT_COLUMNS + list(features)))
+
+
+def db_fingerprint(engine):
+    """{'n_rows': int, 'last_race': int} for the race_data table"""
+    row = pd.read_sql(FINGERPRINT_QUERY, engine).iloc[0]
+    last_race = row['last_race']
+    return {
+        'n_rows': int(row['n_rows']),
+        'last_race': int(last_race) if pd.notna(last_race) else None,
+    }
+
+
+def read_db_columns(engine, columns):
+    """SELECT only the wanted columns that exist in race_data"""
+    available = pd.read_sql("SELECT * FROM race_data LIMIT 0", engine).columns
+    selected = [c for c in columns if c in available]
+    column_list = ", ".join(f'"{c}"' for c in selected)
+    return pd.read_sql(f"SELECT {column_list} FROM race_data", engine)
+
+
+def read_csv_columns(path, columns):
+    """Parse only the wanted columns of the CSV fallback"""
+    wanted = set(columns)
+    return pd.read_csv(path, usecols=lambda c: c in wanted)
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class RaceDataSnapshot:
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + '.json'
+        self.enabled = _has_pyarrow()
+
+    def read_meta(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, columns, fingerprint=None):
+        """
+        Snapshot as a DataFrame, or None if missing/stale/unreadable.
+        fingerprint=None skips the staleness check (DB unreachable).
+        """
+        if not self.enabled:
+            return None
+        meta = self.read_meta()
+        if meta is None or not os.path.exists(self.path):
+            return None
+        if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+            return None
+        if not set(columns) <= set(meta.get('columns', [])) | set(meta.get('missing_columns', [])):
+            # Built for a different feature set
+            return None
+
+        stored = [c for c in columns if c in meta['columns']]
+        try:
+            data = pd.read_parquet(self.path, columns=stored)
+        except Exception as e:
+            print(f"⚠️ Could not read race data snapshot ({e})")
+            return None
+        if len(data) != meta.get('n_rows'):
+            print("⚠️ Race data snapshot is truncated, ignoring it")
+            return None
+        return data
+
+    def save(self, data, fingerprint, columns):
+        """Write the snapshot and sidecar (each replaced atomically)"""
+        if not self.enabled:
+            return False
+        stored = [c for c in columns if c in data.columns]
+        meta = {
+            'fingerprint': fingerprint,
+            'n_rows': int(len(data)),
+            'columns': stored,
+            'missing_columns': [c for c in columns if c not in data.columns],
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            tmp_path = self.path + '.tmp'
+            data[stored].to_parquet(tmp_path, index=False, compression='zstd')
+            os.replace(tmp_path, self.path)
+
+            tmp_meta = self.meta_path + '.tmp'
+            with open(tmp_meta, 'w') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp_meta, self.meta_path)
+        except Exception as e:
+            print(f"⚠️ Could not write race data snapshot ({e})")
+            return False
+        return True
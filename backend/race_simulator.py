@@ -0,0 +1,251 @@
+"""
+Lap-by-Lap Race Simulator
+Advances all cars through a race one lap at a time, for many independent
+races at once. Every piece of state is a (drivers x samples) NumPy array, so
+one lap is a handful of vectorized operations regardless of the sample count.
+
+Lap time = base pace (driver_stats_v5.json, shrunk towards the field median)
+         + compound offset + degradation * tire age (scaled by circuit tire
+           stress and the driver's tire wear, with a cliff past the
+           compound's optimal stint length)
+         - fuel burn + noise
+Pit stops follow the requested start compound and stop count, with jittered
+pit laps and a cheaper stop under safety car. Safety cars bunch the field;
+otherwise a car only passes the one ahead if it is quicker by more than the
+circuit's overtaking threshold. Retirements are a per-lap hazard.
+"""
+
+import numpy as np
+
+from circuit_metadata import get_circuit_features
+from montecarlo import POINTS_TABLE, RAIN_DNF_FACTOR, SAFETY_CAR_RATE, driver_dnf_rates
+
+# Same compound characteristics as the GP predictor scripts:
+# pace advantage (s/lap), relative degradation, laps before the cliff
+TIRE_COMPOUNDS = {
+    'soft': {'pace_advantage': 0.8, 'degradation_rate': 1.5, 'optimal_stint_length': 15},
+    'medium': {'pace_advantage': 0.0, 'degradation_rate': 1.0, 'optimal_stint_length': 25},
+    'hard': {'pace_advantage': -0.5, 'degradation_rate': 0.6, 'optimal_stint_length': 40},
+    'intermediate': {'pace_advantage': 0.0, 'degradation_rate': 1.2, 'optimal_stint_length': 30},
+    'wet': {'pace_advantage': -0.3, 'degradation_rate': 0.8, 'optimal_stint_length': 40},
+}
+
+# Compound fitted at each stop; dry races must use two different compounds
+NEXT_COMPOUND = {'soft': 'medium', 'medium': 'hard', 'hard': 'medium',
+                 'intermediate': 'intermediate', 'wet': 'wet'}
+
+REFERENCE_LAP_TIME = 90.0   # s, only relative times matter
+PACE_SPREAD = 0.4           # pace ratios include traffic/SC laps; keep 40% of the spread
+BASE_DEGRADATION = 0.06     # s/lap per lap of tire age at medium stress
+CLIFF_DEGRADATION = 0.15    # extra s/lap per lap beyond the optimal stint
+FUEL_EFFECT = 0.03          # s/lap gained per lap of fuel burnt
+LAP_NOISE = 0.35            # s, lap-to-lap standard deviation
+GRID_GAP = 0.25             # s between grid slots at the start
+PIT_LOSS = 21.0             # s, pit lane + stop under green
+PIT_LOSS_SC = 11.0          # s, under safety car
+PIT_NOISE = 0.8             # s, stop time variation
+PIT_WINDOW = 3              # laps of jitter around the planned pit lap
+SAFETY_CAR_LAPS = (3, 6)    # duration range (inclusive)
+SAFETY_CAR_LAP_FACTOR = 1.35
+SAFETY_CAR_GAP = 0.4        # s between cars after the restart
+MIN_GAP = 0.3               # s, closest a car can follow without passing
+
+
+def overtake_threshold(overtaking):
+    """Pace surplus (s) needed to pass; overtaking is the 1-5 circuit score"""
+    return 0.25 * (6 - overtaking)
+
+
+def degradation_rate(compound, tire_stress):
+    """Seconds lost per lap of tire age for a compound at a circuit (1-5 stress)"""
+    return BASE_DEGRADATION * TIRE_COMPOUNDS[compound]['degradation_rate'] * tire_stress / 3
+
+
+def stint_time_loss(compound, lengths, tire_stress, deg_factor=1.0):
+    """
+    Total tire-related time (s) of stints of the given lengths, relative to a
+    fresh medium: compound offset + linear degradation + cliff. Closed form of
+    the per-lap terms the simulator applies; fuel burn is strategy-independent.
+    """
+    params = TIRE_COMPOUNDS[compound]
+    lengths = np.asarray(lengths, dtype=np.float64)
+    deg = degradation_rate(compound, tire_stress) * np.asarray(deg_factor, dtype=np.float64)
+    past_cliff = np.maximum(0.0, lengths - params['optimal_stint_length'])
+    return (-params['pace_advantage'] * lengths
+            + deg * lengths * (lengths + 1) / 2
+            + CLIFF_DEGRADATION * past_cliff * (past_cliff + 1) / 2)
+
+
+class RaceSimulator:
+    def __init__(self, driver_ids, base_pace, circuit_id, laps, grid=None, dnf_rates=None,
+                 deg_factors=None):
+        """
+        driver_ids: sequence of driver ids
+        base_pace:  per-driver pace ratios (lower is faster)
+        grid:       driver ids in starting order (default: by base pace)
+        dnf_rates:  optional per-driver race DNF probabilities (NaN = BASE_DNF_RATE)
+        deg_factors: optional per-driver tire wear multipliers (default 1.0),
+                     see strategy_optimizer.load_driver_degradation
+        """
+        self.driver_ids = list(driver_ids)
+        self.laps = int(laps)
+        self.circuit = get_circuit_features(circuit_id)
+        self.dnf_rates = driver_dnf_rates(dnf_rates, len(self.driver_ids))
+        if deg_factors is None:
+            deg_factors = np.ones(len(self.driver_ids))
+        self.deg_factors = np.asarray(deg_factors, dtype=np.float64)
+
+        pace = np.asarray(base_pace, dtype=np.float64)
+        self.base_lap = REFERENCE_LAP_TIME * (1 + PACE_SPREAD * (pace - np.median(pace)))
+
+        index = {d: i for i, d in enumerate(self.driver_ids)}
+        if grid is None:
+            grid_order = np.argsort(self.base_lap, kind='stable')
+        else:
+            grid_order = np.array([index[d] for d in grid if d in index] +
+                                  [i for d, i in index.items() if d not in set(grid)])
+        self.grid_slot = np.empty(len(self.driver_ids), dtype=np.int64)
+        self.grid_slot[grid_order] = np.arange(len(self.driver_ids))
+
+    def strategy(self, tire, pit_stops, wet=False):
+        """Compound per stint for the requested start tire and stop count"""
+        tire = tire if tire in TIRE_COMPOUNDS else 'medium'
+        if wet and tire not in ('intermediate', 'wet'):
+            tire = 'intermediate'
+        stints = [tire]
+        for _ in range(max(0, int(pit_stops))):
+            stints.append(NEXT_COMPOUND[stints[-1]])
+        return stints
+
+    def _pit_laps(self, n_stops, n_samples, rng):
+        """(stops, drivers, samples) planned pit laps: even stints + jitter"""
+        n_drivers = len(self.driver_ids)
+        if n_stops == 0:
+            return np.zeros((0, n_drivers, n_samples), dtype=np.int64)
+        planned = np.round(self.laps * np.arange(1, n_stops + 1) / (n_stops + 1)).astype(np.int64)
+        jitter = rng.integers(-PIT_WINDOW, PIT_WINDOW + 1, size=(n_stops, n_drivers, n_samples))
+        pit_laps = np.clip(planned[:, None, None] + jitter, 2, self.laps - 1)
+        # Keep stops in order and at least one lap apart
+        for s in range(1, n_stops):
+            pit_laps[s] = np.maximum(pit_laps[s], pit_laps[s - 1] + 1)
+        return pit_laps
+
+    def run(self, n_samples=2000, tire='medium', pit_stops=1, safety_car='none',
+            rain_prob=0.0, wet=False, seed=None):
+        if not 0 <= int(pit_stops) <= self.laps - 2:
+            raise ValueError(f"pit_stops must be between 0 and {self.laps - 2} for a {self.laps}-lap race")
+        rng = np.random.default_rng(seed)
+        n_drivers = len(self.driver_ids)
+        shape = (n_drivers, n_samples)
+        rain = min(max(float(rain_prob), 0.0), 100.0) / 100
+
+        stints = self.strategy(tire, pit_stops, wet)
+        n_stops = len(stints) - 1
+        compounds = [TIRE_COMPOUNDS[c] for c in stints]
+        stint_offset = np.array([-c['pace_advantage'] for c in compounds])
+        stint_deg = np.array([degradation_rate(c, self.circuit['tire_stress']) for c in stints])
+        stint_cliff = np.array([c['optimal_stint_length'] for c in compounds])
+        pit_laps = self._pit_laps(n_stops, n_samples, rng)
+
+        sc_hazard = SAFETY_CAR_RATE.get(str(safety_car).lower(), SAFETY_CAR_RATE['medium']) / self.laps
+        # Per-lap hazard that compounds to the per-race DNF probability
+        race_dnf = np.clip(self.dnf_rates * (1 + RAIN_DNF_FACTOR * rain), 0.0, 0.95)
+        dnf_hazard = (1 - (1 - race_dnf) ** (1 / self.laps))[:, None]
+        pass_margin = overtake_threshold(self.circuit['overtaking'])
+        base_lap = self.base_lap[:, None]
+        deg_factors = self.deg_factors[:, None]
+
+        total = (self.grid_slot * GRID_GAP)[:, None] + rng.normal(0, 0.2, size=shape)
+        tire_age = np.zeros(shape)
+        stint = np.zeros(shape, dtype=np.int64)
+        retired = np.zeros(shape, dtype=bool)
+        stops_made = np.zeros(shape, dtype=np.int64)
+        sc_laps_left = np.zeros(n_samples, dtype=np.int64)
+        sc_count = np.zeros(n_samples, dtype=np.int64)
+        position_sum = np.zeros((n_drivers, self.laps))
+        rows = np.arange(n_drivers)[:, None]
+
+        for lap in range(1, self.laps + 1):
+            # Safety car deployments (not on the opening or final lap)
+            if sc_hazard and 1 < lap < self.laps:
+                deploy = (sc_laps_left == 0) & (rng.random(n_samples) < sc_hazard)
+                sc_laps_left[deploy] = rng.integers(SAFETY_CAR_LAPS[0], SAFETY_CAR_LAPS[1] + 1,
+                                                    size=int(deploy.sum()))
+                sc_count += deploy
+            under_sc = sc_laps_left > 0
+
+            age = tire_age + 1
+            cliff = np.maximum(0.0, age - stint_cliff[stint])
+            lap_time = (base_lap + stint_offset[stint] + stint_deg[stint] * deg_factors * age
+                        + CLIFF_DEGRADATION * cliff - FUEL_EFFECT * lap
+                        + rng.normal(0, LAP_NOISE, size=shape))
+            lap_time = np.where(under_sc, REFERENCE_LAP_TIME * SAFETY_CAR_LAP_FACTOR, lap_time)
+            tire_age = age
+
+            # Pit stops at the end of the planned lap
+            if n_stops:
+                pitting = ~retired & (stops_made < n_stops) & \
+                    (np.take_along_axis(pit_laps, np.minimum(stops_made, n_stops - 1)[None], 0)[0] == lap)
+                if pitting.any():
+                    loss = np.where(under_sc, PIT_LOSS_SC, PIT_LOSS) + np.abs(rng.normal(0, PIT_NOISE, size=shape))
+                    lap_time = lap_time + np.where(pitting, loss, 0.0)
+                    stops_made += pitting
+                    stint = np.minimum(stint + pitting, n_stops)
+                    tire_age = np.where(pitting, 0.0, tire_age)
+
+            retired |= rng.random(shape) < dnf_hazard
+            order = np.argsort(np.where(retired, np.inf, total), axis=0)
+            new_total = np.where(retired, np.inf, total + lap_time)
+
+            # Cars can only pass with enough pace in hand; SC laps bunch the field
+            sorted_total = np.take_along_axis(new_total, order, 0)
+            for k in range(1, n_drivers):
+                ahead = sorted_total[k - 1]
+                held = (sorted_total[k] < ahead + MIN_GAP) & (sorted_total[k] > ahead - pass_margin)
+                sorted_total[k] = np.where(held, ahead + MIN_GAP, sorted_total[k])
+            if under_sc.any():
+                leader = sorted_total[0]
+                bunched = leader + np.arange(n_drivers)[:, None] * SAFETY_CAR_GAP
+                running = np.isfinite(sorted_total)
+                sorted_total = np.where(under_sc & running, bunched, sorted_total)
+            np.put_along_axis(new_total, order, sorted_total, 0)
+            total = new_total
+            sc_laps_left = np.maximum(sc_laps_left - 1, 0)
+
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, np.argsort(total, axis=0), rows, 0)
+            position_sum[:, lap - 1] = ranks.sum(axis=1)
+
+        return self._summarize(total, ranks, retired, stops_made, sc_count, position_sum, stints, n_samples)
+
+    def _summarize(self, total, ranks, retired, stops_made, sc_count, position_sum, stints, n_samples):
+        n_drivers = len(self.driver_ids)
+        position_probs = np.stack([(ranks == p).mean(axis=1) for p in range(n_drivers)], axis=1)
+
+        points = np.zeros(n_drivers)
+        points[:min(n_drivers, len(POINTS_TABLE))] = POINTS_TABLE[:n_drivers]
+        scored = np.where(retired, 0.0, points[ranks])
+
+        winner_time = total.min(axis=0)
+        gaps = np.where(retired, np.nan, total - winner_time)
+        finished = (~retired).sum(axis=1)
+        median_gap = np.full(n_drivers, np.nan)
+        has_finish = finished > 0
+        median_gap[has_finish] = np.nanmedian(gaps[has_finish], axis=1)
+
+        return {
+            'driver_ids': self.driver_ids,
+            'n_samples': n_samples,
+            'laps': self.laps,
+            'strategy': stints,
+            'position_probs': position_probs,
+            'win_probs': position_probs[:, 0],
+            'podium_probs': position_probs[:, :3].sum(axis=1),
+            'dnf_probs': retired.mean(axis=1),
+            'expected_points': scored.mean(axis=1),
+            'expected_position': position_probs @ np.arange(1, n_drivers + 1),
+            'median_gap': median_gap,
+            'mean_stops': stops_made.mean(axis=1),
+            'mean_position_by_lap': position_sum / n_samples + 1,
+            'mean_safety_cars': float(sc_count.mean()),
+        }
@@ -0,0 +1,62 @@
+"""
+Backend Unit Test Runner
+Runs the test_* functions of the backend test modules without needing
+pytest installed; python -m pytest collects the same tests.
+
+Run:
+    python run_tests.py                          # every unit test module
+    python run_tests.py test_forest_engine.py    # selected modules
+"""
+
+import glob
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from conftest import collect_ignore
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_modules():
+    """Unit test modules next to this file (the hand-run API scripts are skipped)"""
+    paths = sorted(glob.glob(os.path.join(BASE_DIR, 'test_*.py')))
+    return [os.path.basename(p) for p in paths if os.path.basename(p) not in collect_ignore]
+
+
+def run_module(filename):
+    """Run one module's test_* functions in definition order; returns (passed, failed)"""
+    module = importlib.import_module(os.path.splitext(os.path.basename(filename))[0])
+    tests = [(name, fn) for name, fn in vars(module).items()
+             if name.startswith('test_') and callable(fn) and fn.__module__ == module.__name__]
+    passed = failed = 0
+    for name, test in tests:
+        started = time.perf_counter()
+        try:
+            test()
+        except Exception:
+            failed += 1
+            print(f"❌ {module.__name__}.{name}")
+            traceback.print_exc()
+        else:
+            passed += 1
+            print(f"✅ {module.__name__}.{name} ({time.perf_counter() - started:.2f}s)")
+    return passed, failed
+
+
+def main():
+    sys.path.insert(0, BASE_DIR)
+    modules = sys.argv[1:] or test_modules()
+    passed = failed = 0
+    for filename in modules:
+        p, f = run_module(filename)
+        passed += p
+        failed += f
+    print(f"\n{'✅' if not failed else '❌'} {passed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Session Replay Engine
+Replays a session recorded by collect_openf1_final_complete.py
+(openf1_final/{year}/session_{key}/*.csv) as one stream of events in
+timestamp order, for exercising and benchmarking the live pipeline offline.
+- each endpoint file is sorted once by its timestamp column; heapq.merge then
+  interleaves the endpoints lazily, so the merged stream is never materialized
+- speed 1 plays in real time, N plays N times faster, 0 is unthrottled
+- SessionRecording is shared with openf1_stub.py, which serves the same rows
+  through an OpenF1-compatible HTTP stand-in on a replay clock
+
+Benchmark (in-process: ingest state + threshold scheduler + inference):
+    python session_replay.py --root ../data/openf1_final --session-key 9158 --pipeline --circuit silverstone
+"""
+
+import argparse
+import asyncio
+import glob
+import heapq
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Timestamp column per endpoint (endpoints without one, e.g. drivers and stints, are not replayed)
+DATE_COLUMNS = {
+    'intervals': 'date', 'position': 'date', 'laps': 'date_start', 'pit': 'date',
+    'race_control': 'date', 'car_data': 'date', 'location': 'date', 'weather': 'date',
+    'team_radio': 'date', 'overtakes': 'date',
+}
+
+# Endpoints the live ingestor polls, and the default replay set
+LIVE_ENDPOINTS = ['intervals', 'position', 'laps', 'pit', 'race_control']
+REPLAY_ENDPOINTS = LIVE_ENDPOINTS + ['car_data']
+
+
+def find_session_dir(root, session_key):
+    """root/{year}/session_{key} for a recorded session (None if absent)"""
+    matches = glob.glob(os.path.join(root, '*', f'session_{session_key}'))
+    return matches[0] if matches else None
+
+
+def to_utc(values):
+    return pd.to_datetime(values, utc=True, format='ISO8601', errors='coerce')
+
+
+class SessionRecording:
+    """Per-endpoint frames of one recorded session, sorted by timestamp, loaded lazily"""
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        self._frames = {}
+        self._records = {}
+
+    def frame(self, endpoint):
+        """(DataFrame sorted by timestamp, datetime64[ns] times or None); (None, None) if not recorded"""
+        if endpoint not in self._frames:
+            path = os.path.join(self.session_dir, f'{endpoint}.csv')
+            df = pd.read_csv(path, low_memory=False) if os.path.exists(path) else None
+            times = None
+            date_col = DATE_COLUMNS.get(endpoint)
+            if df is not None and date_col in df.columns:
+                ts = to_utc(df[date_col]).to_numpy(dtype='datetime64[ns]')
+                order = np.argsort(ts, kind='stable')
+                df = df.iloc[order].reset_index(drop=True)
+                times = ts[order]
+            self._frames[endpoint] = (df, times)
+        return self._frames[endpoint]
+
+    def records(self, endpoint):
+        """Rows as dicts in timestamp order (NaN -> None, as in the OpenF1 JSON)"""
+        if endpoint not in self._records:
+            df, _ = self.frame(endpoint)
+            if df is None:
+                self._records[endpoint] = []
+            else:
+                self._records[endpoint] = df.astype(object).where(df.notna(), None).to_dict('records')
+        return self._records[endpoint]
+
+    def first_time(self, endpoints=LIVE_ENDPOINTS):
+        """Earliest timestamp across endpoints (None if nothing is dated)"""
+        firsts = []
+        for endpoint in endpoints:
+            _, times = self.frame(endpoint)
+            if times is not None:
+                valid = times[~np.isnat(times)]
+                if len(valid):
+                    firsts.append(valid[0])
+        return min(firsts) if firsts else None
+
+
+class SessionReplay:
+    def __init__(self, recording, endpoints=None, speed=1.0):
+        self.recording = recording
+        self.endpoints = [e for e in (endpoints or REPLAY_ENDPOINTS) if recording.frame(e)[1] is not None]
+        self.speed = speed
+        self.counts = {endpoint: 0 for endpoint in self.endpoints}
+        self.max_lag = 0.0
+
+    def _stream(self, endpoint, rank):
+        _, times = self.recording.frame(endpoint)
+        records = self.recording.records(endpoint)
+        ns = times.astype('int64')
+        # NaT rows (e.g. a first lap without date_start) can't be placed in time
+        for i in np.flatnonzero(~np.isnat(times)):
+            yield int(ns[i]), rank, endpoint, records[i]
+
+    def events(self):
+        """All events as (timestamp ns, endpoint, row), merged in timestamp order"""
+        streams = [self._stream(endpoint, rank) for rank, endpoint in enumerate(self.endpoints)]
+        for ts, _, endpoint, row in heapq.merge(*streams, key=lambda event: (event[0], event[1])):
+            self.counts[endpoint] += 1
+            yield ts, endpoint, row
+
+    async def play(self, speed=None):
+        """Async iterator over events() paced at `speed` x real time (0 = unthrottled)"""
+        speed = self.speed if speed is None else speed
+        start_wall = time.monotonic()
+        first = None
+        for n, (ts, endpoint, row) in enumerate(self.events()):
+            if first is None:
+                first = ts
+            if speed:
+                due = start_wall + (ts - first) / 1e9 / speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+            elif n % 1000 == 0:
+                await asyncio.sleep(0)
+            yield ts, endpoint, row
+
+
+def benchmark(replay, scheduler=None, poll_seconds=2.0, speed=0.0):
+    """
+    Feed a replay through LiveSessionState (and optionally a LiveScheduler),
+    polling the state every `poll_seconds` of session time like the live ingestor.
+    """
+    from live_ingestor import LiveSessionState
+
+    state = LiveSessionState()
+    live = set(LIVE_ENDPOINTS)
+    poll_ns = int(poll_seconds * 1e9)
+    inference_times = []
+    apply_seconds = 0.0
+    next_poll = None
+    pending = 0
+
+    def poll():
+        start = time.perf_counter()
+        sequence = scheduler.sequence
+        scheduler.update(state.snapshot())
+        if scheduler.sequence != sequence:
+            inference_times.append(time.perf_counter() - start)
+
+    async def run():
+        nonlocal apply_seconds, next_poll, pending
+        async for ts, endpoint, row in replay.play(speed):
+            if next_poll is None:
+                next_poll = ts + poll_ns
+            if scheduler is not None and ts >= next_poll:
+                if pending:
+                    poll()
+                    pending = 0
+                next_poll = ts - (ts - next_poll) % poll_ns + poll_ns
+            if endpoint in live:
+                start = time.perf_counter()
+                state.apply(endpoint, row)
+                apply_seconds += time.perf_counter() - start
+                pending += 1
+        if scheduler is not None and pending:
+            poll()
+
+    wall_start = time.perf_counter()
+    asyncio.run(run())
+    wall = time.perf_counter() - wall_start
+
+    events = sum(replay.counts.values())
+    report = {
+        'events': events,
+        'by_endpoint': dict(replay.counts),
+        'wall_seconds': wall,
+        'events_per_second': events / wall if wall else 0.0,
+        'state_apply_us': apply_seconds / max(1, state.rows) * 1e6,
+        'max_lag_seconds': replay.max_lag,
+        'telemetry': state.snapshot(),
+    }
+    if scheduler is not None:
+        report['scheduler'] = scheduler.stats()
+        if inference_times:
+            report['inference_ms'] = {
+                'p50': float(np.percentile(inference_times, 50) * 1000),
+                'p95': float(np.percentile(inference_times, 95) * 1000),
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded OpenF1 session")
+    parser.add_argument('--root', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'openf1_final'))
+    parser.add_argument('--session-key', required=True)
+    parser.add_argument('--speed', type=float, default=0.0, help='1 = real time, N = N x faster, 0 = unthrottled')
+    parser.add_argument('--endpoints', default=','.join(REPLAY_ENDPOINTS))
+    parser.add_argument('--pipeline', action='store_true', help='also run the scheduler + model inference')
+    parser.add_argument('--circuit', default='bahrain', help='calendar circuit for --pipeline')
+    parser.add_argument('--season', type=int, default=2025)
+    parser.add_argument('--poll-seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    session_dir = find_session_dir(args.root, args.session_key)
+    if session_dir is None:
+        raise SystemExit(f"❌ Session {args.session_key} not found under {args.root}")
+    replay = SessionReplay(SessionRecording(session_dir), args.endpoints.split(','))
+
+    scheduler = None
+    if args.pipeline:
+        from live_predictor import LiveRacePredictor, ROUND_MAP, CIRCUIT_ID_MAP, resolve_circuit_key
+        from live_scheduler import LiveScheduler
+        predictor = LiveRacePredictor()
+        if not predictor.load_resources():
+            raise SystemExit("❌ Could not load models")
+        circuit_key = resolve_circuit_key(args.circuit)
+        scheduler = LiveScheduler(predictor, args.season, ROUND_MAP.get(circuit_key, 1),
+                                  CIRCUIT_ID_MAP.get(circuit_key, circuit_key))
+
+    print(f"\n▶️  Replaying {session_dir} ({', '.join(replay.endpoints)}) at "
+          f"{'unthrottled' if not args.speed else f'{args.speed:g}x'}")
+    report = benchmark(replay, scheduler, args.poll_seconds, args.speed)
+
+    print("=" * 60)
+    print(f"   Events:        {report['events']:,} in {report['wall_seconds']:.2f}s "
+          f"({report['events_per_second']:,.0f}/s)")
+    for endpoint, count in report['by_endpoint'].items():
+        print(f"     {endpoint:14s} {count:>10,}")
+    print(f"   State update:  {report['state_apply_us']:.2f} µs/event")
+    if args.speed:
+        print(f"   Max lag:       {report['max_lag_seconds'] * 1000:.1f} ms behind schedule")
+    if scheduler is not None:
+        sched = report['scheduler']
+        print(f"   Inferences:    {sched['inferred']} run, {sched['skipped']} skipped ({sched['triggers']})")
+        if 'inference_ms' in report:
+            print(f"   Inference:     p50 {report['inference_ms']['p50']:.1f} ms  p95 {report['inference_ms']['p95']:.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one computation: the first
+caller starts it in the thread pool, later callers await the same task.
+Each caller awaits through asyncio.shield, so one client disconnecting does
+not cancel the work the others are waiting on.
+"""
+
+import asyncio
+import functools
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}   # key -> asyncio.Task
+        self.executions = 0
+        self.coalesced = 0
+        self.max_inflight = 0
+
+    async def run(self, key, fn, *args):
+        """Result of fn(*args) in the thread pool, shared by concurrent callers of key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(run_in_threadpool(fn, *args))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+            self.executions += 1
+            self.max_inflight = max(self.max_inflight, len(self._inflight))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Waiters still see the exception; this just marks it retrieved
+            task.exception()
+
+    @property
+    def inflight(self):
+        return len(self._inflight)
+
+    def stats(self):
+        return {
+            'inflight': self.inflight,
+            'max_inflight': self.max_inflight,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+        }
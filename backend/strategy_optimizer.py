@@ -0,0 +1,181 @@
+"""
+Pit Strategy Optimizer
+Finds the fastest 1-, 2- and 3-stop strategies with a dynamic program over
+stint lengths, using the same tire model as race_simulator (compound offset,
+degradation scaled by circuit tire stress, cliff past the optimal stint).
+
+State: (stints used, laps covered, set of compounds used). Each transition
+appends one stint of any compound and length, so a race of N laps costs
+O(stops * compound sets * compounds * N^2), evaluated as NumPy min-plus
+products for all drivers at once instead of simulating every combination.
+Dry races must use at least two different compounds.
+
+Per-driver tire wear comes from tire_degradation.csv written by
+collect_telemetry_comprehensive.py (STRATEGY_DEGRADATION_CSV); without it
+every driver uses the field-average rates.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from race_simulator import PIT_LOSS, PIT_LOSS_SC, TIRE_COMPOUNDS, stint_time_loss
+from montecarlo import SAFETY_CAR_RATE
+from live_predictor import DRIVER_CODES
+
+DRY_COMPOUNDS = ['soft', 'medium', 'hard']
+WET_COMPOUNDS = ['intermediate', 'wet']
+MIN_STINT = 5
+MAX_STOPS = 3
+
+# Chance per expected safety car that a planned stop can be taken under it
+SC_PIT_CHANCE = 0.25
+
+# Track temperature (C) the degradation rates are quoted at, and sensitivity per degree
+REFERENCE_TRACK_TEMP = 35.0
+TRACK_TEMP_DEGRADATION = 0.01
+
+
+def load_driver_degradation(path):
+    """
+    driver_id -> wear multiplier (1.0 = field average) from tire_degradation.csv.
+    Rates are compared within each race and compound, then averaged per driver.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        df = pd.read_csv(path, usecols=['season', 'round', 'driver_code', 'compound', 'deg_rate_sec_per_lap'])
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read tire degradation data ({e})")
+        return {}
+
+    # Negative/huge slopes are fuel-dominated or SC-polluted stints
+    df = df[(df['deg_rate_sec_per_lap'] > 0) & (df['deg_rate_sec_per_lap'] < 1.0)]
+    field = df.groupby(['season', 'round', 'compound'])['deg_rate_sec_per_lap'].transform('median')
+    df = df.assign(relative=df['deg_rate_sec_per_lap'] / field)
+    factors = df.groupby('driver_code')['relative'].median().clip(0.7, 1.3)
+    return {DRIVER_CODES[code]: float(f) for code, f in factors.items() if code in DRIVER_CODES}
+
+
+def conditions_bucket(circuit_key, track_temp, rain_prob, safety_car, wet_threshold):
+    """Cache key: strategies only change meaningfully across these buckets"""
+    return (
+        circuit_key,
+        float(rain_prob) > wet_threshold,
+        int(round(float(track_temp) / 5.0) * 5),
+        str(safety_car).lower(),
+    )
+
+
+class StrategyOptimizer:
+    def __init__(self, laps, tire_stress, wet=False, track_temp=REFERENCE_TRACK_TEMP,
+                 safety_car='none', min_stint=MIN_STINT):
+        self.laps = int(laps)
+        self.tire_stress = tire_stress
+        self.wet = wet
+        self.compounds = WET_COMPOUNDS if wet else DRY_COMPOUNDS
+        self.min_stint = min_stint
+        self.temp_factor = max(0.5, 1 + TRACK_TEMP_DEGRADATION * (float(track_temp) - REFERENCE_TRACK_TEMP))
+
+        # Expected pit loss: some stops fall under a safety car
+        sc_rate = SAFETY_CAR_RATE.get(str(safety_car).lower(), SAFETY_CAR_RATE['medium'])
+        sc_share = min(1.0, sc_rate * SC_PIT_CHANCE)
+        self.pit_loss = PIT_LOSS - sc_share * (PIT_LOSS - PIT_LOSS_SC)
+
+    def _transition_costs(self, deg_factors):
+        """(drivers, compounds, from_lap, to_lap) stint cost, inf where not allowed"""
+        n = self.laps
+        lengths = np.arange(n + 1)
+        factors = np.asarray(deg_factors, dtype=np.float64)[:, None] * self.temp_factor
+        span = lengths[None, :] - lengths[:, None]   # to_lap - from_lap
+        valid = span >= self.min_stint
+        costs = np.full((len(factors), len(self.compounds), n + 1, n + 1), np.inf)
+        for c, compound in enumerate(self.compounds):
+            by_length = stint_time_loss(compound, lengths[None, :], self.tire_stress, factors)
+            costs[:, c] = np.where(valid, by_length[:, np.clip(span, 0, n)], np.inf)
+        return costs
+
+    def optimize(self, deg_factors, max_stops=MAX_STOPS):
+        """
+        Best strategy per stop count for each driver's wear factor.
+        Returns one {stops: {'time_loss': s, 'stints': [(compound, laps), ...]}} per driver.
+        """
+        n_drivers = len(deg_factors)
+        n_masks = 1 << len(self.compounds)
+        costs = self._transition_costs(deg_factors)
+        drivers = np.arange(n_drivers)[:, None]
+
+        # dp[d, lap, mask]: best time after some stints covering `lap` laps
+        dp = np.full((n_drivers, self.laps + 1, n_masks), np.inf)
+        dp[:, 0, 0] = 0.0
+        back = []   # per stint: (prev_lap, compound, prev_mask) for each (d, lap, mask)
+        results = [dict() for _ in range(n_drivers)]
+
+        for stint in range(1, max_stops + 2):
+            new = np.full_like(dp, np.inf)
+            prev_lap = np.zeros(dp.shape, dtype=np.int64)
+            compound_of = np.zeros(dp.shape, dtype=np.int64)
+            prev_mask = np.zeros(dp.shape, dtype=np.int64)
+            for mask in range(n_masks):
+                start = dp[:, :, mask]
+                if not np.isfinite(start).any():
+                    continue
+                for c in range(len(self.compounds)):
+                    # Min-plus product: best previous lap for every end lap
+                    candidates = start[:, :, None] + costs[:, c]
+                    best_from = candidates.argmin(axis=1)
+                    best = np.take_along_axis(candidates, best_from[:, None, :], 1)[:, 0, :]
+                    target = mask | (1 << c)
+                    better = best < new[:, :, target]
+                    new[:, :, target] = np.where(better, best, new[:, :, target])
+                    prev_lap[:, :, target] = np.where(better, best_from, prev_lap[:, :, target])
+                    compound_of[:, :, target] = np.where(better, c, compound_of[:, :, target])
+                    prev_mask[:, :, target] = np.where(better, mask, prev_mask[:, :, target])
+            dp = new
+            back.append((prev_lap, compound_of, prev_mask))
+
+            stops = stint - 1
+            if stops == 0:
+                continue
+            finals = dp[:, self.laps, :].copy()
+            if not self.wet:
+                for mask in range(n_masks):
+                    if bin(mask).count('1') < 2:
+                        finals[:, mask] = np.inf
+            best_mask = finals.argmin(axis=1)
+            best_time = finals[drivers[:, 0], best_mask]
+            for d in range(n_drivers):
+                if not np.isfinite(best_time[d]):
+                    continue
+                stints = self._backtrack(back, d, best_mask[d])
+                results[d][stops] = {
+                    'time_loss': float(best_time[d] + stops * self.pit_loss),
+                    'stints': stints,
+                }
+        return results
+
+    def _backtrack(self, back, d, mask):
+        lap = self.laps
+        stints = []
+        for prev_lap, compound_of, prev_mask in reversed(back):
+            start = int(prev_lap[d, lap, mask])
+            stints.append((self.compounds[compound_of[d, lap, mask]], lap - start))
+            mask = int(prev_mask[d, lap, mask])
+            lap = start
+        return stints
+
+
+def order_stints(stints, start_tire=None):
+    """
+    Stint order does not change the modelled time; start on the requested
+    tire when the strategy uses it, otherwise on the softest compound.
+    """
+    softness = {c: -TIRE_COMPOUNDS[c]['pace_advantage'] for c in TIRE_COMPOUNDS}
+    ordered = sorted(stints, key=lambda s: (softness[s[0]], -s[1]))
+    for i, (compound, _) in enumerate(ordered):
+        if compound == start_tire:
+            ordered.insert(0, ordered.pop(i))
+            break
+    pit_laps = list(np.cumsum([laps for _, laps in ordered])[:-1].tolist())
+    return ordered, pit_laps
@@ -0,0 +1,131 @@
+"""
+FlatForest vs sklearn parity on small fitted forests.
+Run: python run_tests.py test_forest_engine.py (or python -m pytest test_forest_engine.py)
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from forest_engine import FlatForest
+
+TOLERANCE = 1e-9
+N_FEATURES = 12
+
+
+def training_data(n_rows=1500, seed=0):
+    """Random features with a learnable rare positive class, like the winner target"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, N_FEATURES))
+    # A few integer-valued columns so rows land exactly on split thresholds
+    X[:, :3] = rng.integers(0, 20, size=(n_rows, 3))
+    score = X[:, 0] * -0.3 + X[:, 4] + rng.normal(scale=0.5, size=n_rows)
+    y = score > np.quantile(score, 0.9)
+    return X, y
+
+
+def eval_rows(n_rows=400, seed=1):
+    X, _ = training_data(n_rows, seed)
+    return X
+
+
+def forest(cls=RandomForestClassifier, **kwargs):
+    return cls(n_estimators=25, max_depth=8, min_samples_leaf=2, random_state=42, **kwargs)
+
+
+def assert_parity(model, X):
+    engine = FlatForest.from_sklearn(model)
+    expected = model.predict_proba(X)
+    got = engine.predict_proba(X)
+    assert got.shape == expected.shape
+    diff = np.abs(got - expected).max()
+    assert diff <= TOLERANCE, f"max |flat - sklearn| = {diff:.3g}"
+    return engine
+
+
+def test_random_forest_parity():
+    X, y = training_data()
+    assert_parity(forest(class_weight='balanced').fit(X, y), eval_rows())
+
+
+def test_extra_trees_parity():
+    X, y = training_data()
+    assert_parity(forest(ExtraTreesClassifier).fit(X, y), eval_rows())
+
+
+def test_calibrated_sigmoid_cv3_parity():
+    # The V5 winner model: three forests, one sigmoid each
+    X, y = training_data()
+    model = CalibratedClassifierCV(forest(), method='sigmoid', cv=3).fit(X, y)
+    engine = assert_parity(model, eval_rows())
+    assert len(engine.calibrators) == 3
+    assert all(c[0] == 'sigmoid' for c in engine.calibrators)
+
+
+def test_calibrated_holdout_parity():
+    # --winner-calibration holdout: one forest, one sigmoid fitted on held-out rows
+    X, y = training_data()
+    fitted = forest().fit(X[:1200], y[:1200])
+    try:
+        from sklearn.frozen import FrozenEstimator  # scikit-learn >= 1.6
+        model = CalibratedClassifierCV(FrozenEstimator(fitted), method='sigmoid')
+    except ImportError:
+        model = CalibratedClassifierCV(fitted, method='sigmoid', cv='prefit')
+    model.fit(X[1200:], y[1200:])
+    engine = assert_parity(model, eval_rows())
+    assert len(engine.calibrators) == 1
+    assert len(engine.roots) == len(fitted.estimators_)
+
+
+def test_calibrated_isotonic_parity():
+    X, y = training_data()
+    model = CalibratedClassifierCV(forest(), method='isotonic', cv=3).fit(X, y)
+    assert_parity(model, eval_rows())
+
+
+def test_rows_on_split_thresholds():
+    # sklearn compares float32 inputs; values that sit on a float64 threshold
+    # only take the same branch if the engine casts the same way
+    X, y = training_data()
+    model = forest().fit(X, y)
+    engine = FlatForest.from_sklearn(model)
+    rng = np.random.default_rng(2)
+    is_split = engine.children[0::2] != np.arange(len(engine.feature))
+    split_features = engine.feature[is_split]
+    split_thresholds = engine.threshold[is_split]
+    rows = eval_rows(300)
+    for row in rows:
+        for node in rng.choice(len(split_features), size=N_FEATURES):
+            row[split_features[node]] = split_thresholds[node]
+    assert_parity(model, rows)
+
+
+def test_single_row_and_dataframe_input():
+    X, y = training_data()
+    columns = [f'f{i}' for i in range(N_FEATURES)]
+    model = forest().fit(pd.DataFrame(X, columns=columns), y)
+    rows = pd.DataFrame(eval_rows(20), columns=columns)
+    engine = assert_parity(model, rows)
+    assert engine.feature_names == columns
+    assert np.abs(engine.predict_proba(rows.head(1)) - model.predict_proba(rows.head(1))).max() <= TOLERANCE
+
+
+def test_wrong_width_rejected():
+    X, y = training_data()
+    engine = FlatForest.from_sklearn(forest().fit(X, y))
+    try:
+        engine.predict_proba(X[:, :-1])
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for a feature-count mismatch")
+
+
+def test_multiclass_rejected():
+    X, _ = training_data()
+    labels = np.arange(len(X)) % 3
+    try:
+        FlatForest.from_sklearn(forest().fit(X, labels))
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for a multiclass forest")
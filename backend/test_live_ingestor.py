@@ -0,0 +1,165 @@
+"""
+Live ingestor tests: date cursors, lap re-polling and rolling lap pace.
+A fake OpenF1 (httpx.MockTransport) serves rows that change between polls.
+Run: python run_tests.py test_live_ingestor.py (or python -m pytest test_live_ingestor.py)
+"""
+
+import asyncio
+from urllib.parse import unquote
+
+import httpx
+
+from live_ingestor import PACE_ALPHA, DriverState, LiveIngestor
+
+
+class FakeOpenF1:
+    """Serves self.rows[endpoint], honouring `field>=value` filters like OpenF1"""
+
+    def __init__(self):
+        self.rows = {endpoint: [] for endpoint in ('drivers', 'intervals', 'position', 'laps', 'pit', 'race_control')}
+        self.queries = []
+
+    def handler(self, request):
+        endpoint = request.url.path.rsplit('/', 1)[-1]
+        query = unquote(request.url.query.decode())
+        self.queries.append((endpoint, query))
+        rows = self.rows[endpoint]
+        for part in query.split('&'):
+            if '>=' in part:
+                field, value = part.split('>=', 1)
+                rows = [r for r in rows if r.get(field) is not None and self._ge(r[field], value)]
+        return httpx.Response(200, json=rows)
+
+    @staticmethod
+    def _ge(left, right):
+        return float(left) >= float(right) if isinstance(left, (int, float)) else str(left) >= right
+
+    def last_query(self, endpoint):
+        return [q for e, q in self.queries if e == endpoint][-1]
+
+
+def lap(driver, number, duration=None, start='2025-09-07T13:00:00+00:00'):
+    return {'driver_number': driver, 'lap_number': number, 'lap_duration': duration, 'date_start': start}
+
+
+def interval(driver, date, gap):
+    return {'driver_number': driver, 'date': date, 'gap_to_leader': gap, 'interval': gap}
+
+
+async def ingestor_for(fake):
+    ingestor = LiveIngestor(9999, base_url='http://openf1.test/v1', transport=httpx.MockTransport(fake.handler))
+    await ingestor.start(poll=False)
+    return ingestor
+
+
+def test_lap_average_matches_refold():
+    incremental, shuffled = DriverState(), DriverState()
+    times = {1: 92.0, 2: 90.5, 3: 91.2, 4: 89.9}
+    for number in sorted(times):
+        incremental.add_lap(number, times[number])
+    # Lap 2's duration arrives after lap 4
+    for number in (1, 3, 4, 2):
+        shuffled.add_lap(number, times[number])
+    expected = 92.0
+    for number in (2, 3, 4):
+        expected += PACE_ALPHA * (times[number] - expected)
+    assert abs(incremental.lap_ewma - expected) < 1e-12
+    assert abs(shuffled.lap_ewma - expected) < 1e-12
+    assert incremental.laps == shuffled.laps == 4
+
+
+def test_open_lap():
+    driver = DriverState()
+    driver.add_lap(1, 92.0)
+    driver.add_lap(2, None)
+    driver.add_lap(3, None)
+    assert driver.open_lap() == 2
+    driver.add_lap(2, 90.0)
+    assert driver.open_lap() == 3
+    driver.add_lap(3, 90.0)
+    assert driver.open_lap() is None
+
+
+def test_same_timestamp_rows_across_polls():
+    async def scenario():
+        fake = FakeOpenF1()
+        t1, t2 = '2025-09-07T13:05:00.100000+00:00', '2025-09-07T13:05:04.100000+00:00'
+        fake.rows['intervals'] = [interval(1, t1, 0.0)]
+        ingestor = await ingestor_for(fake)
+        assert (await ingestor.poll_once())['intervals'] == 1
+
+        # Another row for the cursor's timestamp lands after the first poll
+        fake.rows['intervals'].append(interval(16, t1, 1.5))
+        assert (await ingestor.poll_once())['intervals'] == 1
+        assert f'date>={t1}' in fake.last_query('intervals')
+
+        # Nothing new: the re-sent rows at the cursor are all skipped
+        assert (await ingestor.poll_once())['intervals'] == 0
+
+        fake.rows['intervals'].append(interval(16, t2, 1.9))
+        assert (await ingestor.poll_once())['intervals'] == 1
+        assert ingestor.state.drivers[16].gap_n == 2
+        assert ingestor.state.drivers[1].gap_n == 1
+        await ingestor.close()
+    asyncio.run(scenario())
+
+
+def test_lap_duration_filled_in_later():
+    async def scenario():
+        fake = FakeOpenF1()
+        # Lap 2 is published when it starts, without a duration
+        fake.rows['laps'] = [lap(1, 1, 95.0), lap(1, 2)]
+        ingestor = await ingestor_for(fake)
+        await ingestor.poll_once()
+        assert ingestor.state.drivers[1].laps == 1
+        assert ingestor.laps_from is None
+
+        fake.rows['laps'] = [lap(1, 1, 95.0), lap(1, 2, 91.0), lap(1, 3)]
+        await ingestor.poll_once()
+        # Re-polled from the open lap, not from after the latest lap start
+        assert ingestor.laps_from == 2
+        assert 'lap_number>=2' in fake.last_query('laps')
+        driver = ingestor.state.drivers[1]
+        assert driver.laps == 2
+        assert driver.last_lap == 3
+        assert abs(driver.lap_ewma - (95.0 + PACE_ALPHA * (91.0 - 95.0))) < 1e-12
+
+        # Unchanged rows are not applied again
+        assert (await ingestor.poll_once())['laps'] == 0
+        await ingestor.close()
+    asyncio.run(scenario())
+
+
+def test_incremental_polls_match_one_shot():
+    final_laps = [lap(1, 1, 95.0), lap(1, 2, 91.0), lap(1, 3, 90.4),
+                  lap(16, 1, 95.6), lap(16, 2, 90.8), lap(16, 3)]
+    stages = [
+        [lap(1, 1), lap(16, 1)],
+        [lap(1, 1, 95.0), lap(1, 2), lap(16, 1, 95.6), lap(16, 2)],
+        [lap(1, 1, 95.0), lap(1, 2, 91.0), lap(1, 3), lap(16, 1, 95.6), lap(16, 2, 90.8), lap(16, 3)],
+        final_laps,
+    ]
+
+    async def scenario():
+        fake = FakeOpenF1()
+        ingestor = await ingestor_for(fake)
+        for rows in stages:
+            fake.rows['laps'] = rows
+            await ingestor.poll_once()
+        incremental = ingestor.snapshot()
+        await ingestor.close()
+
+        fake = FakeOpenF1()
+        fake.rows['laps'] = final_laps
+        ingestor = await ingestor_for(fake)
+        await ingestor.poll_once()
+        one_shot = ingestor.snapshot()
+        await ingestor.close()
+        return incremental, one_shot
+
+    incremental, one_shot = asyncio.run(scenario())
+    assert incremental.keys() == one_shot.keys()
+    for driver_id in one_shot:
+        for key, value in one_shot[driver_id].items():
+            got = incremental[driver_id][key]
+            assert abs(got - value) < 1e-12 if isinstance(value, float) else got == value, (driver_id, key)
@@ -0,0 +1,145 @@
+"""
+LiveRacePredictor tests on small toy forests: telemetry merging and
+simulation sweeps.
+Run: python run_tests.py test_live_predictor.py (or python -m pytest test_live_predictor.py)
+"""
+
+import functools
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from live_predictor import (
+    LiveRacePredictor, ROUND_MAP, SAFETY_CAR_COUNTS, TELEMETRY_FIELDS, telemetry_value
+)
+
+FEATURES = ['grid', 'recent_pace', 'pace_ratio', 'gap_trend', 'num_pit_stops',
+            'overtakes_made', 'safety_car_count', 'has_telemetry']
+
+
+@functools.lru_cache(maxsize=None)
+def toy_models(seed=0):
+    """Forests whose outcomes depend on grid, pace and safety cars"""
+    rng = np.random.default_rng(seed)
+    n = 3000
+    X = pd.DataFrame({
+        'grid': rng.integers(1, 21, n),
+        'recent_pace': rng.normal(1.02, 0.01, n),
+        'pace_ratio': rng.normal(1.02, 0.01, n),
+        'gap_trend': rng.normal(0, 0.2, n),
+        'num_pit_stops': rng.integers(0, 3, n),
+        'overtakes_made': rng.integers(0, 5, n),
+        'safety_car_count': rng.integers(0, 4, n),
+        'has_telemetry': rng.integers(0, 2, n),
+    })[FEATURES]
+    skill = -X['grid'] / 4 - (X['pace_ratio'] - 1.02) * 200 + X['safety_car_count'] * rng.normal(0, 1, n)
+    position = pd.Series(skill).rank(ascending=False).to_numpy() / n * 20
+    return {
+        name: RandomForestClassifier(n_estimators=20, max_depth=6, random_state=seed).fit(X, position <= cut)
+        for name, cut in (('winner', 1), ('podium', 3), ('points', 10))
+    }
+
+
+def toy_predictor(rounds=(ROUND_MAP['monza'],)):
+    """Predictor over a 2025 context (one race per round) for the simulated grid"""
+    model_dir = tempfile.mkdtemp()
+    predictor = LiveRacePredictor(model_dir=model_dir, data_path=f'{model_dir}/race.csv',
+                                  use_flat_engine=False)
+    predictor.features = FEATURES
+    predictor.models = dict(toy_models())
+    drivers = list(predictor.simulation_pace('monza', False))
+    rows = []
+    for round_num in rounds:
+        for i, driver in enumerate(drivers):
+            rows.append({
+                'driver_id': driver, 'constructor_id': f'team_{i // 2}', 'circuit_id': 'monza',
+                'season': 2025, 'round': round_num, 'grid': (i * 7 + round_num) % 20 + 1,
+                'position': i + 1, 'recent_pace': 1.0 + i * 0.002, 'dnf_rate': 0.02 + i * 0.001,
+            })
+    predictor.set_historical_data(pd.DataFrame(rows))
+    return predictor
+
+
+def test_telemetry_value():
+    assert telemetry_value(2) == 2.0
+    assert telemetry_value('1.5') == 1.5
+    assert np.isnan(telemetry_value(None))
+    assert np.isnan(telemetry_value('n/a'))
+
+
+def test_telemetry_columns_defaults():
+    predictor = toy_predictor()
+    race = predictor._get_race_context(2025, ROUND_MAP['monza'])
+    first, second = race['driver_id'].iloc[:2]
+    telemetry = {
+        first: {'pace_ratio': 0.99, 'gap_trend': -0.3, 'pit_stops': 2, 'overtakes': 1, 'safety_car_count': 1},
+        # Nulls and junk count as missing: pace falls back to recent_pace, the rest to 0
+        second: {'pace_ratio': None, 'gap_trend': 'n/a', 'pit_stops': None},
+    }
+    columns = predictor._telemetry_columns(race, telemetry)
+    assert set(columns) == {col for _, col, _ in TELEMETRY_FIELDS} | {'has_telemetry'}
+    row = {col: values[0] for col, values in columns.items()}
+    assert row == {'pace_ratio': 0.99, 'gap_trend': -0.3, 'num_pit_stops': 2, 'overtakes_made': 1,
+                   'safety_car_count': 1, 'has_telemetry': 1}
+    row = {col: values[1] for col, values in columns.items()}
+    assert row == {'pace_ratio': race['recent_pace'].iloc[1], 'gap_trend': 0, 'num_pit_stops': 0,
+                   'overtakes_made': 0, 'safety_car_count': 0, 'has_telemetry': 1}
+
+
+def test_drivers_without_telemetry_keep_their_values():
+    predictor = toy_predictor()
+    race = predictor._get_race_context(2025, ROUND_MAP['monza'])
+    race['gap_trend'] = 0.7
+    first = race['driver_id'].iloc[0]
+    columns = predictor._telemetry_columns(race, {first: {'gap_trend': -0.1}})
+    assert columns['gap_trend'][0] == -0.1
+    assert np.all(columns['gap_trend'][1:] == 0.7)
+    # Columns the context does not have stay missing
+    assert np.all(np.isnan(columns['pace_ratio'][1:]))
+    assert columns['has_telemetry'][0] == 1 and np.all(np.isnan(columns['has_telemetry'][1:]))
+
+
+def test_simulated_safety_car_count():
+    predictor = toy_predictor()
+    for level, count in SAFETY_CAR_COUNTS.items():
+        _, _, _, telemetry = predictor._simulation_inputs({'circuit': 'Monza', 'safety_car': level})
+        assert {t['safety_car_count'] for t in telemetry.values()} == {count}
+    _, _, _, telemetry = predictor._simulation_inputs({'circuit': 'Monza', 'safety_car': 'HIGH'})
+    assert next(iter(telemetry.values()))['safety_car_count'] == SAFETY_CAR_COUNTS['high']
+
+
+def test_sweep_matches_single_predictions():
+    predictor = toy_predictor()
+    params = {'circuit': 'Monza', 'rain_prob': 10, 'safety_car': 'none'}
+    for parameter, values in (('safety_car', list(SAFETY_CAR_COUNTS)), ('rain_prob', [0, 30, 60, 90])):
+        swept = predictor.predict_simulation_sweep(params, parameter, values)
+        assert len(swept) == len(values)
+        for value, result in zip(values, swept):
+            single = predictor.predict_simulation(dict(params, **{parameter: value}))
+            pd.testing.assert_frame_equal(result, single)
+
+
+def test_results_carry_context_dnf_rate():
+    predictor = toy_predictor()
+    results = predictor.predict_simulation({'circuit': 'Monza', 'safety_car': 'low'})
+    race = predictor._get_race_context(2025, ROUND_MAP['monza'])
+    expected = race.set_index('driver_id')['dnf_rate']
+    assert np.allclose(results['dnf_rate'], expected.loc[results['driver_id']].to_numpy())
+
+
+def test_batch_matches_single_predictions():
+    predictor = toy_predictor()
+    scenarios = [
+        {'circuit': 'Monza', 'rain_prob': 0, 'safety_car': 'none'},
+        {'circuit': 'Monza', 'rain_prob': 80, 'safety_car': 'high'},
+        {'circuit': 'Monza', 'rain_prob': 0, 'safety_car': 'none'},
+        # Not in the context: scored on the synthetic grid
+        {'circuit': 'Spa', 'rain_prob': 20, 'safety_car': 'low'},
+    ]
+    batch = predictor.predict_simulation_batch(scenarios)
+    assert len(batch) == len(scenarios)
+    for params, result in zip(scenarios, batch):
+        pd.testing.assert_frame_equal(result, predictor.predict_simulation(params))
+    assert predictor.predict_simulation_batch([]) == []
@@ -0,0 +1,107 @@
+"""
+LiveScheduler trigger tests: thresholds, lap and pit triggers, skip counting.
+Run: python run_tests.py test_live_scheduler.py (or python -m pytest test_live_scheduler.py)
+"""
+
+import copy
+
+from live_scheduler import DEFAULT_THRESHOLDS, LiveScheduler
+
+
+class CountingPredictor:
+    def __init__(self):
+        self.calls = 0
+
+    def predict_live(self, season, round_num, live_telemetry=None, circuit_id=None):
+        self.calls += 1
+        return {'call': self.calls}
+
+
+def telemetry(lap=10, gap=0.5, pace=1.004, pits=1, overtakes=2):
+    return {
+        'max_verstappen': {'lap': lap, 'gap_trend': 0.0, 'pace_ratio': 1.0, 'pit_stops': 1, 'overtakes': 0},
+        'norris': {'lap': lap, 'gap_trend': gap, 'pace_ratio': pace, 'pit_stops': pits, 'overtakes': overtakes},
+    }
+
+
+def scheduler():
+    return LiveScheduler(CountingPredictor(), 2025, 16, 'monza')
+
+
+def test_first_update_scores():
+    s = scheduler()
+    assert s.update(telemetry()) == {'call': 1}
+    assert s.triggers == {'initial': 1}
+
+
+def test_small_moves_are_skipped():
+    s = scheduler()
+    first = s.update(telemetry())
+    below = DEFAULT_THRESHOLDS['gap_trend'] * 0.8
+    assert s.update(telemetry(gap=0.5 + below, pace=1.004 + DEFAULT_THRESHOLDS['pace_ratio'] * 0.8)) is first
+    assert s.predictor.calls == 1
+    assert s.stats()['skipped'] == 1
+    assert s.stats()['skip_rate'] == 0.5
+
+
+def test_drift_is_measured_from_last_inference():
+    # Steps below the threshold still add up to a re-score
+    s = scheduler()
+    s.update(telemetry())
+    step = DEFAULT_THRESHOLDS['gap_trend'] * 0.6
+    s.update(telemetry(gap=0.5 + step))
+    assert s.predictor.calls == 1
+    s.update(telemetry(gap=0.5 + 2 * step))
+    assert s.predictor.calls == 2
+    assert s.triggers.get('delta') == 1
+    assert s.last_changed == ['gap_trend']
+
+
+def test_pace_threshold():
+    s = scheduler()
+    s.update(telemetry())
+    s.update(telemetry(pace=1.004 + DEFAULT_THRESHOLDS['pace_ratio'] * 1.5))
+    assert s.last_changed == ['pace_ratio']
+    assert s.triggers.get('delta') == 1
+
+
+def test_new_lap_and_pit_stop_trigger():
+    s = scheduler()
+    s.update(telemetry())
+    s.update(telemetry(lap=11))
+    assert s.triggers.get('lap') == 1
+    s.update(telemetry(lap=11, pits=2))
+    assert s.triggers.get('pit') == 1
+    assert 'num_pit_stops' in s.last_changed
+    assert s.predictor.calls == 3
+
+
+def test_missing_value_appearing_triggers():
+    s = scheduler()
+    first = telemetry()
+    del first['norris']['pace_ratio']
+    s.update(first)
+    # First timed lap gives the driver a pace_ratio
+    s.update(telemetry())
+    assert s.last_changed == ['pace_ratio']
+
+
+def test_identical_snapshot_skips_and_force_scores():
+    s = scheduler()
+    snapshot = telemetry()
+    s.update(snapshot)
+    s.update(copy.deepcopy(snapshot))
+    assert s.predictor.calls == 1
+    s.update(copy.deepcopy(snapshot), force=True)
+    assert s.predictor.calls == 2
+    assert s.triggers.get('forced') == 1
+
+
+def test_custom_thresholds():
+    s = LiveScheduler(CountingPredictor(), 2025, 16, thresholds={'gap_trend': 1.0})
+    assert s.thresholds['pace_ratio'] == DEFAULT_THRESHOLDS['pace_ratio']
+    s.update(telemetry())
+    s.update(telemetry(gap=1.2))
+    assert s.predictor.calls == 1
+    s.update(telemetry(gap=1.6))
+    assert s.predictor.calls == 2
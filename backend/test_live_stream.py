@@ -0,0 +1,178 @@
+"""
+LiveHub fan-out tests: shared sessions, start-once, race conflicts, slow consumers.
+Broadcasters never reach OpenF1; start() waits on an event the test controls.
+Run: python run_tests.py test_live_stream.py (or python -m pytest test_live_stream.py)
+"""
+
+import asyncio
+import json
+from contextlib import contextmanager
+
+import live_stream
+from live_stream import LiveHub, LiveSessionConflict, SessionBroadcaster
+
+RACE = (2025, 16, 'monza')
+
+
+class FakeBroadcaster(SessionBroadcaster):
+    """SessionBroadcaster whose start/close are counted instead of polling OpenF1"""
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, queue_size=2, **kwargs)
+        self.release = asyncio.Event()
+        self.error = None
+        self.starts = 0
+        self.closes = 0
+        FakeBroadcaster.instances.append(self)
+
+    async def start(self):
+        self.starts += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+
+    async def close(self):
+        self.closes += 1
+
+
+@contextmanager
+def fake_broadcasters():
+    """Swap the hub's broadcaster class for FakeBroadcaster"""
+    FakeBroadcaster.instances = []
+    real = live_stream.SessionBroadcaster
+    live_stream.SessionBroadcaster = FakeBroadcaster
+    try:
+        yield FakeBroadcaster.instances
+    finally:
+        live_stream.SessionBroadcaster = real
+
+
+def hub():
+    return LiveHub(predictor=None, render=lambda results: results)
+
+
+async def created(instances, n=1):
+    """Yield to the loop until n broadcasters exist"""
+    for _ in range(100):
+        if len(instances) >= n:
+            return instances[n - 1]
+        await asyncio.sleep(0.01)
+    raise AssertionError("broadcaster never created")
+
+
+def frame_data(frame):
+    return json.loads(frame.decode().split('data: ', 1)[1])
+
+
+def test_subscribers_share_one_started_session():
+    async def scenario():
+        with fake_broadcasters() as instances:
+            h = hub()
+            first = asyncio.create_task(h.subscribe(9999, *RACE))
+            second = asyncio.create_task(h.subscribe(9999, *RACE))
+            broadcaster = await created(instances)
+            broadcaster.release.set()
+            a, b = await asyncio.gather(first, second)
+            assert len(instances) == 1 and broadcaster.starts == 1
+            assert h.subscriber_count() == 2
+            await h.unsubscribe(9999, a)
+            assert broadcaster.closes == 0
+            await h.unsubscribe(9999, b)
+            assert broadcaster.closes == 1
+            assert h.sessions == {}
+    asyncio.run(scenario())
+
+
+def test_other_race_is_rejected():
+    async def scenario():
+        with fake_broadcasters() as instances:
+            h = hub()
+            start = asyncio.create_task(h.subscribe(9999, *RACE))
+            (await created(instances)).release.set()
+            subscriber = await start
+            try:
+                await h.subscribe(9999, 2025, 17, 'baku')
+            except LiveSessionConflict:
+                pass
+            else:
+                raise AssertionError("expected LiveSessionConflict")
+            assert h.sessions[9999].subscribers == {subscriber}
+    asyncio.run(scenario())
+
+
+def test_slow_start_does_not_block_other_sessions():
+    async def scenario():
+        with fake_broadcasters() as instances:
+            h = hub()
+            slow = asyncio.create_task(h.subscribe(1, *RACE))
+            await created(instances)
+            fast = asyncio.create_task(h.subscribe(2, *RACE))
+            (await created(instances, 2)).release.set()
+            await asyncio.wait_for(fast, 1)
+            assert not slow.done()
+            instances[0].release.set()
+            await slow
+    asyncio.run(scenario())
+
+
+def test_failed_start_removes_the_session():
+    async def scenario():
+        with fake_broadcasters() as instances:
+            h = hub()
+            attempt = asyncio.create_task(h.subscribe(9999, *RACE))
+            broadcaster = await created(instances)
+            broadcaster.error = RuntimeError("OpenF1 down")
+            broadcaster.release.set()
+            try:
+                await attempt
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("expected the start error")
+            assert h.sessions == {} and broadcaster.closes == 1
+            # The next subscriber starts a fresh session
+            retry = asyncio.create_task(h.subscribe(9999, *RACE))
+            (await created(instances, 2)).release.set()
+            await retry
+            assert instances[1].starts == 1
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_drops_oldest_frames():
+    async def scenario():
+        with fake_broadcasters() as instances:
+            h = hub()
+            start = asyncio.create_task(h.subscribe(9999, *RACE))
+            broadcaster = await created(instances)
+            broadcaster.release.set()
+            slow = await start
+            for n in range(5):
+                broadcaster.publish([{'n': n}])
+            # Queue of 2: the three oldest frames were evicted
+            assert slow.dropped == 3
+            assert [frame_data(slow.queue.get_nowait())['predictions'] for _ in range(2)] == [[{'n': 3}], [{'n': 4}]]
+            assert h.stats()[9999]['dropped'] == 3
+            # A late joiner gets the latest frame straight away
+            late = await h.subscribe(9999, *RACE)
+            assert frame_data(late.queue.get_nowait())['predictions'] == [{'n': 4}]
+    asyncio.run(scenario())
+
+
+def test_stream_yields_frames_and_unsubscribes():
+    async def scenario():
+        with fake_broadcasters() as instances:
+            h = hub()
+            start = asyncio.create_task(h.subscribe(9999, *RACE))
+            broadcaster = await created(instances)
+            broadcaster.release.set()
+            subscriber = await start
+            broadcaster.publish([{'driver_id': 'norris'}])
+            frames = h.stream(9999, subscriber)
+            frame = await frames.__anext__()
+            assert frame.startswith(b"id: 0\nevent: prediction\n")
+            assert subscriber.sent == 1
+            # Client disconnect closes the generator
+            await frames.aclose()
+            assert h.sessions == {} and broadcaster.closes == 1
+    asyncio.run(scenario())
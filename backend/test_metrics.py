@@ -0,0 +1,106 @@
+"""
+Metrics registry tests: histogram buckets, Prometheus rendering, request middleware.
+Run: python run_tests.py test_metrics.py (or python -m pytest test_metrics.py)
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import Histogram, MetricsRegistry, RequestMetricsMiddleware
+
+
+def samples(text):
+    """{'name{labels}': value} for every sample line"""
+    return {line.rsplit(' ', 1)[0]: line.rsplit(' ', 1)[1]
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+
+def test_histogram_buckets_are_upper_inclusive():
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(value)
+    counts, total, count = hist.snapshot()
+    assert counts == [2, 1, 1]
+    assert (round(total, 6), count) == (2.65, 4)
+
+
+def test_render_cumulative_buckets():
+    registry = MetricsRegistry(prefix='t')
+    registry.observe('merge', 0.0002)
+    registry.observe('merge', 0.3)
+    text = registry.render()
+    assert '# TYPE t_stage_latency_seconds histogram' in text
+    values = samples(text)
+    assert values['t_stage_latency_seconds_bucket{stage="merge",le="0.0001"}'] == '0'
+    assert values['t_stage_latency_seconds_bucket{stage="merge",le="0.00025"}'] == '1'
+    assert values['t_stage_latency_seconds_bucket{stage="merge",le="0.5"}'] == '2'
+    assert values['t_stage_latency_seconds_bucket{stage="merge",le="+Inf"}'] == '2'
+    assert values['t_stage_latency_seconds_count{stage="merge"}'] == '2'
+
+
+def test_timers_record_even_on_error():
+    registry = MetricsRegistry()
+
+    @registry.timed('decorated')
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        fail()
+    except ValueError:
+        pass
+    with registry.timer('block'):
+        pass
+    assert registry.stage('decorated').count == 1
+    assert registry.stage('block').count == 1
+    assert fail.__name__ == 'fail'
+
+
+def test_counters_gauges_and_collectors():
+    registry = MetricsRegistry(prefix='t')
+    registry.describe('cache_hits_total', 'Cache hits')
+    registry.inc('cache_hits_total', cache='predict')
+    registry.inc('cache_hits_total', 2, cache='predict')
+    registry.set_gauge('subscribers', 3)
+    registry.register_collector(lambda: [('queue_size', 'gauge', 'Queue size', [({'name': 'a"b'}, 1.5)])])
+    registry.register_collector(lambda: 1 / 0)
+    text = registry.render()
+    values = samples(text)
+    assert '# HELP t_cache_hits_total Cache hits' in text
+    assert '# TYPE t_cache_hits_total counter' in text
+    assert values['t_cache_hits_total{cache="predict"}'] == '3'
+    assert values['t_subscribers'] == '3'
+    # Label values are escaped; a failing collector does not break the scrape
+    assert values['t_queue_size{name="a\\"b"}'] == '1.5'
+
+
+def test_middleware_labels_route_templates():
+    registry = MetricsRegistry(prefix='t')
+    app = FastAPI()
+
+    @app.get('/defaults/{circuit}')
+    async def defaults(circuit: str):
+        return {'circuit': circuit}
+
+    app.add_middleware(RequestMetricsMiddleware, registry=registry)
+    client = TestClient(app)
+    for circuit in ('monza', 'spa'):
+        assert client.get(f'/defaults/{circuit}').status_code == 200
+    assert client.get('/nowhere').status_code == 404
+    values = samples(registry.render())
+    assert values['t_http_request_duration_seconds_count{method="GET",path="/defaults/{circuit}",status="200"}'] == '2'
+    assert values['t_http_request_duration_seconds_count{method="GET",path="unmatched",status="404"}'] == '1'
+
+
+def test_middleware_passes_other_scopes_through():
+    registry = MetricsRegistry()
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope['type'])
+
+    asyncio.run(RequestMetricsMiddleware(app, registry)({'type': 'lifespan'}, None, None))
+    assert seen == ['lifespan']
+    assert registry.render() == '\n'
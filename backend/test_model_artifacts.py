@@ -0,0 +1,116 @@
+"""
+Memory-mapped .flat artifact tests: save/load round trip and the
+convert_models_to_npy parity guard.
+Run: python run_tests.py test_model_artifacts.py (or python -m pytest test_model_artifacts.py)
+"""
+
+import functools
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+
+import convert_models_to_npy
+from forest_engine import FlatForest
+from model_artifacts import ARRAYS, flat_model_dir, is_current, load_flat_model, save_flat_model
+from test_forest_engine import TOLERANCE, eval_rows, forest, training_data
+
+
+@functools.lru_cache(maxsize=None)
+def fitted_models():
+    """Fitted once per run; tests only read them"""
+    X, y = training_data()
+    return {
+        'plain': forest().fit(X, y),
+        'sigmoid': CalibratedClassifierCV(forest(), method='sigmoid', cv=3).fit(X, y),
+        'isotonic': CalibratedClassifierCV(forest(), method='isotonic', cv=3).fit(X, y),
+    }
+
+
+def test_round_trip_matches_sklearn():
+    X = eval_rows()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in fitted_models().items():
+            out_dir = os.path.join(tmp, f'{name}.flat')
+            save_flat_model(FlatForest.from_sklearn(model), out_dir)
+            loaded = load_flat_model(out_dir)
+            diff = np.abs(loaded.predict_proba(X) - model.predict_proba(X)).max()
+            assert diff <= TOLERANCE, f"{name}: max diff {diff:.3g}"
+            del loaded
+
+
+def test_arrays_are_memory_mapped():
+    model = fitted_models()['plain']
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = os.path.join(tmp, 'plain.flat')
+        save_flat_model(FlatForest.from_sklearn(model), out_dir)
+        mapped = load_flat_model(out_dir)
+        for name in ARRAYS:
+            assert isinstance(getattr(mapped, name), np.memmap), name
+            assert not getattr(mapped, name).flags.writeable, name
+        in_memory = load_flat_model(out_dir, mmap=False)
+        assert not isinstance(in_memory.feature, np.memmap)
+        del mapped
+
+
+def test_unknown_format_version_rejected():
+    model = fitted_models()['plain']
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = os.path.join(tmp, 'plain.flat')
+        save_flat_model(FlatForest.from_sklearn(model), out_dir)
+        meta_path = os.path.join(out_dir, 'meta.json')
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta['format_version'] += 1
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+        try:
+            load_flat_model(out_dir)
+        except ValueError:
+            return
+    raise AssertionError("expected ValueError for an unknown format version")
+
+
+def test_is_current_follows_pickle_mtime():
+    model = fitted_models()['plain']
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        joblib.dump(model, model_path)
+        assert not is_current(model_path)
+        save_flat_model(FlatForest.from_sklearn(model), flat_model_dir(model_path))
+        assert is_current(model_path)
+        # Retrained pickle is newer than its artifact
+        later = time.time() + 60
+        os.utime(model_path, (later, later))
+        assert not is_current(model_path)
+
+
+def test_convert_writes_checked_artifact():
+    model = fitted_models()['sigmoid']
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'race_winner_model_v5.pkl')
+        joblib.dump(model, model_path)
+        convert_models_to_npy.convert(model_path, real_rows=eval_rows(200).astype(np.float32), n_check=200)
+        assert is_current(model_path)
+
+
+def test_convert_removes_artifact_over_tolerance():
+    model = fitted_models()['plain']
+    tolerance = convert_models_to_npy.TOLERANCE
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        joblib.dump(model, model_path)
+        # Any difference at all now counts as a deviation
+        convert_models_to_npy.TOLERANCE = -1.0
+        try:
+            convert_models_to_npy.convert(model_path, n_check=50)
+        except ValueError:
+            assert not os.path.exists(flat_model_dir(model_path))
+            return
+        finally:
+            convert_models_to_npy.TOLERANCE = tolerance
+    raise AssertionError("expected ValueError when parity fails")
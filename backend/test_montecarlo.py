@@ -0,0 +1,46 @@
+"""
+MonteCarloSimulator tests: win frequencies, DNF rates, seeding.
+Run: python run_tests.py test_montecarlo.py (or python -m pytest test_montecarlo.py)
+"""
+
+import numpy as np
+
+from montecarlo import BASE_DNF_RATE, MonteCarloSimulator, driver_dnf_rates
+
+N = 40000
+
+
+def test_win_frequencies_match_probabilities():
+    # No DNFs, no chaos: P(first) is the normalised win probability
+    sim = MonteCarloSimulator(['a', 'b', 'c'], [0.6, 0.3, 0.1], dnf_rates=[0, 0, 0])
+    out = sim.run(N, safety_car='none', rain_prob=0, seed=1)
+    assert np.allclose(out['win_probs'], [0.6, 0.3, 0.1], atol=0.01)
+    assert np.allclose(out['position_probs'].sum(axis=1), 1.0)
+    assert out['mean_safety_cars'] == 0
+
+
+def test_seed_is_reproducible():
+    sim = MonteCarloSimulator(['a', 'b', 'c'], [0.5, 0.3, 0.2])
+    first = sim.run(5000, safety_car='high', rain_prob=50, seed=7)
+    second = sim.run(5000, safety_car='high', rain_prob=50, seed=7)
+    assert np.array_equal(first['position_probs'], second['position_probs'])
+
+
+def test_default_dnf_rate():
+    sim = MonteCarloSimulator(['a', 'b'], [0.5, 0.5])
+    assert np.allclose(sim.dnf_rates, BASE_DNF_RATE)
+    out = sim.run(N, seed=2)
+    assert np.allclose(out['dnf_probs'], BASE_DNF_RATE, atol=0.01)
+
+
+def test_per_driver_dnf_rates():
+    # Context rates are used per driver; a missing one falls back to the default
+    sim = MonteCarloSimulator(['a', 'b', 'c'], [0.4, 0.3, 0.3], dnf_rates=[0.0, 0.3, np.nan])
+    out = sim.run(N, seed=3)
+    assert out['dnf_probs'][0] == 0
+    assert abs(out['dnf_probs'][1] - 0.3) < 0.015
+    assert abs(out['dnf_probs'][2] - BASE_DNF_RATE) < 0.01
+
+
+def test_dnf_rates_are_clipped():
+    assert np.allclose(driver_dnf_rates([-0.1, 2.0, None], 3), [0.0, 0.95, BASE_DNF_RATE])
@@ -0,0 +1,73 @@
+"""
+OpenF1Client retry and stats tests against a scripted httpx.MockTransport.
+Run: python run_tests.py test_openf1_client.py (or python -m pytest test_openf1_client.py)
+"""
+
+import asyncio
+
+import httpx
+
+from openf1_client import OpenF1Client, OpenF1Error
+
+
+def scripted(*responses):
+    """Transport answering each request with the next scripted (status, body) pair"""
+    queue = list(responses)
+
+    def handler(request):
+        status, body = queue.pop(0)
+        if isinstance(body, str):
+            return httpx.Response(status, text=body)
+        return httpx.Response(status, json=body)
+    return httpx.MockTransport(handler)
+
+
+def fetch(transport, retries=2):
+    async def scenario():
+        client = OpenF1Client(base_url='http://openf1.test/v1', rate=0, max_concurrency=2,
+                              retries=retries, backoff=0.001, transport=transport)
+        async with client:
+            try:
+                return await client.get('laps', {'session_key': 1}), client.stats()['laps']
+            except OpenF1Error as e:
+                return e, client.stats()['laps']
+    return asyncio.run(scenario())
+
+
+def test_rows_and_stats():
+    rows, stats = fetch(scripted((200, [{'lap_number': 1}, {'lap_number': 2}])))
+    assert rows == [{'lap_number': 1}, {'lap_number': 2}]
+    assert (stats['requests'], stats['rows'], stats['retries'], stats['errors']) == (1, 2, 0, 0)
+
+
+def test_404_is_empty():
+    rows, stats = fetch(scripted((404, {'detail': 'No results found.'})))
+    assert rows == []
+    assert stats['errors'] == 0
+
+
+def test_server_error_is_retried():
+    rows, stats = fetch(scripted((503, 'busy'), (200, [{'lap_number': 1}])))
+    assert rows == [{'lap_number': 1}]
+    assert (stats['requests'], stats['retries'], stats['errors']) == (2, 1, 0)
+
+
+def test_invalid_json_is_retried():
+    # A 200 with a truncated body or a proxy's HTML page
+    rows, stats = fetch(scripted((200, '<html>Bad Gateway</html>'), (200, '[{"lap_numb'), (200, [])))
+    assert rows == []
+    assert (stats['requests'], stats['retries'], stats['errors']) == (3, 2, 0)
+
+
+def test_invalid_json_counts_as_error_once_retries_run_out():
+    error, stats = fetch(scripted((200, '<html>'), (200, '<html>')), retries=1)
+    assert isinstance(error, OpenF1Error)
+    assert error.status == 200
+    assert (stats['requests'], stats['retries'], stats['errors']) == (2, 1, 1)
+
+
+def test_client_error_is_not_retried():
+    error, stats = fetch(scripted((422, 'bad filter')))
+    assert isinstance(error, OpenF1Error)
+    assert error.status == 422
+    assert (stats['requests'], stats['retries'], stats['errors']) == (1, 0, 1)
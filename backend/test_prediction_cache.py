@@ -0,0 +1,102 @@
+"""
+PredictionCache tests: TTL expiry, LRU eviction, version invalidation.
+Run: python run_tests.py test_prediction_cache.py (or python -m pytest test_prediction_cache.py)
+"""
+
+from contextlib import contextmanager
+
+import prediction_cache
+from prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@contextmanager
+def fake_clock():
+    """Swap the cache module's time source for a clock the test advances by hand"""
+    clock = FakeClock()
+    real_time = prediction_cache.time
+    prediction_cache.time = clock
+    try:
+        yield clock
+    finally:
+        prediction_cache.time = real_time
+
+
+def test_hit_and_miss():
+    cache = PredictionCache(max_size=4, ttl=60)
+    assert cache.get('a', 1) is None
+    cache.put('a', 'A', 1)
+    assert cache.get('a', 1) == 'A'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+
+
+def test_ttl_expiry():
+    with fake_clock() as clock:
+        cache = PredictionCache(max_size=4, ttl=60)
+        cache.put('a', 'A', 1)
+        clock.now += 59.9
+        assert cache.get('a', 1) == 'A'
+        # A hit does not extend the entry's lifetime
+        clock.now += 0.1
+        assert cache.get('a', 1) is None
+        assert cache.stats()['expirations'] == 1
+        assert cache.stats()['size'] == 0
+
+
+def test_put_refreshes_ttl():
+    with fake_clock() as clock:
+        cache = PredictionCache(max_size=4, ttl=60)
+        cache.put('a', 'A', 1)
+        clock.now += 50
+        cache.put('a', 'A2', 1)
+        clock.now += 50
+        assert cache.get('a', 1) == 'A2'
+
+
+def test_lru_eviction():
+    cache = PredictionCache(max_size=3, ttl=60)
+    for key in 'abc':
+        cache.put(key, key.upper(), 1)
+    # Touch 'a' so 'b' becomes least recently used
+    assert cache.get('a', 1) == 'A'
+    cache.put('d', 'D', 1)
+    assert cache.get('b', 1) is None
+    assert [cache.get(key, 1) for key in 'acd'] == ['A', 'C', 'D']
+    stats = cache.stats()
+    assert stats['size'] == 3
+    assert stats['evictions'] == 1
+
+
+def test_version_change_invalidates():
+    cache = PredictionCache(max_size=4, ttl=60)
+    cache.put('a', 'A', 1)
+    cache.put('b', 'B', 1)
+    # Models reloaded: nothing cached under version 1 may be served
+    assert cache.get('a', 2) is None
+    assert cache.get('b', 2) is None
+    assert cache.stats()['invalidations'] == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_stale_put_is_dropped():
+    cache = PredictionCache(max_size=4, ttl=60)
+    cache.put('a', 'A', 2)
+    # Computed before the reload to version 2 finished
+    cache.put('b', 'B-old', 1)
+    assert cache.get('b', 2) is None
+    assert cache.get('a', 2) == 'A'
+
+
+def test_clear():
+    cache = PredictionCache(max_size=4, ttl=60)
+    cache.put('a', 'A', 1)
+    cache.clear()
+    assert cache.get('a', 1) is None
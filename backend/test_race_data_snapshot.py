@@ -0,0 +1,86 @@
+"""
+RaceDataSnapshot tests: round trip, staleness, feature-set changes, truncation.
+The DB helpers run against an in-memory SQLite race_data table.
+Run: python run_tests.py test_race_data_snapshot.py (or python -m pytest test_race_data_snapshot.py)
+"""
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from race_data_snapshot import RaceDataSnapshot, db_fingerprint, read_db_columns, required_columns
+
+FINGERPRINT = {'n_rows': 4, 'last_race': 202516}
+
+
+def race_data():
+    return pd.DataFrame({
+        'season': [2025] * 4, 'round': [15, 15, 16, 16],
+        'driver_id': ['norris', 'piastri', 'norris', 'piastri'],
+        'grid': [1, 2, 2, 1], 'position': [2, 1, 1, 2],
+        'recent_pace': [1.0, 0.99, 1.0, 0.995], 'unused': ['x'] * 4,
+    })
+
+
+def snapshot():
+    return RaceDataSnapshot(os.path.join(tempfile.mkdtemp(), 'race_data_snapshot.parquet'))
+
+
+def test_round_trip_keeps_requested_columns():
+    snap = snapshot()
+    columns = required_columns(['grid', 'pace_ratio'])
+    assert snap.save(race_data(), FINGERPRINT, columns)
+    data = snap.load(columns, FINGERPRINT)
+    # Only columns the data has are stored; the rest are recorded as missing
+    assert list(data.columns) == [c for c in columns if c in race_data().columns]
+    pd.testing.assert_frame_equal(data, race_data()[list(data.columns)])
+    assert 'pace_ratio' in snap.read_meta()['missing_columns']
+
+
+def test_stale_fingerprint_is_rejected():
+    snap = snapshot()
+    columns = required_columns([])
+    snap.save(race_data(), FINGERPRINT, columns)
+    assert snap.load(columns, {'n_rows': 5, 'last_race': 202517}) is None
+    # DB unreachable: any snapshot is better than none
+    assert snap.load(columns, None) is not None
+
+
+def test_new_feature_set_is_rejected():
+    snap = snapshot()
+    snap.save(race_data(), FINGERPRINT, required_columns(['grid']))
+    assert snap.load(required_columns(['grid', 'gap_trend']), FINGERPRINT) is None
+    assert snap.load(['season', 'round'], FINGERPRINT) is not None
+
+
+def test_missing_or_truncated_snapshot():
+    snap = snapshot()
+    columns = required_columns([])
+    assert snap.load(columns) is None
+    snap.save(race_data(), FINGERPRINT, columns)
+    with open(snap.meta_path) as f:
+        meta = json.load(f)
+    meta['n_rows'] = 10
+    with open(snap.meta_path, 'w') as f:
+        json.dump(meta, f)
+    assert snap.load(columns) is None
+    with open(snap.path, 'wb') as f:
+        f.write(b'not parquet')
+    meta['n_rows'] = 4
+    with open(snap.meta_path, 'w') as f:
+        json.dump(meta, f)
+    assert snap.load(columns) is None
+
+
+def test_db_helpers():
+    engine = create_engine('sqlite://')
+    race_data().head(0).to_sql('race_data', engine, index=False)
+    assert db_fingerprint(engine) == {'n_rows': 0, 'last_race': None}
+    race_data().to_sql('race_data', engine, index=False, if_exists='replace')
+    assert db_fingerprint(engine) == FINGERPRINT
+    data = read_db_columns(engine, ['season', 'driver_id', 'pace_ratio'])
+    assert list(data.columns) == ['season', 'driver_id']
+    assert len(data) == 4
@@ -0,0 +1,67 @@
+"""
+RaceSimulator tests: tire wear, DNF rates, strategy, seeding.
+Run: python run_tests.py test_race_simulator.py (or python -m pytest test_race_simulator.py)
+"""
+
+import numpy as np
+
+from race_simulator import RaceSimulator, stint_time_loss, degradation_rate
+
+DRIVERS = ['a', 'b', 'c', 'd']
+
+
+def simulator(**kwargs):
+    return RaceSimulator(DRIVERS, [1.0] * len(DRIVERS), 'monza', 53, **kwargs)
+
+
+def test_seed_is_reproducible():
+    first = simulator().run(300, safety_car='high', rain_prob=40, seed=5)
+    second = simulator().run(300, safety_car='high', rain_prob=40, seed=5)
+    assert np.array_equal(first['position_probs'], second['position_probs'])
+    assert np.allclose(first['position_probs'].sum(axis=0), 1.0)
+
+
+def test_high_tire_wear_is_slower():
+    # Equal pace and reliability; only 'd' wears its tires harder
+    sim = simulator(dnf_rates=[0.0] * 4, deg_factors=[1.0, 1.0, 1.0, 1.3])
+    out = sim.run(400, tire='medium', pit_stops=1, seed=1)
+    assert out['expected_position'][3] > out['expected_position'][:3].max()
+    assert out['median_gap'][3] > out['median_gap'][:3].max()
+
+
+def test_default_wear_factor():
+    assert np.array_equal(simulator().deg_factors, np.ones(4))
+    same = simulator(deg_factors=[1.0] * 4).run(200, seed=3)
+    default = simulator().run(200, seed=3)
+    assert np.array_equal(same['position_probs'], default['position_probs'])
+
+
+def test_per_driver_dnf_rates():
+    sim = simulator(dnf_rates=[0.0, 0.5, np.nan, 0.0])
+    out = sim.run(2000, rain_prob=0, seed=2)
+    assert out['dnf_probs'][0] == 0 and out['dnf_probs'][3] == 0
+    assert abs(out['dnf_probs'][1] - 0.5) < 0.04
+    assert 0.03 < out['dnf_probs'][2] < 0.09
+
+
+def test_strategy_and_stops():
+    sim = simulator(dnf_rates=[0.0] * 4)
+    assert sim.strategy('soft', 2) == ['soft', 'medium', 'hard']
+    assert sim.strategy('soft', 1, wet=True) == ['intermediate', 'intermediate']
+    out = sim.run(100, tire='soft', pit_stops=2, seed=4)
+    assert np.all(out['mean_stops'] == 2)
+
+
+def test_invalid_pit_stops():
+    for pit_stops in (-1, 52):
+        try:
+            simulator().run(10, pit_stops=pit_stops)
+        except ValueError:
+            continue
+        raise AssertionError(f"pit_stops={pit_stops} accepted")
+
+
+def test_stint_time_loss_scales_with_wear():
+    base = stint_time_loss('medium', [20], 3)
+    worn = stint_time_loss('medium', [20], 3, deg_factor=1.2)
+    assert np.isclose(worn - base, 0.2 * degradation_rate('medium', 3) * 20 * 21 / 2)
@@ -0,0 +1,115 @@
+"""
+Session replay tests: merged event order, undated rows, pacing.
+Recordings are written as small CSV sessions in a temp directory.
+Run: python run_tests.py test_session_replay.py (or python -m pytest test_session_replay.py)
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from live_ingestor import LiveSessionState
+from session_replay import LIVE_ENDPOINTS, SessionRecording, SessionReplay, benchmark, find_session_dir
+
+START = datetime(2025, 9, 7, 13, 0, tzinfo=timezone.utc)
+DRIVERS = {1: 'VER', 4: 'NOR', 16: 'LEC', 44: 'HAM'}
+
+
+def stamp(seconds):
+    return (START + timedelta(seconds=seconds)).isoformat()
+
+
+def write_session(root, year, session_key, n_laps, lap_time=90.0):
+    """Recorded race: every driver laps at a slightly different pace, gaps grow each lap"""
+    session_dir = os.path.join(root, str(year), f'session_{session_key}')
+    os.makedirs(session_dir)
+    laps, intervals, positions = [], [], []
+    for rank, number in enumerate(DRIVERS):
+        pace = lap_time + rank * 0.3
+        for lap in range(1, n_laps + 1):
+            start = (lap - 1) * pace
+            # OpenF1 has no date_start for the opening lap
+            laps.append({'date_start': stamp(start) if lap > 1 else None, 'driver_number': number,
+                         'lap_number': lap, 'lap_duration': pace if lap > 1 else None})
+            intervals.append({'date': stamp(start + 5), 'driver_number': number,
+                              'gap_to_leader': rank * 0.3 * lap})
+        positions.append({'date': stamp(1), 'driver_number': number, 'position': len(DRIVERS) - rank})
+        positions.append({'date': stamp(lap_time), 'driver_number': number, 'position': rank + 1})
+    frames = {
+        'drivers': pd.DataFrame({'driver_number': list(DRIVERS), 'name_acronym': list(DRIVERS.values())}),
+        'laps': pd.DataFrame(laps),
+        'intervals': pd.DataFrame(intervals),
+        'position': pd.DataFrame(positions),
+        'pit': pd.DataFrame([{'date': stamp(n_laps * lap_time / 2), 'driver_number': 4,
+                              'lap_number': n_laps // 2, 'pit_duration': 22.1}]),
+        'race_control': pd.DataFrame([{'date': stamp(lap_time * 2), 'category': 'SafetyCar',
+                                       'message': 'SAFETY CAR DEPLOYED'}]),
+    }
+    # Shuffled on disk; the recording sorts each endpoint by time
+    for endpoint, frame in frames.items():
+        frame.sample(frac=1, random_state=session_key).to_csv(os.path.join(session_dir, f'{endpoint}.csv'), index=False)
+    return session_dir
+
+
+def recording(n_laps=5):
+    return SessionRecording(write_session(tempfile.mkdtemp(), 2025, 9999, n_laps))
+
+
+def test_events_are_merged_in_time_order():
+    replay = SessionReplay(recording(), LIVE_ENDPOINTS)
+    events = list(replay.events())
+    times = [ts for ts, _, _ in events]
+    assert times == sorted(times)
+    assert {endpoint for _, endpoint, _ in events} == set(LIVE_ENDPOINTS)
+    # Same timestamp: endpoints keep their LIVE_ENDPOINTS order
+    rank = {endpoint: i for i, endpoint in enumerate(LIVE_ENDPOINTS)}
+    for (t1, e1, _), (t2, e2, _) in zip(events, events[1:]):
+        assert t1 < t2 or rank[e1] <= rank[e2]
+
+
+def test_undated_rows_are_skipped():
+    rec = recording(n_laps=5)
+    replay = SessionReplay(rec, ['laps'])
+    laps = [row for _, _, row in replay.events()]
+    assert len(rec.records('laps')) == 20
+    assert len(laps) == replay.counts['laps'] == 16
+    assert all(row['lap_number'] > 1 for row in laps)
+    # NaN fields come through as None, like the OpenF1 JSON
+    assert any(row['date_start'] is None for row in rec.records('laps'))
+
+
+def test_missing_endpoints_are_ignored():
+    replay = SessionReplay(recording(), ['laps', 'car_data', 'weather'])
+    assert replay.endpoints == ['laps']
+    assert SessionRecording('/nonexistent').records('laps') == []
+
+
+def test_play_unthrottled_yields_every_event():
+    rec = recording()
+
+    async def collect():
+        return [event async for event in SessionReplay(rec, LIVE_ENDPOINTS).play(speed=0)]
+    assert asyncio.run(collect()) == list(SessionReplay(rec, LIVE_ENDPOINTS).events())
+
+
+def test_benchmark_folds_the_session():
+    rec = recording(n_laps=5)
+    report = benchmark(SessionReplay(rec, LIVE_ENDPOINTS))
+    # Same state as applying every row in order by hand
+    state = LiveSessionState()
+    for _, endpoint, row in SessionReplay(rec, LIVE_ENDPOINTS).events():
+        state.apply(endpoint, row)
+    assert report['telemetry'] == state.snapshot()
+    assert report['events'] == sum(report['by_endpoint'].values()) == state.rows
+    assert [t['lap'] for t in report['telemetry'].values()] == [5] * 4
+    assert all(t['safety_car_count'] == 1 for t in report['telemetry'].values())
+
+
+def test_find_session_dir():
+    root = tempfile.mkdtemp()
+    path = write_session(root, 2024, 9158, 2)
+    assert find_session_dir(root, 9158) == path
+    assert find_session_dir(root, 1234) is None
@@ -0,0 +1,99 @@
+"""
+SingleFlight coalescing tests.
+Run: python run_tests.py test_singleflight.py (or python -m pytest test_singleflight.py)
+"""
+
+import asyncio
+import threading
+
+from singleflight import SingleFlight
+
+
+class SlowCall:
+    """Blocking function that waits for the test to release it and counts its calls"""
+
+    def __init__(self, result='done', error=None):
+        self.calls = 0
+        self.release = threading.Event()
+        self.result = result
+        self.error = error
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return (self.result,) + args
+
+
+async def started(flight, n_inflight=1):
+    """Yield to the loop until the first caller has registered its task"""
+    for _ in range(100):
+        if flight.inflight >= n_inflight:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("call never started")
+
+
+def test_concurrent_callers_share_one_execution():
+    async def scenario():
+        flight, fn = SingleFlight(), SlowCall()
+        callers = [asyncio.create_task(flight.run('k', fn, 1)) for _ in range(5)]
+        await started(flight)
+        fn.release.set()
+        results = await asyncio.gather(*callers)
+        assert results == [('done', 1)] * 5
+        assert fn.calls == 1
+        assert flight.stats() == {'inflight': 0, 'max_inflight': 1, 'executions': 1, 'coalesced': 4}
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight, fn = SingleFlight(), SlowCall()
+        fn.release.set()
+        results = await asyncio.gather(flight.run('a', fn, 1), flight.run('b', fn, 2))
+        assert results == [('done', 1), ('done', 2)]
+        assert fn.calls == 2
+    asyncio.run(scenario())
+
+
+def test_finished_key_runs_again():
+    async def scenario():
+        flight, fn = SingleFlight(), SlowCall()
+        fn.release.set()
+        await flight.run('k', fn)
+        await flight.run('k', fn)
+        assert fn.calls == 2
+        assert flight.stats()['coalesced'] == 0
+    asyncio.run(scenario())
+
+
+def test_error_reaches_every_caller_and_clears_key():
+    async def scenario():
+        flight, fn = SingleFlight(), SlowCall(error=RuntimeError("boom"))
+        callers = [asyncio.create_task(flight.run('k', fn)) for _ in range(3)]
+        await started(flight)
+        fn.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.inflight == 0
+        # A failure is not cached; the next caller retries
+        fn.error = None
+        assert await flight.run('k', fn) == ('done',)
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def scenario():
+        flight, fn = SingleFlight(), SlowCall()
+        first = asyncio.create_task(flight.run('k', fn))
+        second = asyncio.create_task(flight.run('k', fn))
+        await started(flight)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        fn.release.set()
+        assert await second == ('done',)
+        assert first.cancelled()
+        assert fn.calls == 1
+    asyncio.run(scenario())
@@ -0,0 +1,96 @@
+"""
+Strategy DP tests: the optimizer's best 1/2/3-stop strategies against an
+exhaustive search over every stint split on a short race.
+Run: python run_tests.py test_strategy_optimizer.py (or python -m pytest test_strategy_optimizer.py)
+"""
+
+import itertools
+
+from race_simulator import PIT_LOSS, stint_time_loss
+from strategy_optimizer import StrategyOptimizer, conditions_bucket, order_stints
+
+
+def compositions(total, parts, minimum):
+    """Every way to split `total` laps into `parts` stints of at least `minimum` laps"""
+    if parts == 1:
+        if total >= minimum:
+            yield (total,)
+        return
+    for first in range(minimum, total - minimum * (parts - 1) + 1):
+        for rest in compositions(total - first, parts - 1, minimum):
+            yield (first,) + rest
+
+
+def brute_force(optimizer, deg_factor, stops):
+    """Fastest strategy with exactly `stops` stops, by trying them all"""
+    factor = deg_factor * optimizer.temp_factor
+    best = None
+    for compounds in itertools.product(optimizer.compounds, repeat=stops + 1):
+        if not optimizer.wet and len(set(compounds)) < 2:
+            continue
+        for lengths in compositions(optimizer.laps, stops + 1, optimizer.min_stint):
+            total = sum(float(stint_time_loss(c, n, optimizer.tire_stress, factor))
+                        for c, n in zip(compounds, lengths))
+            total += stops * optimizer.pit_loss
+            if best is None or total < best:
+                best = total
+    return best
+
+
+def check_against_brute_force(optimizer, deg_factors):
+    results = optimizer.optimize(deg_factors)
+    for factor, result in zip(deg_factors, results):
+        assert sorted(result) == [1, 2, 3]
+        for stops, option in result.items():
+            expected = brute_force(optimizer, factor, stops)
+            assert abs(option['time_loss'] - expected) < 1e-9, (factor, stops, option['time_loss'], expected)
+            # The returned stints realise the reported time
+            lengths = [n for _, n in option['stints']]
+            assert len(option['stints']) == stops + 1
+            assert sum(lengths) == optimizer.laps
+            assert min(lengths) >= optimizer.min_stint
+            replayed = sum(float(stint_time_loss(c, n, optimizer.tire_stress, factor * optimizer.temp_factor))
+                           for c, n in option['stints'])
+            assert abs(replayed + stops * optimizer.pit_loss - option['time_loss']) < 1e-9
+
+
+def test_dry_matches_brute_force():
+    optimizer = StrategyOptimizer(laps=24, tire_stress=0.7, min_stint=4)
+    check_against_brute_force(optimizer, [0.8, 1.0, 1.3])
+
+
+def test_hot_track_matches_brute_force():
+    optimizer = StrategyOptimizer(laps=22, tire_stress=0.9, track_temp=52, min_stint=4)
+    assert optimizer.temp_factor > 1
+    check_against_brute_force(optimizer, [1.0])
+
+
+def test_wet_allows_single_compound():
+    optimizer = StrategyOptimizer(laps=20, tire_stress=0.5, wet=True, min_stint=4)
+    check_against_brute_force(optimizer, [1.0])
+
+
+def test_dry_uses_two_compounds():
+    optimizer = StrategyOptimizer(laps=30, tire_stress=0.6, min_stint=5)
+    for option in optimizer.optimize([1.0])[0].values():
+        assert len({c for c, _ in option['stints']}) >= 2
+
+
+def test_expected_safety_cars_lower_pit_loss():
+    none = StrategyOptimizer(laps=20, tire_stress=0.5, safety_car='none')
+    high = StrategyOptimizer(laps=20, tire_stress=0.5, safety_car='high')
+    assert none.pit_loss == PIT_LOSS
+    assert high.pit_loss < none.pit_loss
+
+
+def test_order_stints():
+    stints = [('hard', 30), ('soft', 12), ('medium', 15)]
+    assert order_stints(stints) == ([('soft', 12), ('medium', 15), ('hard', 30)], [12, 27])
+    ordered, pit_laps = order_stints(stints, start_tire='hard')
+    assert ordered[0] == ('hard', 30)
+    assert pit_laps == [30, 42]
+
+
+def test_conditions_bucket():
+    assert conditions_bucket('monza', 36.9, 10, 'low', 50) == conditions_bucket('monza', 33.0, 40, 'LOW', 50)
+    assert conditions_bucket('monza', 35, 60, 'low', 50) != conditions_bucket('monza', 35, 40, 'low', 50)
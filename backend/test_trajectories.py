@@ -0,0 +1,89 @@
+"""
+Prediction trajectory tests: chunked scoring, session/lap labels, the store.
+Run: python run_tests.py test_trajectories.py (or python -m pytest test_trajectories.py)
+"""
+
+import functools
+import os
+import tempfile
+
+import pandas as pd
+
+from test_live_predictor import toy_predictor
+from test_session_replay import DRIVERS, write_session
+from trajectories import COLUMNS, TrajectoryStore, build_trajectories, find_sessions, save_trajectories
+
+# session_key -> laps; different lengths so mislabelled sessions show up
+SESSION_LAPS = {9101: 3, 9102: 5, 9103: 4}
+
+
+def scored_laps(n_laps):
+    """Laps with a snapshot: lap 1 rows are undated, so the first one closes lap 2"""
+    return list(range(2, n_laps + 1))
+
+
+@functools.lru_cache(maxsize=None)
+def recorded_root():
+    root = tempfile.mkdtemp()
+    for key, n_laps in SESSION_LAPS.items():
+        write_session(root, 2025, key, n_laps, lap_time=80.0 + key % 10)
+    return root
+
+
+def build(chunk_sessions):
+    predictor = toy_predictor(rounds=(1, 2, 3))
+    sessions = find_sessions(recorded_root(), [2025])
+    return build_trajectories(predictor, sessions, workers=2, chunk_sessions=chunk_sessions)
+
+
+@functools.lru_cache(maxsize=None)
+def one_chunk():
+    return build(chunk_sessions=100)
+
+
+def test_find_sessions_assigns_rounds_in_order():
+    sessions = find_sessions(recorded_root(), [2025, 2026])
+    assert [(season, key) for season, key, _ in sessions] == [(2025, key) for key in sorted(SESSION_LAPS)]
+
+
+def test_labels_match_sessions():
+    table = one_chunk()
+    assert list(table.columns) == list(COLUMNS)
+    for round_num, (key, n_laps) in enumerate(sorted(SESSION_LAPS.items()), start=1):
+        rows = table[table['session_key'] == key]
+        assert set(rows['round']) == {round_num}
+        assert sorted(set(rows['lap'])) == scored_laps(n_laps)
+        # Every context driver is ranked once per lap
+        assert len(rows) == len(scored_laps(n_laps)) * 20
+        assert all(sorted(group) == list(range(1, 21)) for _, group in rows.groupby('lap')['predicted_position'])
+
+
+def test_telemetry_is_attached_per_lap():
+    table = one_chunk()
+    # Only the recorded cars have telemetry; the leader's lap count reaches each row's lap
+    recorded = table[table['driver_id'].isin(['max_verstappen', 'norris', 'leclerc', 'hamilton'])]
+    assert len(recorded) == sum(len(scored_laps(n)) for n in SESSION_LAPS.values()) * len(DRIVERS)
+    assert recorded['pace_ratio'].notna().all()
+    assert table.loc[~table.index.isin(recorded.index), 'pace_ratio'].isna().all()
+    last = recorded.sort_values('lap').groupby(['session_key', 'driver_id'], observed=True).tail(1)
+    assert (last.loc[last['driver_id'] == 'norris', 'pit_stops'] == 1).all()
+
+
+def test_chunking_does_not_change_results():
+    # Chunk-local race indices must be shifted back to their sessions
+    expected = one_chunk()
+    for chunk_sessions in (1, 2):
+        pd.testing.assert_frame_equal(build(chunk_sessions), expected)
+
+
+def test_store_round_trip():
+    path = os.path.join(tempfile.mkdtemp(), 'trajectories.parquet')
+    store = TrajectoryStore(path)
+    assert not store.available and store.get(9101) is None
+    save_trajectories(one_chunk(), path)
+    assert store.sessions() == sorted(SESSION_LAPS)
+    rows = store.get(9102)
+    assert len(rows) == len(scored_laps(SESSION_LAPS[9102])) * 20
+    # Categories are dropped on load so driver ids compare as plain strings
+    assert rows['driver_id'].dtype != 'category'
+    assert set(rows['driver_id']) >= {'norris', 'hamilton'}
@@ -1,19 +1,40 @@
 """
 Model V5 - UNIFIED TRAINING
 Trains on 6,871 races with aligned historical + OpenF1 features
+
+Winner model calibration (--winner-calibration):
+  cv3      CalibratedClassifierCV(cv=3): three forests + three sigmoids (default)
+  holdout  one forest on 80% of training data, one sigmoid fitted on the
+           held-out 20%: ~3x less inference time and memory
+Both produce a CalibratedClassifierCV that LiveRacePredictor loads as-is.
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
+from sklearn.metrics import accuracy_score, classification_report, roc_auc_score, brier_score_loss
 from sklearn.calibration import CalibratedClassifierCV
 import joblib
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+parser = argparse.ArgumentParser(description="Train Model V5 (winner, podium, points)")
+parser.add_argument('--winner-calibration', choices=['cv3', 'holdout'], default='cv3',
+                    help="cv3: 3-fold calibrated ensemble, holdout: single forest + held-out sigmoid")
+args = parser.parse_args()
+
+def calibrate_prefit(estimator, X_cal, y_cal):
+    """Fit a sigmoid calibrator on held-out data for an already fitted forest"""
+    try:
+        from sklearn.frozen import FrozenEstimator  # scikit-learn >= 1.6
+        calibrated = CalibratedClassifierCV(FrozenEstimator(estimator), method='sigmoid')
+    except ImportError:
+        calibrated = CalibratedClassifierCV(estimator, method='sigmoid', cv='prefit')
+    return calibrated.fit(X_cal, y_cal)
+
 print("="*80)
 print("MODEL V5 - UNIFIED TRAINING (Old + New Data)")
 print("="*80)
@@ -80,7 +101,7 @@ print(f"   Validation: {len(X_val)} records")
 print("\n🎓 Training Unified Model V5...")
 
 # 1. Winner Model
-print("\n1️⃣  Winner Model (Unified)...")
+print(f"\n1️⃣  Winner Model (Unified, calibration: {args.winner_calibration})...")
 rf_winner = RandomForestClassifier(
     n_estimators=150,
     max_depth=10,
@@ -90,13 +111,25 @@ rf_winner = RandomForestClassifier(
     random_state=42,
     n_jobs=-1
 )
-# Calibrate
-rf_winner_calibrated = CalibratedClassifierCV(rf_winner, method='sigmoid', cv=3)
-rf_winner_calibrated.fit(X_train, y_train_winner)
+if args.winner_calibration == 'holdout':
+    # Single forest; calibrator fitted on data the forest never saw
+    X_fit, X_cal, y_fit, y_cal = train_test_split(
+        X_train, y_train_winner, test_size=0.2, stratify=y_train_winner, random_state=42
+    )
+    rf_winner.fit(X_fit, y_fit)
+    rf_winner_calibrated = calibrate_prefit(rf_winner, X_cal, y_cal)
+    print(f"   Forest: {len(X_fit)} records, calibrator: {len(X_cal)} held-out records")
+else:
+    # Calibrate
+    rf_winner_calibrated = CalibratedClassifierCV(rf_winner, method='sigmoid', cv=3)
+    rf_winner_calibrated.fit(X_train, y_train_winner)
 
 val_pred_winner = rf_winner_calibrated.predict(X_val)
 winner_acc = accuracy_score(y_val_winner, val_pred_winner)
 print(f"   ✅ Validation accuracy: {winner_acc:.1%}")
+if y_val_winner.nunique() > 1:
+    val_proba_winner = rf_winner_calibrated.predict_proba(X_val)[:, 1]
+    print(f"   ✅ Validation Brier score: {brier_score_loss(y_val_winner, val_proba_winner):.4f}")
 
 # 2. Podium Model
 print("\n2️⃣  Podium Model (Unified)...")
@@ -144,16 +177,20 @@ print("\n" + "="*80)
 print("TOP 10 FEATURES (Winner Model)")
 print("="*80)
 
-rf_base = RandomForestClassifier(
-    n_estimators=150,
-    max_depth=10,
-    min_samples_split=5,
-    min_samples_leaf=4,
-    class_weight='balanced',
-    random_state=42,
-    n_jobs=-1
-)
-rf_base.fit(X_train, y_train_winner)
+if args.winner_calibration == 'holdout':
+    # The single calibrated forest is already fitted
+    rf_base = rf_winner
+else:
+    rf_base = RandomForestClassifier(
+        n_estimators=150,
+        max_depth=10,
+        min_samples_split=5,
+        min_samples_leaf=4,
+        class_weight='balanced',
+        random_state=42,
+        n_jobs=-1
+    )
+    rf_base.fit(X_train, y_train_winner)
 importances = rf_base.feature_importances_
 feature_importance = sorted(zip(feature_cols, importances), key=lambda x: x[1], reverse=True)
 
@@ -0,0 +1,221 @@
+"""
+Prediction Trajectories
+How the live prediction evolved lap by lap, precomputed for every recorded
+OpenF1 session (openf1_final/{year}/session_{key}) and served read-only by
+GET /trajectories/{session_key}.
+
+Batch job:
+  1. sessions are replayed in a process pool; each worker folds the live
+     endpoints through LiveSessionState and snapshots the telemetry every
+     time the leader completes a lap (plus once at the end)
+  2. laps are scored with predict_live_grouped in chunks of CHUNK_SESSIONS
+     sessions (one stacked feature matrix per chunk, ranked per session and
+     lap), so the forest's per-row temporaries stay bounded as sessions grow
+  3. results go to one zstd Parquet file, sorted by session and lap
+
+Sessions map to rounds by their order within the year, as in align_and_merge.py.
+
+Run:
+    python trajectories.py --root ../data/openf1_final --years 2023 2024 2025 [--chunk-sessions 8]
+Env:
+    TRAJECTORIES_PATH   output / served file (default ../data/prediction_trajectories.parquet)
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from session_replay import LIVE_ENDPOINTS, SessionRecording, SessionReplay
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, '..', 'data', 'prediction_trajectories.parquet')
+
+# Stored columns and their on-disk types
+COLUMNS = {
+    'session_key': 'int32', 'season': 'int16', 'round': 'int16', 'lap': 'int16',
+    'driver_id': 'category', 'predicted_position': 'int8',
+    'win_prob': 'float32', 'podium_prob': 'float32', 'points_prob': 'float32',
+    'pace_ratio': 'float32', 'gap_trend': 'float32', 'pit_stops': 'int8', 'overtakes': 'int16',
+}
+
+# Sessions per grouped inference; ~1,200 driver-laps each, so a chunk keeps the
+# forest's (rows x n_trees) leaf-index temporaries in the tens of MB
+CHUNK_SESSIONS = 8
+
+
+def find_sessions(root, years):
+    """[(season, session_key, session_dir)] with rounds assigned by session order within each year"""
+    sessions = []
+    for year in years:
+        dirs = glob.glob(os.path.join(root, str(year), 'session_*'))
+        keys = sorted((int(os.path.basename(d).split('_')[1]), d) for d in dirs)
+        sessions.extend((int(year), key, path) for key, path in keys)
+    return sessions
+
+
+def replay_laps(session_dir):
+    """
+    Replay one session and snapshot the live telemetry at each lap boundary.
+    Runs in a worker process; returns (laps, snapshots).
+    """
+    from live_ingestor import LiveSessionState, to_float
+    from live_predictor import DRIVER_CODES
+
+    recording = SessionRecording(session_dir)
+    state = LiveSessionState()
+    # Car numbers change between seasons; map this session's entry list like the live ingestor
+    for row in recording.records('drivers'):
+        number = to_float(row.get('driver_number'))
+        driver_id = DRIVER_CODES.get(str(row.get('name_acronym', '')).upper())
+        if number is not None and driver_id:
+            state.driver_map[int(number)] = driver_id
+
+    replay = SessionReplay(recording, LIVE_ENDPOINTS)
+    laps, snapshots = [], []
+    for _, endpoint, row in replay.events():
+        lap_before = state.leader_lap
+        state.apply(endpoint, row)
+        # The leader starting lap N+1 closes lap N
+        if state.leader_lap > lap_before and lap_before > 0:
+            laps.append(lap_before)
+            snapshots.append(state.snapshot())
+    if state.leader_lap > 0 and (not laps or laps[-1] < state.leader_lap):
+        laps.append(state.leader_lap)
+        snapshots.append(state.snapshot())
+    return laps, snapshots
+
+
+def build_trajectories(predictor, sessions, workers=None, chunk_sessions=CHUNK_SESSIONS):
+    """Replay sessions in parallel, then score their laps in batched inferences of chunk_sessions sessions"""
+    started = time.perf_counter()
+    rounds = {}
+    for season, session_key, _ in sessions:
+        rounds.setdefault(season, []).append(session_key)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        replays = list(pool.map(replay_laps, [path for _, _, path in sessions]))
+    print(f"✅ Replayed {len(sessions)} sessions in {time.perf_counter() - started:.1f}s")
+
+    races = []
+    meta = []
+    for (season, session_key, _), (laps, snapshots) in zip(sessions, replays):
+        round_num = rounds[season].index(session_key) + 1
+        races.append((season, round_num, None, snapshots))
+        meta.append((session_key, season, round_num, laps, snapshots))
+
+    started = time.perf_counter()
+    chunk_sessions = max(1, chunk_sessions)
+    chunks = []
+    for offset in range(0, len(races), chunk_sessions):
+        chunk = predictor.predict_live_grouped(races[offset:offset + chunk_sessions])
+        # Race indices are chunk-local; shift them back to positions in `meta`
+        chunk['race'] = chunk['race'].astype(int) + offset
+        chunks.append(chunk)
+    results = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    print(f"✅ Scored {len(results):,} driver-laps in {time.perf_counter() - started:.1f}s")
+    if len(results) == 0:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMNS.items()})
+
+    # Attach session/lap labels and the telemetry each prediction was made from
+    race_idx = results['race'].to_numpy()
+    snap_idx = results['snapshot'].to_numpy()
+    results['session_key'] = [meta[r][0] for r in race_idx]
+    results['season'] = [meta[r][1] for r in race_idx]
+    results['round'] = [meta[r][2] for r in race_idx]
+    results['lap'] = [meta[r][3][s] for r, s in zip(race_idx, snap_idx)]
+    for key in ('pace_ratio', 'gap_trend', 'pit_stops', 'overtakes'):
+        results[key] = [
+            meta[r][4][s].get(d, {}).get(key, np.nan)
+            for r, s, d in zip(race_idx, snap_idx, results['driver_id'])
+        ]
+
+    table = results[list(COLUMNS)].copy()
+    for col, dtype in COLUMNS.items():
+        if dtype.startswith('int'):
+            table[col] = pd.to_numeric(table[col], errors='coerce').fillna(0)
+        table[col] = table[col].astype(dtype)
+    return table.sort_values(['session_key', 'lap', 'predicted_position'], kind='stable').reset_index(drop=True)
+
+
+def save_trajectories(table, path):
+    """Atomic zstd Parquet write"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    pq.write_table(pa.Table.from_pandas(table, preserve_index=False), tmp, compression='zstd')
+    os.replace(tmp, path)
+
+
+class TrajectoryStore:
+    """Read-only view of the trajectories file, reloaded when it changes on disk"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("TRAJECTORIES_PATH") or DEFAULT_PATH
+        self._mtime = None
+        self._sessions = {}
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._mtime, self._sessions = None, {}
+            return
+        if mtime == self._mtime:
+            return
+        table = pd.read_parquet(self.path)
+        table['driver_id'] = table['driver_id'].astype(str)
+        self._sessions = {int(key): group.reset_index(drop=True) for key, group in table.groupby('session_key')}
+        self._mtime = mtime
+        print(f"✅ Loaded prediction trajectories for {len(self._sessions)} sessions")
+
+    @property
+    def available(self):
+        self._refresh()
+        return self._mtime is not None
+
+    def get(self, session_key):
+        """Rows for one session sorted by lap and predicted position (None if unknown)"""
+        self._refresh()
+        return self._sessions.get(int(session_key))
+
+    def sessions(self):
+        self._refresh()
+        return sorted(self._sessions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute lap-by-lap prediction trajectories")
+    parser.add_argument('--root', default=os.path.join(BASE_DIR, '..', 'data', 'openf1_final'))
+    parser.add_argument('--years', nargs='+', type=int, default=[2023, 2024, 2025])
+    parser.add_argument('--output', default=os.getenv("TRAJECTORIES_PATH") or DEFAULT_PATH)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-sessions', type=int, default=CHUNK_SESSIONS,
+                        help="sessions scored per batched inference")
+    args = parser.parse_args()
+
+    from live_predictor import LiveRacePredictor
+
+    sessions = find_sessions(args.root, args.years)
+    if not sessions:
+        raise SystemExit(f"❌ No sessions found under {args.root}")
+    print(f"📋 {len(sessions)} sessions to replay")
+
+    predictor = LiveRacePredictor()
+    if not predictor.load_resources():
+        raise SystemExit("❌ Could not load models")
+
+    table = build_trajectories(predictor, sessions, args.workers, args.chunk_sessions)
+    save_trajectories(table, args.output)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"💾 Saved {len(table):,} rows ({table['session_key'].nunique()} sessions, {size_kb:.0f} KB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Forecast Weather Service
+Async OpenWeather 5-day forecast client for /defaults/{circuit}.
+- One pooled httpx.AsyncClient shared by all requests
+- Raw forecast cached per circuit for 3 hours (the forecast's own granularity)
+- Entries close to expiry are refreshed in the background
+"""
+
+import asyncio
+import functools
+import os
+import time
+from datetime import datetime
+
+import httpx
+
+OPENWEATHER_BASE_URL = "https://api.openweathermap.org"
+
+# OpenWeather publishes the 5-day forecast in 3-hour steps
+FORECAST_TTL = 3 * 60 * 60
+# Refresh entries this long before they expire
+REFRESH_MARGIN = 15 * 60
+
+
+def parse_forecast(data, race_date):
+    """Pick the race-day slot from a forecast response and map it to sim defaults"""
+    # Find forecast closest to 14:00 on race day
+    target_date = race_date.strftime("%Y-%m-%d")
+    best_match = None
+
+    for item in data.get('list', []):
+        dt_txt = item['dt_txt']  # "2025-11-30 15:00:00"
+        if target_date in dt_txt and "15:00" in dt_txt:
+            best_match = item
+            break
+
+    # Fallback to any time on that day
+    if not best_match:
+        for item in data.get('list', []):
+            if target_date in item['dt_txt']:
+                best_match = item
+                break
+
+    if not best_match:
+        return None
+
+    temp = best_match['main']['temp']
+    humidity = best_match['main']['humidity']
+    clouds = best_match['clouds']['all']
+
+    # Estimate Rain
+    rain_prob = 0
+    if 'rain' in best_match:
+        rain_prob = 80
+    elif clouds > 70:
+        rain_prob = 30
+    elif clouds > 90:
+        rain_prob = 50
+
+    summary = best_match['weather'][0]['description'].title()
+
+    print(f"✅ Forecast found: {temp}°C, {summary}")
+
+    return {
+        'air_temp': round(temp, 1),
+        'track_temp': round(temp + 10, 1),
+        'rain_prob': rain_prob,
+        'humidity': humidity,
+        'weather_summary': f"{summary} (Forecast)"
+    }
+
+
+class ForecastService:
+    def __init__(self, locations, base_url=None, ttl=FORECAST_TTL,
+                 refresh_margin=REFRESH_MARGIN, timeout=2.0, transport=None):
+        self.locations = locations
+        self.base_url = base_url or os.getenv("OPENWEATHER_BASE_URL", OPENWEATHER_BASE_URL)
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.transport = transport
+        self._client = None
+        self._entries = {}    # circuit_key -> (expires_at, forecast json)
+        self._inflight = {}   # circuit_key -> asyncio.Task
+        self._last_access = {}  # circuit_key -> monotonic time of last lookup
+        self._refresher = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    async def start(self):
+        """Open the shared client and start the background refresher"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                transport=self.transport
+            )
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_forecast(self, circuit_key, race_date_str):
+        """
+        Forecast-based defaults if the race is within the 5-day window.
+        race_date_str format: "DD Mon YYYY" (e.g. "30 Nov 2025")
+        """
+        api_key = os.getenv("OPENWEATHER")
+        if not api_key:
+            return None
+
+        if circuit_key not in self.locations:
+            return None
+
+        try:
+            race_date = datetime.strptime(race_date_str, "%d %b %Y")
+            now = datetime.now()
+
+            # Check if race is within next 5 days (OpenWeather Free Limit)
+            delta = (race_date - now).days
+            if not 0 <= delta <= 5:
+                print(f"ℹ️ Race date {race_date_str} is not within 5-day forecast range.")
+                return None
+
+            data = await self._get_cached(circuit_key, api_key)
+            if data is None:
+                return None
+            return parse_forecast(data, race_date)
+        except Exception as e:
+            print(f"❌ Weather Forecast Error: {e}")
+            return None
+
+    async def _get_cached(self, circuit_key, api_key):
+        entry = self._entries.get(circuit_key)
+        now = time.monotonic()
+        self._last_access[circuit_key] = now
+
+        if entry is not None and now < entry[0]:
+            self.hits += 1
+            if now >= entry[0] - self.refresh_margin and circuit_key not in self._inflight:
+                self.refreshes += 1
+                self._schedule_fetch(circuit_key, api_key)
+            return entry[1]
+
+        self.misses += 1
+        try:
+            return await asyncio.shield(self._schedule_fetch(circuit_key, api_key))
+        except Exception:
+            # Serve the stale forecast rather than nothing
+            return entry[1] if entry is not None else None
+
+    def _schedule_fetch(self, circuit_key, api_key):
+        """Start (or join) the single in-flight fetch for a circuit"""
+        task = self._inflight.get(circuit_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(circuit_key, api_key))
+            self._inflight[circuit_key] = task
+            task.add_done_callback(functools.partial(self._fetch_done, circuit_key))
+        return task
+
+    def _fetch_done(self, circuit_key, task):
+        self._inflight.pop(circuit_key, None)
+        if not task.cancelled():
+            # Errors are counted in _fetch; waiters still see the exception
+            task.exception()
+
+    async def _fetch(self, circuit_key, api_key):
+        if self._client is None:
+            await self.start()
+
+        coords = self.locations[circuit_key]
+        print(f"🌤️ Fetching FORECAST for {circuit_key}...")
+        try:
+            response = await self._client.get('/data/2.5/forecast', params={
+                'lat': coords['lat'], 'lon': coords['lon'],
+                'appid': api_key, 'units': 'metric'
+            })
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            self.errors += 1
+            raise
+
+        self._entries[circuit_key] = (time.monotonic() + self.ttl, data)
+        return data
+
+    async def _refresh_loop(self):
+        """Refresh cached forecasts shortly before they expire"""
+        interval = max(1.0, self.refresh_margin / 3)
+        while True:
+            await asyncio.sleep(interval)
+            api_key = os.getenv("OPENWEATHER")
+            if not api_key:
+                continue
+            now = time.monotonic()
+            for circuit_key, (expires_at, _) in list(self._entries.items()):
+                # Circuits nobody asked about for a full TTL are left to expire
+                if now - self._last_access.get(circuit_key, 0) > self.ttl:
+                    continue
+                if now >= expires_at - self.refresh_margin and circuit_key not in self._inflight:
+                    self.refreshes += 1
+                    self._schedule_fetch(circuit_key, api_key)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'background_refreshes': self.refreshes,
+            'errors': self.errors,
+        }
@@ -55,6 +55,7 @@ export default function PredictPage() {
                     track_temp: params.trackTemp,
                     rain_prob: params.rainProb,
                     humidity: params.humidity,
+                    // Strategy only affects /simulate/race; /predict ignores tire and pit_stops
                     tire: params.tire,
                     pit_stops: params.pitStops,
                     safety_car: params.safetyCar